@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ActivitiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'activities'
+
+    def ready(self):
+        # 配置了间隔时在进程内定时关闭遗留的计时，否则由管理命令定时执行
+        interval = getattr(settings, "ACTIVITY_REAPER_INTERVAL", None)
+        if interval:
+            from .reaper import start_timer_reaper
+
+            start_timer_reaper(interval)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, F, Min, OuterRef, Q
+from activities.models import FocusSession, PomodoroActivity, StopwatchActivity
+from app_settings.cache import get_timer_settings
+from data_stats.rollup import mark_sessions_dirty
+
+
+class Command(BaseCommand):
+    help = "按已有活动记录分批回填计时区间，重复执行不会重复回填"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="每批处理的活动数量"
+        )
+        parser.add_argument("--user-id", type=int, help="只回填指定用户的活动")
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.user_id = options["user_id"]
+
+        # 正计时有准确的开始时间和时长，没有记录过区间的直接回填
+        stopwatches = StopwatchActivity.objects.filter(
+            start_time__isnull=False, duration__isnull=False
+        ).exclude(Exists(FocusSession.objects.filter(activity=OuterRef("pk"))))
+        total = self.backfill(stopwatches, self.stopwatch_sessions)
+        self.stdout.write(self.style.SUCCESS(f"正计时回填完成，共 {total} 个区间"))
+
+        # 番茄钟只有完成个数，缺少的区间按用户设置的时长估算，
+        # 在最后更新时间（或已记录的第一个区间）之前首尾相接
+        pomodoros = PomodoroActivity.objects.annotate(
+            logged=Count("focus_sessions", filter=Q(focus_sessions__kind=FocusSession.POMODORO)),
+            first_logged=Min("focus_sessions__start"),
+        ).filter(pomodoro_count__gt=F("logged"))
+        total = self.backfill(pomodoros, self.pomodoro_sessions)
+        self.stdout.write(self.style.SUCCESS(f"番茄钟回填完成，共 {total} 个估算区间"))
+
+    def backfill(self, queryset, build_sessions):
+        """按主键分段遍历，每批在一个事务内批量写入"""
+        queryset = queryset.order_by("id")
+        if self.user_id:
+            queryset = queryset.filter(user_id=self.user_id)
+        last_id = 0
+        total = 0
+        while True:
+            activities = list(queryset.filter(id__gt=last_id)[: self.batch_size])
+            if not activities:
+                break
+            sessions = [
+                session for activity in activities for session in build_sessions(activity)
+            ]
+            with transaction.atomic():
+                FocusSession.objects.bulk_create(sessions)
+                mark_sessions_dirty(sessions)
+            total += len(sessions)
+            last_id = activities[-1].id
+            self.stdout.write(f"已回填 {total} 个区间（最大活动ID {last_id}）")
+        return total
+
+    def stopwatch_sessions(self, activity):
+        return [
+            FocusSession.build(
+                activity,
+                FocusSession.STOPWATCH,
+                activity.start_time,
+                activity.start_time + activity.duration,
+            )
+        ]
+
+    def pomodoro_sessions(self, activity):
+        length = timedelta(minutes=get_timer_settings(activity.user_id).pomodoro_duration)
+        end = min(filter(None, (activity.updated_at, activity.first_logged)))
+        sessions = []
+        for _ in range(activity.pomodoro_count - activity.logged):
+            sessions.append(
+                FocusSession.build(
+                    activity, FocusSession.POMODORO, end - length, end, estimated=True
+                )
+            )
+            end -= length
+        return sessions
@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from activities.models import PomodoroActivity, StopwatchActivity
+from activities.serializers import (
+    PomodoroActivitySerializer,
+    PomodoroActivityValuesSerializer,
+    StopwatchActivitySerializer,
+    StopwatchActivityValuesSerializer,
+)
+from app_settings.models import AppSettings, TaskCategory
+from tasks.models import Task
+from tasks.serializers import TaskSerializer, TaskValuesSerializer
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "对比列表接口完整序列化器与快速序列化器的逐行开销（数据在事务中生成，结束后回滚）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="每种数据的行数")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["rows"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows):
+        now = timezone.now()
+        user = User.objects.create_user(
+            username="benchmark_user", email="benchmark@example.com"
+        )
+        AppSettings.objects.create(user=user)
+        category = TaskCategory.objects.create(name="基准测试", user=user)
+        tasks = Task.objects.bulk_create(
+            Task(
+                title=f"任务{i}",
+                user=user,
+                category=category,
+                due_date=now + timedelta(days=1),
+                estimated_duration=timedelta(minutes=30),
+            )
+            for i in range(rows)
+        )
+        PomodoroActivity.objects.bulk_create(
+            PomodoroActivity(
+                title="番茄钟", user=user, task=task, current_pomodoro_start=now
+            )
+            for task in tasks
+        )
+        StopwatchActivity.objects.bulk_create(
+            StopwatchActivity(title="正计时", user=user, task=task, start_time=now)
+            for task in tasks
+        )
+
+        context = {"request": SimpleNamespace(user=user)}
+        cases = [
+            (Task, ("category",), TaskSerializer, TaskValuesSerializer),
+            (
+                PomodoroActivity,
+                ("task__category",),
+                PomodoroActivitySerializer,
+                PomodoroActivityValuesSerializer,
+            ),
+            (
+                StopwatchActivity,
+                ("task__category",),
+                StopwatchActivitySerializer,
+                StopwatchActivityValuesSerializer,
+            ),
+        ]
+        for model, related, serializer_class, values_serializer_class in cases:
+            queryset = model.objects.filter(user=user).select_related(*related)
+
+            start = time.perf_counter()
+            serializer_class(list(queryset), many=True, context=context).data
+            before = time.perf_counter() - start
+
+            start = time.perf_counter()
+            values_serializer = values_serializer_class(context)
+            values_serializer.serialize(values_serializer.prepare(queryset))
+            after = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{model.__name__}: {rows} 行，"
+                f"完整序列化器 {before * 1e6 / rows:.1f} 微秒/行，"
+                f"快速序列化器 {after * 1e6 / rows:.1f} 微秒/行，"
+                f"提速 {before / after:.1f} 倍"
+            )
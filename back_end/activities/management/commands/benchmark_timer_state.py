@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from activities.timers import pomodoro_state, stopwatch_state
+from app_settings.cache import TimerSettings
+
+
+class Command(BaseCommand):
+    help = "测量计时状态机每秒可计算的次数（纯计算，不访问数据库）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--evaluations", type=int, default=100000, help="计算次数")
+        parser.add_argument(
+            "--min-rate", type=int, default=0, help="低于该速率（次/秒）时以失败退出"
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        settings = TimerSettings.defaults()
+        pomodoro_cases = [
+            (False, False, now - timedelta(minutes=10), None, 3),
+            (True, False, now - timedelta(minutes=30), now - timedelta(minutes=2), 1),
+            (True, True, now - timedelta(minutes=40), now - timedelta(minutes=5), 4),
+            (False, False, None, None, 0),
+        ]
+        stopwatch_cases = [
+            (now - timedelta(hours=1), None),
+            (now - timedelta(hours=2), now - timedelta(hours=1)),
+        ]
+
+        evaluations = options["evaluations"]
+        rounds = max(evaluations // (len(pomodoro_cases) + len(stopwatch_cases)), 1)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for is_break, is_long_break, pomodoro_start, break_start, count in pomodoro_cases:
+                pomodoro_state(
+                    is_break, is_long_break, pomodoro_start, break_start, count, settings, now
+                )
+            for start_time, end_time in stopwatch_cases:
+                stopwatch_state(start_time, end_time, now)
+        elapsed = time.perf_counter() - start
+
+        total = rounds * (len(pomodoro_cases) + len(stopwatch_cases))
+        rate = total / elapsed
+        self.stdout.write(
+            f"{total} 次计算，耗时 {elapsed:.3f} 秒，{rate:,.0f} 次/秒，"
+            f"{elapsed * 1e6 / total:.2f} 微秒/次"
+        )
+        if rate < options["min_rate"]:
+            raise CommandError(f"计算速率 {rate:,.0f} 次/秒低于要求的 {options['min_rate']:,} 次/秒")
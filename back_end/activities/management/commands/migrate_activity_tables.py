@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from activities.models import Activity, FocusSession
+from data_sync.models import Tombstone
+from reminders.models import Reminder
+
+POMODORO_TABLE = "activities_pomodoroactivity"
+STOPWATCH_TABLE = "activities_stopwatchactivity"
+
+COMMON_COLUMNS = (
+    "title", "description", "user_id", "task_id", "status",
+    "start_time", "end_time", "duration", "created_at",
+)
+POMODORO_COLUMNS = (
+    "pomodoro_count", "current_pomodoro_start", "current_break_start",
+    "is_break", "is_long_break",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "把旧的番茄钟表和正计时表按主键分批复制到统一的活动表，并改写提醒和计时区间的关联。"
+        "番茄钟保留原ID，正计时ID整体加上偏移量；中断后重新执行会从上次复制到的位置继续"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="每批复制的行数")
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.tables = set(connection.introspection.table_names())
+        missing = {POMODORO_TABLE, STOPWATCH_TABLE} - self.tables
+        if missing:
+            raise CommandError(f"找不到旧表：{', '.join(sorted(missing))}")
+
+        # 偏移量只取决于旧表，重复执行时保持不变
+        pomodoro_max = self.max_id(POMODORO_TABLE)
+        offset = max(pomodoro_max, self.max_id(STOPWATCH_TABLE))
+        self.now = timezone.now()
+
+        self.copy(POMODORO_TABLE, Activity.POMODORO, 0)
+        self.copy(STOPWATCH_TABLE, Activity.STOPWATCH, offset)
+
+        self.remap(Reminder, "pomodoro_activity_id", 0)
+        self.remap(Reminder, "stopwatch_activity_id", offset)
+        self.remap(FocusSession, "pomodoro_id", 0)
+        self.remap(FocusSession, "stopwatch_id", offset)
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Activity]):
+                cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"复制完成，正计时ID偏移量为 {offset}。请执行 rebuild_active_timers 重建当前计时登记，"
+            "确认数据无误后再删除旧表和旧的关联列"
+        ))
+
+    def max_id(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT MAX(id) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0] or 0
+
+    def copy(self, table, kind, offset):
+        """按主键区间复制，每批一条 INSERT ... SELECT，在一个事务内提交"""
+        qn = connection.ops.quote_name
+        columns = COMMON_COLUMNS + (POMODORO_COLUMNS if kind == Activity.POMODORO else ())
+        target = ("id", "kind", "updated_at") + columns
+        if kind == Activity.STOPWATCH:
+            target += POMODORO_COLUMNS
+        # 正计时换了ID，更新时间设为现在，客户端增量同步时会重新拉取
+        updated_at = "%s" if offset else "updated_at"
+        select = [f"id + {int(offset)}", "%s", updated_at] + [qn(c) for c in columns]
+        if kind == Activity.STOPWATCH:
+            select += ["0", "NULL", "NULL", "%s", "%s"]
+        insert = (
+            f"INSERT INTO {qn(Activity._meta.db_table)} ({', '.join(qn(c) for c in target)}) "
+            f"SELECT {', '.join(select)} FROM {qn(table)} WHERE id > %s AND id <= %s"
+        )
+
+        done = (
+            Activity.objects.filter(kind=kind).order_by("-id").values_list("id", flat=True).first()
+        )
+        last_id = done - offset if done else 0
+        max_id = self.max_id(table)
+        total = 0
+        while last_id < max_id:
+            upper = last_id + self.batch_size
+            params = [kind]
+            if offset:
+                params.append(self.now)
+            if kind == Activity.STOPWATCH:
+                params += [False, False]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(insert, params + [last_id, upper])
+                total += cursor.rowcount
+                if offset:
+                    self.record_tombstones(cursor, table, last_id, upper)
+            last_id = upper
+            self.stdout.write(f"{table}：已复制 {total} 行（旧ID ≤ {min(upper, max_id)}）")
+
+    def record_tombstones(self, cursor, table, lower, upper):
+        """正计时的旧ID对客户端来说已被删除"""
+        qn = connection.ops.quote_name
+        cursor.execute(
+            f"INSERT INTO {qn(Tombstone._meta.db_table)} (user_id, model, object_id, deleted_at) "
+            f"SELECT user_id, %s, id, %s FROM {qn(table)} WHERE id > %s AND id <= %s",
+            ["stopwatch_activities", self.now, lower, upper],
+        )
+
+    def remap(self, model, column, offset):
+        """旧的关联列存在时，把尚未改写的关联指向新表中的活动"""
+        table = model._meta.db_table
+        if table not in self.tables:
+            return
+        with connection.cursor() as cursor:
+            names = {
+                c.name for c in connection.introspection.get_table_description(cursor, table)
+            }
+            if column not in names:
+                return
+            qn = connection.ops.quote_name
+            cursor.execute(
+                f"UPDATE {qn(table)} SET activity_id = {qn(column)} + {int(offset)} "
+                f"WHERE {qn(column)} IS NOT NULL AND activity_id IS NULL"
+            )
+            self.stdout.write(f"{table}.{column}：已改写 {cursor.rowcount} 行")
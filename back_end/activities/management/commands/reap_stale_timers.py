@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from activities.reaper import reap_stale_timers
+
+
+class Command(BaseCommand):
+    help = "关闭遗留在进行中的正计时和番茄钟，时长按上限封顶"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="每个事务检查的活动数量"
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="循环执行的间隔秒数，不指定时只执行一次（适合由 cron 调度）",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            closed = reap_stale_timers(batch_size=options["batch_size"])
+            for activity in closed:
+                self.stdout.write(f"{activity.kind} #{activity.pk}（用户 {activity.user_id}）")
+            self.stdout.write(self.style.SUCCESS(f"已关闭 {len(closed)} 个遗留的计时"))
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from activities.models import ActiveTimer, Activity
+
+
+class Command(BaseCommand):
+    help = "按进行中的活动重建用户当前计时的登记，每个用户保留最近更新的一个"
+
+    def handle(self, *args, **options):
+        latest = {}
+        duplicated = set()
+        rows = Activity.objects.filter(status="IN_PROGRESS").values_list(
+            "user_id", "id", "updated_at"
+        )
+        for user_id, activity_id, updated_at in rows:
+            if user_id in latest:
+                duplicated.add(user_id)
+                if latest[user_id][1] >= updated_at:
+                    continue
+            latest[user_id] = (activity_id, updated_at)
+
+        with transaction.atomic():
+            ActiveTimer.objects.all().delete()
+            ActiveTimer.objects.bulk_create(
+                ActiveTimer(user_id=user_id, activity_id=activity_id)
+                for user_id, (activity_id, _) in latest.items()
+            )
+
+        if duplicated:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(duplicated)} 个用户有多个进行中的活动，只登记了最近更新的一个："
+                    f"{sorted(duplicated)}"
+                )
+            )
+        self.stdout.write(self.style.SUCCESS(f"已登记 {len(latest)} 个进行中的计时"))
@@ -2,12 +2,58 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import TruncDate
 from django.apps import apps
 from users.models import User
-from app_settings.models import AppSettings
+from app_settings.cache import get_timer_settings
+from .timers import (
+    pomodoro_elapsed_time,
+    pomodoro_remaining_time,
+    pomodoro_state,
+    stopwatch_elapsed_time,
+    stopwatch_state,
+    timer_state_data,
+)
+from push.events import TIMER_EVENT, publish_on_commit
 
 
-class BaseActivity(models.Model):
+class TimerConflict(Exception):
+    """用户已有其他正在进行的计时"""
+
+
+class TransitionConflict(Exception):
+    """计时状态已被其他请求修改，状态转换的前置条件不再成立"""
+
+
+class ActivityManager(models.Manager):
+    """按类型筛选的管理器，代理模型只能查到自己类型的活动"""
+
+    def __init__(self, kind=None):
+        super().__init__()
+        self.kind = kind
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.kind:
+            queryset = queryset.filter(kind=self.kind)
+        return queryset
+
+
+class Activity(models.Model):
+    """
+    番茄钟和正计时共用的活动表，kind 区分类型。
+    PomodoroActivity 和 StopwatchActivity 是按类型筛选的代理模型，接口和业务逻辑不变；
+    时间线等跨类型的查询只需查这一张表
+    """
+
+    POMODORO = "POMODORO"
+    STOPWATCH = "STOPWATCH"
+    KIND_CHOICES = [
+        (POMODORO, "番茄钟"),
+        (STOPWATCH, "正计时"),
+    ]
+
     STATUS_CHOICES = [
         ("PENDING", "未开始"),
         ("IN_PROGRESS", "进行中"),
@@ -21,13 +67,13 @@ class BaseActivity(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name="%(class)s_activities",
+        related_name="activities",
         verbose_name="所属用户",
     )
     task = models.ForeignKey(
         "tasks.Task",
         on_delete=models.CASCADE,
-        related_name="%(class)s_activities",
+        related_name="activities",
         verbose_name="关联任务",
         null=True,
         blank=True,
@@ -43,12 +89,54 @@ class BaseActivity(models.Model):
     duration = models.DurationField(null=True, blank=True, verbose_name="持续时间")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="活动类型")
+
+    # 番茄钟使用的字段，正计时活动保持默认值
+    pomodoro_count = models.IntegerField(
+        default=0, validators=[MinValueValidator(0)], verbose_name="已完成番茄钟数"
+    )
+    current_pomodoro_start = models.DateTimeField(
+        null=True, blank=True, verbose_name="当前番茄钟开始时间"
+    )
+    current_break_start = models.DateTimeField(
+        null=True, blank=True, verbose_name="当前休息开始时间"
+    )
+    is_break = models.BooleanField(default=False, verbose_name="是否处于休息状态")
+    is_long_break = models.BooleanField(
+        default=False, verbose_name="是否处于长休息状态"
+    )
+
+    objects = ActivityManager()
+
+    # 代理模型对应的类型，以及该类型不使用的字段（接口和增量同步中不返回）
+    KIND = None
+    unused_fields = ()
 
     class Meta:
-        abstract = True
-        verbose_name = "基础活动"
-        verbose_name_plural = "基础活动"
+        verbose_name = "活动"
+        verbose_name_plural = "活动"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "id"]),  # 时间线游标分页
+            models.Index(fields=["user", "kind", "-created_at", "id"]),  # 各类型的列表
+            models.Index(fields=["user", "kind", "status", "-created_at", "id"]),
+            models.Index(fields=["user", "kind", "task", "-created_at", "id"]),
+            models.Index(fields=["user", "kind", "updated_at"]),  # 增量同步
+            models.Index(fields=["status", "updated_at"]),  # 遗留计时清理
+            models.Index(fields=["user", "kind", "start_time"]),  # 正计时重叠检查
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.kind and self.KIND:
+            self.kind = self.KIND
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # 通过 Activity 查询（时间线、外键关联）时按类型返回对应的代理模型实例
+        if cls is Activity and "kind" in field_names:
+            cls = KIND_MODELS.get(values[field_names.index("kind")], cls)
+        return super().from_db(db, field_names, values)
 
     def __str__(self):
         return self.title
@@ -59,118 +147,453 @@ class BaseActivity(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_active_timer()
+
+    def transition(self, condition, session=None, **changes):
+        """
+        条件更新：数据库中的当前状态满足 condition 时才写入 changes，否则抛出 TransitionConflict。
+        单条 UPDATE ... WHERE 完成检查和写入，并发的同一转换只有一个成功；
+        只写变化的列，不经过 save()。session 为本次转换结束的计时区间 (类型, 开始, 结束)，
+        在同一事务中追加到 FocusSession
+        """
+        changes["updated_at"] = timezone.now()
+        with transaction.atomic():
+            updated = type(self).objects.filter(condition, pk=self.pk).update(**changes)
+            if not updated:
+                raise TransitionConflict("计时状态已被其他设备修改，请刷新后重试")
+            if session is not None:
+                FocusSession.log(self, *session)
+            # F 表达式的结果从数据库读回，UPDATE 持有行锁，读到的就是本次写入的值
+            expressions = []
+            for name, value in changes.items():
+                if hasattr(value, "resolve_expression"):
+                    expressions.append(name)
+                else:
+                    setattr(self, name, value)
+            if expressions:
+                self.refresh_from_db(fields=expressions)
+            self.sync_active_timer()
 
+    def publish_timer_event(self, action):
+        """事务提交后向用户的所有连接推送计时状态变化"""
+        from .serializers import DATETIME_FIELD
 
-class PomodoroActivity(BaseActivity):
+        publish_on_commit(
+            self.user_id,
+            TIMER_EVENT,
+            {
+                "kind": self.kind,
+                "activity_id": self.pk,
+                "action": action,
+                "status": self.status,
+                "timer_state": timer_state_data(
+                    self.get_timer_state(), DATETIME_FIELD.to_representation
+                ),
+            },
+        )
+
+    def sync_active_timer(self):
+        """进行中的活动登记为用户当前的计时，其余状态撤销登记"""
+        if self.status == "IN_PROGRESS":
+            ActiveTimer.claim(self)
+        else:
+            ActiveTimer.release(self)
+
+
+class PomodoroActivity(Activity):
     """番茄钟活动"""
-    pomodoro_count = models.IntegerField(
-        default=0, validators=[MinValueValidator(0)], verbose_name="已完成番茄钟数"
-    )
-    current_pomodoro_start = models.DateTimeField(
-        null=True, blank=True, verbose_name="当前番茄钟开始时间"
-    )
-    current_break_start = models.DateTimeField(
-        null=True, blank=True, verbose_name="当前休息开始时间"
-    )
-    is_break = models.BooleanField(default=False, verbose_name="是否处于休息状态")
-    is_long_break = models.BooleanField(
-        default=False, verbose_name="是否处于长休息状态"
-    )
+
+    KIND = Activity.POMODORO
+    objects = ActivityManager(KIND)
 
     class Meta:
+        proxy = True
         verbose_name = "番茄钟活动"
         verbose_name_plural = "番茄钟活动"
-        ordering = ["-created_at"]
 
-    def start_pomodoro(self):
-        """开始一个新的番茄钟"""
-        settings = AppSettings.objects.get(user=self.user)
-        self.current_pomodoro_start = timezone.now()
-        self.is_break = False
-        self.is_long_break = False
-        self.status = "IN_PROGRESS"
-        self.save()
+    def end_phase(self, at):
+        """
+        本次转换将结束的阶段（进行中的番茄钟或休息）：返回 (条件, 计时区间)，没有时区间为 None。
+        条件固定阶段的开始时间，保证记录的区间与数据库中的状态一致
+        """
+        if self.status != "IN_PROGRESS":
+            return models.Q(), None
+        if self.is_break:
+            kind = FocusSession.LONG_BREAK if self.is_long_break else FocusSession.SHORT_BREAK
+            field, start = "current_break_start", self.current_break_start
+        else:
+            kind = FocusSession.POMODORO
+            field, start = "current_pomodoro_start", self.current_pomodoro_start
+        if start is None:
+            return models.Q(), None
+        if at < start:
+            raise ValidationError("操作时间不能早于当前阶段的开始时间")
+        return models.Q(is_break=self.is_break, **{field: start}), (kind, start, at)
+
+    def start_pomodoro(self, at=None):
+        """开始一个新的番茄钟（未在进行或正在休息时）；at 为离线操作的发生时间，默认当前时间"""
+        at = at or timezone.now()
+        condition, session = self.end_phase(at)
+        self.transition(
+            ~models.Q(status="IN_PROGRESS", is_break=False) & condition,
+            session,
+            current_pomodoro_start=at,
+            is_break=False,
+            is_long_break=False,
+            status="IN_PROGRESS",
+        )
+        self.publish_timer_event("start")
 
-    def start_break(self, is_long_break=False):
+    def start_break(self, is_long_break=False, at=None):
         """开始休息"""
         if not self.current_pomodoro_start:
             raise ValidationError("必须先开始番茄钟才能开始休息")
+        at = at or timezone.now()
+        condition, session = self.end_phase(at)
 
-        settings = AppSettings.objects.get(user=self.user)
-        self.current_break_start = timezone.now()
-        self.is_break = True
-        self.is_long_break = is_long_break
-        self.save()
+        self.transition(
+            models.Q(status="IN_PROGRESS", current_pomodoro_start__isnull=False) & condition,
+            session,
+            current_break_start=at,
+            is_break=True,
+            is_long_break=is_long_break,
+        )
+        self.publish_timer_event("break")
 
-    def complete_pomodoro(self):
+    def complete_pomodoro(self, at=None):
         """完成一个番茄钟"""
         if not self.current_pomodoro_start:
             raise ValidationError("没有正在进行的番茄钟")
 
-        self.pomodoro_count += 1
-        self.current_pomodoro_start = None
-        self.current_break_start = None
-        self.is_break = False
-        self.is_long_break = False
-        self.status = "COMPLETED"
-        self.save()
+        now = at or timezone.now()
+        condition, session = self.end_phase(now)
+        with transaction.atomic():
+            # 多个设备同时完成同一个番茄钟时只有一个成功，不会重复计数
+            self.transition(
+                models.Q(status="IN_PROGRESS", current_pomodoro_start__isnull=False) & condition,
+                session,
+                pomodoro_count=models.F("pomodoro_count") + 1,
+                current_pomodoro_start=None,
+                current_break_start=None,
+                is_break=False,
+                is_long_break=False,
+                status="COMPLETED",
+            )
+            if self.task_id:
+                # 按完成时用户设置的番茄钟时长累计任务专注时间
+                pomodoro_duration = get_timer_settings(self.user_id).pomodoro_duration
+                Task = apps.get_model("tasks", "Task")
+                Task.objects.filter(pk=self.task_id).add_focus(
+                    pomodoros=1,
+                    pomodoro_seconds=pomodoro_duration * 60,
+                    focused_at=now,
+                )
+            self.publish_timer_event("complete")
+
+    def get_remaining_time(self):
+        """获取当前阶段（番茄钟或休息）的剩余时间"""
+        return pomodoro_remaining_time(
+            self.is_break,
+            self.is_long_break,
+            self.current_pomodoro_start,
+            self.current_break_start,
+            get_timer_settings(self.user_id).durations,
+            timezone.now(),
+        )
+
+    def get_elapsed_time(self):
+        """获取当前阶段已用时间"""
+        return pomodoro_elapsed_time(
+            self.is_break,
+            self.current_pomodoro_start,
+            self.current_break_start,
+            timezone.now(),
+        )
+
+    def get_timer_state(self, now=None):
+        """获取计时状态，时长设置读取缓存"""
+        return pomodoro_state(
+            self.is_break,
+            self.is_long_break,
+            self.current_pomodoro_start,
+            self.current_break_start,
+            self.pomodoro_count,
+            get_timer_settings(self.user_id),
+            now or timezone.now(),
+        )
 
     def __str__(self):
         return f"{self.title} - {self.pomodoro_count}个番茄钟"
 
 
-class StopwatchActivity(BaseActivity):
+class StopwatchActivity(Activity):
     """正计时活动"""
-    start_time = models.DateTimeField(null=True, blank=True, verbose_name="开始时间")
-    end_time = models.DateTimeField(null=True, blank=True, verbose_name="结束时间")
-    duration = models.DurationField(null=True, blank=True, verbose_name="活动时长")
+
+    KIND = Activity.STOPWATCH
+    objects = ActivityManager(KIND)
+    unused_fields = (
+        "pomodoro_count",
+        "current_pomodoro_start",
+        "current_break_start",
+        "is_break",
+        "is_long_break",
+    )
 
     class Meta:
+        proxy = True
         verbose_name = "正计时活动"
         verbose_name_plural = "正计时活动"
-        ordering = ["-created_at"]
 
-    def start_stopwatch(self):
-        """开始正计时"""
-        self.start_time = timezone.now()
-        self.status = "IN_PROGRESS"
-        self.save()
+    def check_overlap(self, start, end):
+        """[start, end) 与该用户其他正计时重叠时报错，重叠的时长会在统计中重复计算"""
+        from .overlaps import find_overlapping
+
+        overlapping = (
+            find_overlapping(self.user_id, start, end, exclude_id=self.pk)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if overlapping is not None:
+            raise ValidationError(f"与已有的正计时记录（ID {overlapping}）时间重叠")
 
-    def stop_stopwatch(self):
+    def start_stopwatch(self, at=None):
+        """
+        开始正计时；at 为离线操作的发生时间，早于当前时间时到现在为止的区间不能与其他正计时重叠。
+        重新开始已结束的正计时时清除上次的结束时间和时长，任务不再计入上次的时长
+        """
+        now = timezone.now()
+        at = at or now
+        if at < now:
+            self.check_overlap(at, now)
+        restarted = self.status == "COMPLETED" and self.task_id
+        with transaction.atomic():
+            self.transition(
+                ~models.Q(status="IN_PROGRESS"),
+                start_time=at,
+                end_time=None,
+                duration=None,
+                status="IN_PROGRESS",
+            )
+            if restarted:
+                Task = apps.get_model("tasks", "Task")
+                Task.objects.filter(pk=self.task_id).sync_stopwatch_totals()
+            self.publish_timer_event("start")
+
+    def stop_stopwatch(self, at=None):
         """停止正计时"""
         if not self.start_time:
             raise ValidationError("没有正在进行的计时")
+        now = timezone.now()
+        end_time = at or now
+        if end_time < self.start_time:
+            raise ValidationError("结束时间不能早于开始时间")
+        if end_time < now:
+            # 离线补报的结束时间，最终的区间同样不能与其他正计时重叠
+            self.check_overlap(self.start_time, end_time)
 
-        self.end_time = timezone.now()
-        self.duration = self.end_time - self.start_time
-        self.status = "COMPLETED"
-        self.save()
-
-    def get_remaining_time(self):
-        """获取剩余时间"""
-        if self.timer_type == "POMODORO":
-            settings = AppSettings.objects.get(user=self.user)
-            if self.is_break:
-                if self.is_long_break:
-                    total_break_time = settings.long_break_duration
-                else:
-                    total_break_time = settings.short_break_duration
-                if self.current_break_start:
-                    elapsed = timezone.now() - self.current_break_start
-                    return max(total_break_time - elapsed, timezone.timedelta())
-            else:
-                total_pomodoro_time = settings.pomodoro_duration
-                if self.current_pomodoro_start:
-                    elapsed = timezone.now() - self.current_pomodoro_start
-                    return max(total_pomodoro_time - elapsed, timezone.timedelta())
-        return None
+        with transaction.atomic():
+            # 开始时间也作为条件，保证时长按数据库中的开始时间计算
+            self.transition(
+                models.Q(status="IN_PROGRESS", start_time=self.start_time),
+                (FocusSession.STOPWATCH, self.start_time, end_time),
+                end_time=end_time,
+                duration=end_time - self.start_time,
+                status="COMPLETED",
+            )
+            if self.task_id:
+                Task = apps.get_model("tasks", "Task")
+                Task.objects.filter(pk=self.task_id).add_focus(
+                    stopwatch_seconds=int(self.duration.total_seconds()),
+                    focused_at=self.end_time,
+                )
+            self.publish_timer_event("stop")
 
     def get_elapsed_time(self):
         """获取已用时间"""
-        if self.timer_type == "STOPWATCH" and self.start_time:
-            return timezone.now() - self.start_time
-        return None
+        return stopwatch_elapsed_time(self.start_time, self.end_time, timezone.now(), self.status)
+
+    def get_timer_state(self, now=None):
+        """获取计时状态"""
+        return stopwatch_state(self.start_time, self.end_time, now or timezone.now(), self.status)
 
     def __str__(self):
         return f"{self.title} - {self.duration}"
+
+
+# 类型对应的代理模型
+KIND_MODELS = {model.KIND: model for model in (PomodoroActivity, StopwatchActivity)}
+
+
+class ActiveTimer(models.Model):
+    """
+    用户当前正在进行的计时（番茄钟或正计时二选一）
+
+    user 的唯一约束保证每个用户同时最多一个进行中的计时，并发开始时由数据库拒绝后到的请求；
+    查询当前计时只需按 user 唯一索引查一行
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name="active_timer",
+        verbose_name="所属用户",
+    )
+    activity = models.ForeignKey(
+        Activity,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="活动",
+    )
+    started_at = models.DateTimeField(default=timezone.now, verbose_name="开始时间")
+
+    class Meta:
+        verbose_name = "进行中的计时"
+        verbose_name_plural = "进行中的计时"
+
+    @classmethod
+    def claim(cls, activity):
+        """登记为用户的当前计时，用户已有其他进行中的计时时抛出 TimerConflict"""
+        current = (
+            cls.objects.filter(user_id=activity.user_id)
+            .values_list("activity_id", flat=True)
+            .first()
+        )
+        if current is not None:
+            if current == activity.pk:
+                return
+            raise TimerConflict("已有正在进行的计时，请先结束当前计时")
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=activity.user_id, activity_id=activity.pk)
+        except IntegrityError:
+            # 并发开始的另一个计时先登记成功
+            raise TimerConflict("已有正在进行的计时，请先结束当前计时")
+
+    @classmethod
+    def release(cls, activity):
+        cls.objects.filter(activity_id=activity.pk).delete()
+
+
+class TimerEventReceipt(models.Model):
+    """
+    已处理的离线计时事件，按客户端生成的幂等键去重。
+    重放同一批事件时直接返回首次处理的结果（包括错误信息），不会重复执行
+    """
+
+    STATUS_CHOICES = [
+        ("applied", "已执行"),
+        ("conflict", "状态冲突"),
+        ("invalid", "无效"),
+        ("not_found", "活动不存在"),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timer_event_receipts",
+        verbose_name="所属用户",
+    )
+    key = models.CharField(max_length=64, verbose_name="幂等键")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, verbose_name="处理结果")
+    errors = models.JSONField(null=True, blank=True, verbose_name="错误信息")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="处理时间")
+
+    class Meta:
+        verbose_name = "离线计时事件"
+        verbose_name_plural = "离线计时事件"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="timer_event_receipt_unique_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} - {self.status}"
+
+
+class FocusSessionQuerySet(models.QuerySet):
+    def started_between(self, start, end):
+        """开始时间在 [start, end) 内的区间，走 (user, start) 索引；跨越边界的区间整体计入开始的一侧"""
+        return self.filter(start__gte=start, start__lt=end)
+
+    def totals(self):
+        """按类型汇总的秒数，如 {"POMODORO": 3000, "STOPWATCH": 600}"""
+        return dict(self.order_by().values_list("kind").annotate(total=models.Sum("seconds")))
+
+    def daily_totals(self):
+        """按开始日期和类型汇总的秒数：{日期: {类型: 秒数}}"""
+        rows = (
+            self.order_by()
+            .annotate(day=TruncDate("start"))
+            .values_list("day", "kind")
+            .annotate(total=models.Sum("seconds"))
+        )
+        result = {}
+        for day, kind, total in rows:
+            result.setdefault(day, {})[kind] = total
+        return result
+
+
+class FocusSession(models.Model):
+    """
+    计时区间的追加日志：番茄钟、休息和正计时的每个阶段结束时写入一行，之后不再修改。
+    统计都是按 (user, start) 索引的范围聚合，不再按番茄钟个数估算时长
+    """
+
+    POMODORO = "POMODORO"
+    SHORT_BREAK = "SHORT_BREAK"
+    LONG_BREAK = "LONG_BREAK"
+    STOPWATCH = "STOPWATCH"
+    KIND_CHOICES = [
+        (POMODORO, "番茄钟"),
+        (SHORT_BREAK, "短休息"),
+        (LONG_BREAK, "长休息"),
+        (STOPWATCH, "正计时"),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="focus_sessions",
+        verbose_name="所属用户",
+    )
+    activity = models.ForeignKey(
+        Activity,
+        on_delete=models.CASCADE,
+        related_name="focus_sessions",
+        verbose_name="活动",
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="类型")
+    start = models.DateTimeField(verbose_name="开始时间")
+    end = models.DateTimeField(verbose_name="结束时间")
+    seconds = models.PositiveIntegerField(verbose_name="时长（秒）")
+    # 由旧数据按番茄钟个数回填，区间为估算值
+    estimated = models.BooleanField(default=False, verbose_name="估算")
+
+    objects = FocusSessionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "计时区间"
+        verbose_name_plural = "计时区间"
+        indexes = [
+            models.Index(fields=["user", "start"]),  # 按时间范围统计
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.start} - {self.end}"
+
+    @classmethod
+    def build(cls, activity, kind, start, end, estimated=False):
+        return cls(
+            user_id=activity.user_id,
+            kind=kind,
+            start=start,
+            end=end,
+            seconds=int((end - start).total_seconds()),
+            estimated=estimated,
+            activity_id=activity.pk,
+        )
+
+    @classmethod
+    def log(cls, activity, kind, start, end):
+        cls.build(activity, kind, start, end).save()
@@ -0,0 +1,75 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from .models import (
+    Activity,
+    TimerConflict,
+    TimerEventReceipt,
+    TransitionConflict,
+)
+
+ACTIONS = {
+    ("pomodoro", "start"): lambda activity, at: activity.start_pomodoro(at=at),
+    ("pomodoro", "break"): lambda activity, at: activity.start_break(False, at=at),
+    ("pomodoro", "long_break"): lambda activity, at: activity.start_break(True, at=at),
+    ("pomodoro", "complete"): lambda activity, at: activity.complete_pomodoro(at=at),
+    ("stopwatch", "start"): lambda activity, at: activity.start_stopwatch(at=at),
+    ("stopwatch", "stop"): lambda activity, at: activity.stop_stopwatch(at=at),
+}
+
+
+def apply_timer_events(user, events):
+    """
+    在一个事务内按顺序执行一批离线计时事件，返回以幂等键为键的结果表。
+
+    - 已处理过的键（包括同一批中重复的键）不再执行，原样返回首次处理的结果和错误信息并标记 replayed
+    - 待执行事件涉及的活动一次查询加载，限定为当前用户的活动，类型须与事件一致
+    - 每个事件在单独的保存点中执行，失败的事件回滚自身，不影响同一批的其他事件
+    """
+    results = {}
+    with transaction.atomic():
+        processed = TimerEventReceipt.objects.filter(
+            user=user, key__in=[event["key"] for event in events]
+        ).values_list("key", "status", "errors")
+        for key, status, errors in processed:
+            results[key] = {"status": status, "replayed": True}
+            if errors is not None:
+                results[key]["errors"] = errors
+
+        pending = [event for event in events if event["key"] not in results]
+        ids = {event["activity_id"] for event in pending}
+        activities = Activity.objects.filter(user=user).in_bulk(ids) if ids else {}
+
+        receipts = []
+        for event in pending:
+            key = event["key"]
+            if key in results:
+                # 同一批中重复的键
+                continue
+            activity = activities.get(event["activity_id"])
+            result = {"status": "applied"}
+            if activity is None or activity.kind != event["kind"].upper():
+                result = {"status": "not_found"}
+            else:
+                try:
+                    with transaction.atomic():
+                        ACTIONS[event["kind"], event["action"]](activity, event["at"])
+                except (TimerConflict, TransitionConflict) as e:
+                    result = {"status": "conflict", "errors": str(e)}
+                except ValidationError as e:
+                    result = {"status": "invalid", "errors": e.messages}
+                if result["status"] != "applied":
+                    # 保存点已回滚，实例上可能残留未写入的值
+                    activity.refresh_from_db()
+            results[key] = result
+            receipts.append(
+                TimerEventReceipt(
+                    user=user, key=key, status=result["status"], errors=result.get("errors")
+                )
+            )
+
+        try:
+            TimerEventReceipt.objects.bulk_create(receipts)
+        except IntegrityError:
+            # 同一批事件正由另一个请求处理，整批回滚，由客户端稍后重试
+            raise TransitionConflict("相同的计时事件正在处理中，请稍后重试")
+    return results
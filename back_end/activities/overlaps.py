@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+from django.db.models import Q
+from django.utils import timezone
+from .models import StopwatchActivity
+
+# 相互重叠的一组正计时：活动ID、合并后的起止时间，以及被重复计算的时长
+OverlapGroup = namedtuple("OverlapGroup", ("activity_ids", "start", "end", "overlap"))
+
+
+def overlap_groups(intervals):
+    """
+    扫描按开始时间排序的 (id, 开始, 结束) 区间，产出直接或经由其他区间相互重叠的区间组。
+    只保留当前组的最晚结束时间，一次线性扫描，总开销由排序决定（O(n log n)）；
+    首尾相接的区间不算重叠
+    """
+    ids = []
+    start = end = total = None
+    for pk, interval_start, interval_end in intervals:
+        if ids and interval_start < end:
+            ids.append(pk)
+            end = max(end, interval_end)
+            total += interval_end - interval_start
+            continue
+        if len(ids) > 1:
+            yield OverlapGroup(ids, start, end, total - (end - start))
+        ids = [pk]
+        start, end = interval_start, interval_end
+        total = interval_end - interval_start
+    if len(ids) > 1:
+        yield OverlapGroup(ids, start, end, total - (end - start))
+
+
+def stopwatch_intervals(queryset, now=None):
+    """
+    查询集中有开始时间的正计时按 (开始时间, id) 排序的区间，进行中的以当前时间为结束。
+    以流的方式读取，内存占用与记录数无关
+    """
+    now = now or timezone.now()
+    rows = (
+        queryset.filter(start_time__isnull=False)
+        .filter(Q(end_time__isnull=False) | Q(status="IN_PROGRESS"))
+        .order_by("start_time", "id")
+        .values_list("id", "start_time", "end_time")
+    )
+    for pk, start, end in rows.iterator(chunk_size=2000):
+        yield pk, start, end or max(now, start)
+
+
+def find_overlapping(user_id, start, end, exclude_id=None):
+    """与 [start, end) 重叠的该用户的正计时，进行中的视为持续到现在"""
+    ends_after = Q(end_time__gt=start)
+    if start < timezone.now():
+        ends_after |= Q(end_time__isnull=True, status="IN_PROGRESS")
+    queryset = StopwatchActivity.objects.filter(ends_after, user_id=user_id, start_time__lt=end)
+    if exclude_id is not None:
+        queryset = queryset.exclude(pk=exclude_id)
+    return queryset
+
+
+def batch_overlaps(user_id, intervals, now=None):
+    """
+    一批待写入的 (id, 开始, 结束) 区间与该用户已存储的其他正计时一起扫描，结束为 None 的视为持续到现在。
+    返回 {批内的ID: 与之重叠的一个ID}；批内之间的重叠同样计入，已存储记录之间原有的重叠不计
+    """
+    now = now or timezone.now()
+    intervals = [
+        (pk, start, end or now) for pk, start, end in intervals if (end or now) > start
+    ]
+    if not intervals:
+        return {}
+    batch_ids = {pk for pk, _, _ in intervals}
+    stored = find_overlapping(
+        user_id,
+        min(start for _, start, _ in intervals),
+        max(end for _, _, end in intervals),
+    ).exclude(pk__in=batch_ids)
+    merged = sorted(
+        [*intervals, *stopwatch_intervals(stored, now)],
+        key=lambda interval: (interval[1], interval[0]),
+    )
+    conflicts = {}
+    for group in overlap_groups(merged):
+        for pk in group.activity_ids:
+            if pk in batch_ids:
+                conflicts[pk] = next(other for other in group.activity_ids if other != pk)
+    return conflicts
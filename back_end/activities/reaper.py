@@ -0,0 +1,149 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from app_settings.cache import get_timer_settings
+from data_stats.rollup import mark_sessions_dirty
+from schedule_system.periodic import start_periodic
+from tasks.models import Task
+from .models import ActiveTimer, Activity, FocusSession
+
+logger = logging.getLogger(__name__)
+
+FOCUS_KINDS = (FocusSession.POMODORO, FocusSession.STOPWATCH)
+
+# 结束番茄钟阶段时清空的字段
+PHASE_RESET = {
+    "current_pomodoro_start": None,
+    "current_break_start": None,
+    "is_break": False,
+    "is_long_break": False,
+}
+
+
+def stale_phase(activity, now, stopwatch_cap, grace):
+    """
+    遗留的计时返回 (区间类型, 开始时间, 封顶的时长)，否则返回 None。
+    正计时超过最长时长；番茄钟或休息超过用户设置的时长再加上宽限时间
+    """
+    if activity.kind == Activity.STOPWATCH:
+        if activity.start_time and activity.start_time <= now - stopwatch_cap:
+            return FocusSession.STOPWATCH, activity.start_time, stopwatch_cap
+        return None
+
+    pomodoro, short_break, long_break = get_timer_settings(activity.user_id).durations
+    if activity.is_break:
+        kind = FocusSession.LONG_BREAK if activity.is_long_break else FocusSession.SHORT_BREAK
+        start = activity.current_break_start
+        length = long_break if activity.is_long_break else short_break
+    else:
+        kind, start, length = FocusSession.POMODORO, activity.current_pomodoro_start, pomodoro
+    length = timedelta(minutes=length)
+    if start and start <= now - length - grace:
+        return kind, start, length
+    return None
+
+
+def _close_chunk(ids, now, stopwatch_cap, grace):
+    """锁定一块候选活动，关闭其中遗留的计时，返回关闭的活动列表"""
+    with transaction.atomic():
+        activities = list(
+            Activity.objects.select_for_update().filter(id__in=ids, status="IN_PROGRESS")
+        )
+        groups = {"stopwatch": [], "pomodoro": [], "break": []}
+        sessions = []
+        for activity in activities:
+            phase = stale_phase(activity, now, stopwatch_cap, grace)
+            if phase is None:
+                continue
+            kind, start, length = phase
+            if kind == FocusSession.STOPWATCH:
+                groups["stopwatch"].append(activity)
+            elif kind == FocusSession.POMODORO:
+                groups["pomodoro"].append(activity)
+            else:
+                groups["break"].append(activity)
+            sessions.append(FocusSession.build(activity, kind, start, start + length))
+
+        def close(group, **changes):
+            Activity.objects.filter(id__in=[a.id for a in group]).update(
+                status="COMPLETED", updated_at=now, **changes
+            )
+
+        # 每类一条 UPDATE；番茄钟按完成一个计数，时长由计时区间按设置封顶
+        close(groups["stopwatch"], end_time=F("start_time") + stopwatch_cap, duration=stopwatch_cap)
+        close(groups["pomodoro"], pomodoro_count=F("pomodoro_count") + 1, **PHASE_RESET)
+        close(groups["break"], **PHASE_RESET)
+        closed = groups["stopwatch"] + groups["pomodoro"] + groups["break"]
+        if not closed:
+            return []
+
+        FocusSession.objects.bulk_create(sessions)
+        mark_sessions_dirty(sessions)
+        ActiveTimer.objects.filter(activity_id__in=[a.id for a in closed]).delete()
+        # 任务的最近专注时间取关闭的番茄钟或正计时封顶后的结束时间
+        task_ids = {a.id: a.task_id for a in closed}
+        focused_at = {}
+        for session in sessions:
+            task_id = task_ids[session.activity_id]
+            if session.kind in FOCUS_KINDS and task_id:
+                focused_at[task_id] = max(focused_at.get(task_id, session.end), session.end)
+        Task.objects.filter(
+            id__in={a.task_id for a in groups["stopwatch"]}
+        ).sync_stopwatch_totals(focused_at)
+        Task.objects.filter(
+            id__in={a.task_id for a in groups["pomodoro"]}
+        ).sync_pomodoro_totals(focused_at)
+
+        for activity in groups["stopwatch"]:
+            activity.end_time = activity.start_time + stopwatch_cap
+            activity.duration = stopwatch_cap
+        for activity in groups["pomodoro"]:
+            activity.pomodoro_count += 1
+        for activity in closed:
+            activity.status = "COMPLETED"
+            if activity.kind == Activity.POMODORO:
+                for name, value in PHASE_RESET.items():
+                    setattr(activity, name, value)
+            activity.publish_timer_event("reaped")
+    return closed
+
+
+def reap_stale_timers(now=None, batch_size=500):
+    """
+    关闭浏览器关闭后遗留在进行中的计时，返回关闭的活动列表。
+
+    按 (status, updated_at) 索引只扫描长时间没有变化的进行中活动（每次状态转换都会
+    更新 updated_at），按主键分块加锁检查，每块在一个事务内用几条 UPDATE 关闭
+    """
+    now = now or timezone.now()
+    stopwatch_cap = timedelta(seconds=settings.STALE_STOPWATCH_MAX_SECONDS)
+    grace = timedelta(seconds=settings.STALE_POMODORO_GRACE_SECONDS)
+    candidates = Activity.objects.filter(
+        status="IN_PROGRESS", updated_at__lte=now - min(stopwatch_cap, grace)
+    ).order_by("id")
+
+    closed = []
+    last_id = 0
+    while True:
+        ids = list(candidates.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return closed
+        last_id = ids[-1]
+        closed += _close_chunk(ids, now, stopwatch_cap, grace)
+
+
+def _reap_and_log(batch_size):
+    closed = reap_stale_timers(batch_size=batch_size)
+    for activity in closed:
+        logger.info(
+            "已关闭遗留的计时：%s #%s（用户 %s）", activity.kind, activity.pk, activity.user_id
+        )
+
+
+def start_timer_reaper(interval, batch_size=500):
+    """启动进程内的遗留计时清理线程（每个进程只启动一次）"""
+    return start_periodic("timer-reaper", interval, lambda: _reap_and_log(batch_size))
@@ -1,10 +1,28 @@
+from django.utils import timezone
 from rest_framework import serializers
+from app_settings.cache import get_timer_settings
 from tasks.models import Task
-from .models import PomodoroActivity, StopwatchActivity
-from tasks.serializers import TaskSerializer
+from .models import Activity, PomodoroActivity, StopwatchActivity
+from .overlaps import find_overlapping
+from .timers import (
+    pomodoro_elapsed_time,
+    pomodoro_remaining_time,
+    pomodoro_state,
+    stopwatch_elapsed_time,
+    stopwatch_state,
+    timer_state_data,
+)
+from tasks.serializers import TaskSerializer, TaskValuesSerializer
+from schedule_system.bulk import BulkUpdateSerializerMixin
+from schedule_system.fields import DynamicFieldsMixin
+from schedule_system.values import ValuesSerializer
 
 
-class BaseActivitySerializer(serializers.ModelSerializer):
+# 计时状态中的时间与其他时间字段的输出格式一致
+DATETIME_FIELD = serializers.DateTimeField()
+
+
+class BaseActivitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     task = TaskSerializer(read_only=True)
     task_id = serializers.IntegerField(write_only=True)
 
@@ -22,10 +40,16 @@ class BaseActivitySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at", "updated_at", "user"]
 
+    expandable_fields = ("task",)
+
+    def get_timer_state(self, obj):
+        return timer_state_data(obj.get_timer_state(), DATETIME_FIELD.to_representation)
+
 
 class PomodoroActivitySerializer(BaseActivitySerializer):
     remaining_time = serializers.SerializerMethodField()
     elapsed_time = serializers.SerializerMethodField()
+    timer_state = serializers.SerializerMethodField()
 
     class Meta(BaseActivitySerializer.Meta):
         model = PomodoroActivity
@@ -37,8 +61,21 @@ class PomodoroActivitySerializer(BaseActivitySerializer):
             "is_long_break",
             "remaining_time",
             "elapsed_time",
+            "timer_state",
         ]
 
+    field_columns = {
+        # 剩余时间按活动所属用户的番茄钟设置计算
+        "remaining_time": (
+            "user", "is_break", "is_long_break", "current_pomodoro_start", "current_break_start",
+        ),
+        "elapsed_time": ("is_break", "current_pomodoro_start", "current_break_start"),
+        "timer_state": (
+            "user", "is_break", "is_long_break", "current_pomodoro_start", "current_break_start",
+            "pomodoro_count",
+        ),
+    }
+
     def get_remaining_time(self, obj):
         return obj.get_remaining_time()
 
@@ -46,8 +83,9 @@ class PomodoroActivitySerializer(BaseActivitySerializer):
         return obj.get_elapsed_time()
 
 
-class StopwatchActivitySerializer(BaseActivitySerializer):
+class StopwatchActivitySerializer(BulkUpdateSerializerMixin, BaseActivitySerializer):
     elapsed_time = serializers.SerializerMethodField()
+    timer_state = serializers.SerializerMethodField()
 
     class Meta(BaseActivitySerializer.Meta):
         model = StopwatchActivity
@@ -56,20 +94,52 @@ class StopwatchActivitySerializer(BaseActivitySerializer):
             "end_time",
             "duration",
             "elapsed_time",
+            "timer_state",
         ]
 
+    field_columns = {
+        "elapsed_time": ("start_time", "end_time", "status"),
+        "timer_state": ("start_time", "end_time", "status"),
+    }
+
     def get_elapsed_time(self, obj):
         return obj.get_elapsed_time()
 
     def validate(self, data):
         if "task_id" in data:
-            task = Task.objects.filter(
-                id=data["task_id"], user=self.context["request"].user
-            ).first()
+            # 批量更新时由视图预先一次性查出当前用户的任务ID
+            owned_task_ids = self.context.get("owned_task_ids")
+            if owned_task_ids is not None:
+                task = data["task_id"] in owned_task_ids
+            else:
+                task = Task.objects.filter(
+                    id=data["task_id"], user=self.context["request"].user
+                ).first()
             if not task:
                 raise serializers.ValidationError({
                     'task_id': '任务不存在或不属于当前用户'
                 })
+
+        if ("start_time" in data or "end_time" in data) and not self.context.get("batch_overlaps"):
+            # 重叠的正计时会在统计中重复计算时长；没有结束时间的视为持续到现在。
+            # 批量更新时由视图对整批统一检查
+            start = data.get("start_time", getattr(self.instance, "start_time", None))
+            end = data.get("end_time", getattr(self.instance, "end_time", None)) or timezone.now()
+            if start and end > start:
+                overlapping = (
+                    find_overlapping(
+                        self.context["request"].user.pk,
+                        start,
+                        end,
+                        exclude_id=getattr(self.instance, "pk", None),
+                    )
+                    .values_list("id", flat=True)
+                    .first()
+                )
+                if overlapping is not None:
+                    raise serializers.ValidationError({
+                        'start_time': f'与已有的正计时记录（ID {overlapping}）时间重叠'
+                    })
         return data
 
     def create(self, validated_data):
@@ -78,3 +148,119 @@ class StopwatchActivitySerializer(BaseActivitySerializer):
         validated_data["task"] = task
         validated_data["user"] = self.context["request"].user
         return super().create(validated_data)
+
+
+# 各类型活动对应的序列化器
+ACTIVITY_SERIALIZERS = {
+    Activity.POMODORO: PomodoroActivitySerializer,
+    Activity.STOPWATCH: StopwatchActivitySerializer,
+}
+
+
+class ActivityTimelineSerializer(serializers.BaseSerializer):
+    """时间线中的活动：输出与对应类型的接口一致，另加 kind 字段"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._serializers = {}
+
+    def to_representation(self, instance):
+        # 同一列表中每种类型只创建一个序列化器
+        serializer = self._serializers.get(instance.kind)
+        if serializer is None:
+            serializer = ACTIVITY_SERIALIZERS[instance.kind](context=self.context)
+            self._serializers[instance.kind] = serializer
+        return {"kind": instance.kind, **serializer.to_representation(instance)}
+
+
+class ActivityValuesSerializer(ValuesSerializer):
+    """活动列表快速序列化器的基类，整个列表共用同一个当前时间"""
+
+    nested = {"task": TaskValuesSerializer}
+
+    def __init__(self, context=None, compiled=None):
+        super().__init__(context, compiled)
+        self.now = timezone.now()
+
+
+class PomodoroActivityValuesSerializer(ActivityValuesSerializer):
+    serializer_class = PomodoroActivitySerializer
+
+    def __init__(self, context=None, compiled=None):
+        super().__init__(context, compiled)
+        self._timer_settings = None
+
+    def get_timer_settings(self):
+        # 列表只包含当前用户的活动，时长设置只需读取一次
+        if self._timer_settings is None:
+            self._timer_settings = get_timer_settings(self.context["request"].user.pk)
+        return self._timer_settings
+
+    def get_remaining_time(self, row, prefix):
+        if not (row[prefix + "current_pomodoro_start"] or row[prefix + "current_break_start"]):
+            return None
+        return pomodoro_remaining_time(
+            row[prefix + "is_break"],
+            row[prefix + "is_long_break"],
+            row[prefix + "current_pomodoro_start"],
+            row[prefix + "current_break_start"],
+            self.get_timer_settings().durations,
+            self.now,
+        )
+
+    def get_elapsed_time(self, row, prefix):
+        return pomodoro_elapsed_time(
+            row[prefix + "is_break"],
+            row[prefix + "current_pomodoro_start"],
+            row[prefix + "current_break_start"],
+            self.now,
+        )
+
+    def get_timer_state(self, row, prefix):
+        state = pomodoro_state(
+            row[prefix + "is_break"],
+            row[prefix + "is_long_break"],
+            row[prefix + "current_pomodoro_start"],
+            row[prefix + "current_break_start"],
+            row[prefix + "pomodoro_count"],
+            self.get_timer_settings(),
+            self.now,
+        )
+        return timer_state_data(state, self.format_datetime)
+
+
+class StopwatchActivityValuesSerializer(ActivityValuesSerializer):
+    serializer_class = StopwatchActivitySerializer
+
+    def get_elapsed_time(self, row, prefix):
+        return stopwatch_elapsed_time(
+            row[prefix + "start_time"], row[prefix + "end_time"], self.now, row[prefix + "status"]
+        )
+
+    def get_timer_state(self, row, prefix):
+        state = stopwatch_state(
+            row[prefix + "start_time"], row[prefix + "end_time"], self.now, row[prefix + "status"]
+        )
+        return timer_state_data(state, self.format_datetime)
+
+
+class TimerEventSerializer(serializers.Serializer):
+    """离线期间在客户端排队的计时操作"""
+
+    ACTIONS = {
+        "pomodoro": ("start", "break", "long_break", "complete"),
+        "stopwatch": ("start", "stop"),
+    }
+
+    key = serializers.CharField(max_length=64)
+    kind = serializers.ChoiceField(choices=list(ACTIONS))
+    activity_id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=["start", "break", "long_break", "complete", "stop"])
+    at = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs["action"] not in self.ACTIONS[attrs["kind"]]:
+            raise serializers.ValidationError({"action": "该计时类型不支持此操作"})
+        # 客户端时钟超前时按服务器当前时间处理
+        attrs["at"] = min(attrs["at"], timezone.now())
+        return attrs
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from tasks.models import Task
+from .models import ActiveTimer, PomodoroActivity, StopwatchActivity, TimerConflict
+
+User = get_user_model()
+
+
+class ActiveTimerTests(APITestCase):
+    url = "/api/timers/active/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        self.pomodoro = PomodoroActivity.objects.create(
+            title="番茄钟", user=self.user, task=self.task
+        )
+        self.stopwatch = StopwatchActivity.objects.create(
+            title="正计时", user=self.user, task=self.task
+        )
+
+    def test_no_active_timer(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"kind": None, "activity": None})
+
+    def test_active_timer_single_query(self):
+        """测试返回进行中的活动及计时状态，只需一次查询"""
+        self.client.post(f"/api/pomodoro-activities/{self.pomodoro.id}/start_pomodoro/")
+        self.client.get(self.url)  # 预热设置缓存
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["kind"], "POMODORO")
+        self.assertEqual(response.data["activity"]["id"], self.pomodoro.id)
+        self.assertEqual(response.data["activity"]["task"]["title"], "任务")
+        self.assertEqual(response.data["activity"]["timer_state"]["phase"], "POMODORO")
+
+    def test_second_timer_rejected(self):
+        """测试已有进行中的计时时开始另一个计时返回409"""
+        response = self.client.post(
+            f"/api/pomodoro-activities/{self.pomodoro.id}/start_pomodoro/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(
+            f"/api/stopwatch-activities/{self.stopwatch.id}/start_stopwatch/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.stopwatch.refresh_from_db()
+        self.assertEqual(self.stopwatch.status, "PENDING")
+
+        # 同一活动进入休息不受影响
+        response = self.client.post(
+            f"/api/pomodoro-activities/{self.pomodoro.id}/start_break/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_finishing_releases_timer(self):
+        self.stopwatch.start_stopwatch()
+        self.assertEqual(ActiveTimer.objects.get(user=self.user).activity_id, self.stopwatch.id)
+        self.stopwatch.stop_stopwatch()
+        self.assertFalse(ActiveTimer.objects.filter(user=self.user).exists())
+
+        self.pomodoro.start_pomodoro()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["kind"], "POMODORO")
+        self.pomodoro.delete()
+        self.assertFalse(ActiveTimer.objects.filter(user=self.user).exists())
+
+    def test_update_to_in_progress_rejected(self):
+        self.pomodoro.start_pomodoro()
+        response = self.client.patch(
+            f"/api/stopwatch-activities/{self.stopwatch.id}/",
+            {"status": "IN_PROGRESS"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.stopwatch.status = "IN_PROGRESS"
+        with self.assertRaises(TimerConflict):
+            self.stopwatch.save()
+
+    def test_rebuild_command(self):
+        """测试按进行中的活动重建登记"""
+        PomodoroActivity.objects.filter(id=self.pomodoro.id).update(status="IN_PROGRESS")
+        call_command("rebuild_active_timers", stdout=StringIO())
+        self.assertEqual(ActiveTimer.objects.get(user=self.user).activity_id, self.pomodoro.id)
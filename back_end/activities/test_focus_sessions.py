@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from app_settings.models import AppSettings
+from tasks.models import Task
+from .models import FocusSession, PomodoroActivity, StopwatchActivity, TransitionConflict
+
+User = get_user_model()
+
+
+class FocusSessionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        AppSettings.objects.create(user=self.user, pomodoro_duration=25)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        self.pomodoro = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        self.stopwatch = StopwatchActivity.objects.create(title="正计时", user=self.user, task=self.task)
+        self.start = timezone.now() - timedelta(hours=5)
+
+    def at(self, minutes):
+        return self.start + timedelta(minutes=minutes)
+
+    def sessions(self):
+        return list(
+            FocusSession.objects.order_by("start").values_list("kind", "start", "end", "seconds")
+        )
+
+    def test_each_phase_logged(self):
+        """测试番茄钟、休息和正计时的每个阶段结束时记录准确的区间"""
+        self.pomodoro.start_pomodoro(at=self.at(0))
+        self.pomodoro.start_break(at=self.at(24))
+        self.pomodoro.start_break(True, at=self.at(26))  # 切换为长休息
+        self.pomodoro.start_pomodoro(at=self.at(40))
+        self.pomodoro.complete_pomodoro(at=self.at(65))
+        self.stopwatch.start_stopwatch(at=self.at(70))
+        self.stopwatch.stop_stopwatch(at=self.at(100))
+
+        self.assertEqual(
+            self.sessions(),
+            [
+                (FocusSession.POMODORO, self.at(0), self.at(24), 24 * 60),
+                (FocusSession.SHORT_BREAK, self.at(24), self.at(26), 2 * 60),
+                (FocusSession.LONG_BREAK, self.at(26), self.at(40), 14 * 60),
+                (FocusSession.POMODORO, self.at(40), self.at(65), 25 * 60),
+                (FocusSession.STOPWATCH, self.at(70), self.at(100), 30 * 60),
+            ],
+        )
+
+    def test_failed_transition_not_logged(self):
+        self.pomodoro.start_pomodoro(at=self.at(0))
+        stale = PomodoroActivity.objects.get(pk=self.pomodoro.pk)
+        self.pomodoro.complete_pomodoro(at=self.at(25))
+        with self.assertRaises(TransitionConflict):
+            stale.complete_pomodoro(at=self.at(26))
+        self.assertEqual(FocusSession.objects.count(), 1)
+
+    def test_range_aggregation(self):
+        self.pomodoro.start_pomodoro(at=self.at(0))
+        self.pomodoro.complete_pomodoro(at=self.at(25))
+        self.stopwatch.start_stopwatch(at=self.at(30))
+        self.stopwatch.stop_stopwatch(at=self.at(40))
+
+        sessions = FocusSession.objects.filter(user=self.user)
+        self.assertEqual(
+            sessions.started_between(self.at(0), self.at(60)).totals(),
+            {FocusSession.POMODORO: 25 * 60, FocusSession.STOPWATCH: 10 * 60},
+        )
+        self.assertEqual(
+            sessions.started_between(self.at(1), self.at(60)).totals(),
+            {FocusSession.STOPWATCH: 10 * 60},
+        )
+        daily = sessions.daily_totals()
+        self.assertEqual(sum(sum(kinds.values()) for kinds in daily.values()), 35 * 60)
+
+    def test_backfill(self):
+        """测试按旧数据回填：正计时使用记录的时长，番茄钟按设置时长估算，重复执行不重复回填"""
+        stopwatch = StopwatchActivity.objects.create(
+            title="旧正计时",
+            user=self.user,
+            status="COMPLETED",
+            start_time=self.at(0),
+            end_time=self.at(50),
+            duration=timedelta(minutes=45),
+        )
+        pomodoro = PomodoroActivity.objects.create(
+            title="旧番茄钟", user=self.user, pomodoro_count=3, status="COMPLETED"
+        )
+
+        for _ in range(2):
+            call_command("backfill_focus_sessions", batch_size=1, stdout=StringIO())
+
+        (session,) = FocusSession.objects.filter(activity=stopwatch)
+        self.assertEqual(session.seconds, 45 * 60)
+        self.assertFalse(session.estimated)
+
+        sessions = FocusSession.objects.filter(activity=pomodoro).order_by("start")
+        self.assertEqual(len(sessions), 3)
+        self.assertTrue(all(session.estimated for session in sessions))
+        self.assertEqual(sessions[2].end, pomodoro.updated_at)
+        self.assertEqual(sessions[1].end, sessions[2].start)
+        self.assertEqual({session.seconds for session in sessions}, {25 * 60})
@@ -0,0 +1,188 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from app_settings.models import AppSettings
+from tasks.models import Task
+from .models import ActiveTimer, PomodoroActivity, StopwatchActivity, TimerEventReceipt
+
+User = get_user_model()
+
+
+class TimerEventBatchTests(APITestCase):
+    url = "/api/activities/events/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        AppSettings.objects.create(user=self.user, pomodoro_duration=25)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        self.pomodoro = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        self.stopwatch = StopwatchActivity.objects.create(title="正计时", user=self.user, task=self.task)
+        self.start = timezone.now() - timedelta(hours=3)
+
+    def event(self, key, kind, action, minutes, activity=None):
+        activity = activity or (self.pomodoro if kind == "pomodoro" else self.stopwatch)
+        return {
+            "key": key,
+            "kind": kind,
+            "activity_id": activity.id,
+            "action": action,
+            "at": (self.start + timedelta(minutes=minutes)).isoformat(),
+        }
+
+    def day_of_events(self):
+        return [
+            self.event("p1", "pomodoro", "start", 0),
+            self.event("p2", "pomodoro", "break", 25),
+            self.event("p3", "pomodoro", "complete", 30),
+            self.event("s1", "stopwatch", "start", 40),
+            self.event("s2", "stopwatch", "stop", 100),
+            self.event("p4", "pomodoro", "start", 110),
+            self.event("p5", "pomodoro", "complete", 135),
+        ]
+
+    def test_replay_in_one_request(self):
+        """测试一次请求按顺序执行多个活动的离线事件，时间使用客户端时间"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"events": self.day_of_events()}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["applied"], 7)
+        self.assertEqual(
+            {result["status"] for result in response.data["results"].values()}, {"applied"}
+        )
+
+        self.pomodoro.refresh_from_db()
+        self.assertEqual(self.pomodoro.pomodoro_count, 2)
+        self.stopwatch.refresh_from_db()
+        self.assertEqual(self.stopwatch.start_time, self.start + timedelta(minutes=40))
+        self.assertEqual(self.stopwatch.duration, timedelta(hours=1))
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.pomodoro_count, 2)
+        self.assertEqual(self.task.stopwatch_seconds, 3600)
+        self.assertEqual(self.task.focused_seconds, 2 * 25 * 60 + 3600)
+        self.assertFalse(ActiveTimer.objects.exists())
+
+    def test_retry_is_idempotent(self):
+        """测试重试整批请求（包括部分新增事件）不会重复执行"""
+        events = self.day_of_events()
+        self.client.post(self.url, {"events": events[:3]}, format="json")
+
+        response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["applied"], 4)
+        self.assertTrue(response.data["results"]["p1"]["replayed"])
+        self.assertEqual(response.data["results"]["p1"]["status"], "applied")
+
+        self.pomodoro.refresh_from_db()
+        self.assertEqual(self.pomodoro.pomodoro_count, 2)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.pomodoro_count, 2)
+        self.assertEqual(TimerEventReceipt.objects.filter(user=self.user).count(), 7)
+
+        with self.assertNumQueries(3):
+            # 全部已处理时只有去重查询（及事务的保存点），不加载活动
+            response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.data["applied"], 0)
+
+    def test_failed_events_do_not_abort_batch(self):
+        """测试冲突、无效和不存在的事件单独回滚并记录结果"""
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="otherpass123"
+        )
+        foreign = PomodoroActivity.objects.create(title="他人", user=other)
+        events = [
+            self.event("a", "pomodoro", "start", 0),
+            self.event("b", "pomodoro", "start", 1),
+            self.event("c", "stopwatch", "start", 2),
+            self.event("d", "pomodoro", "complete", 3, activity=foreign),
+            self.event("e", "stopwatch", "stop", 4),
+            self.event("f", "pomodoro", "complete", 25),
+        ]
+        response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            {key: result["status"] for key, result in results.items()},
+            {
+                "a": "applied",
+                "b": "conflict",
+                "c": "conflict",  # 番茄钟仍在进行，不能同时开始正计时
+                "d": "not_found",
+                "e": "invalid",
+                "f": "applied",
+            },
+        )
+        self.stopwatch.refresh_from_db()
+        self.assertEqual(self.stopwatch.status, "PENDING")
+        self.pomodoro.refresh_from_db()
+        self.assertEqual(self.pomodoro.pomodoro_count, 1)
+
+        # 重放时原样返回首次处理的错误信息
+        replayed = self.client.post(self.url, {"events": events}, format="json").data["results"]
+        for key, result in results.items():
+            self.assertEqual(replayed[key], {**result, "replayed": True})
+        self.assertEqual(replayed["e"]["errors"], ["没有正在进行的计时"])
+
+    def test_invalid_batch_rejected(self):
+        events = self.day_of_events()
+        events[1]["action"] = "stop"
+        response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TimerEventReceipt.objects.exists())
+
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # 请求体不是对象（如直接发送事件列表）
+        for body in ([], self.day_of_events()):
+            response = self.client.post(self.url, body, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_backdated_stopwatch_overlap_rejected(self):
+        """测试离线补报的正计时与已有记录重叠时该事件无效，其余事件照常执行"""
+        other = StopwatchActivity.objects.create(title="另一个正计时", user=self.user, task=self.task)
+        events = [
+            self.event("s1", "stopwatch", "start", 0),
+            self.event("s2", "stopwatch", "stop", 120),
+            self.event("o1", "stopwatch", "start", 60, other),
+            self.event("o2", "stopwatch", "stop", 150, other),
+        ]
+        response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results["s2"]["status"], "applied")
+        self.assertEqual(results["o1"]["status"], "invalid")
+        self.assertIn(f"ID {self.stopwatch.id}", results["o1"]["errors"][0])
+        self.assertEqual(results["o2"]["status"], "invalid")
+        other.refresh_from_db()
+        self.assertIsNone(other.start_time)
+
+        # 结束时间补报到已有记录之中同样无效，开始时间直接写入以跳过开始时的检查
+        StopwatchActivity.objects.filter(pk=other.pk).update(
+            status="IN_PROGRESS", start_time=self.start - timedelta(hours=1)
+        )
+        events = [
+            self.event("o3", "stopwatch", "stop", 30, other),
+            self.event("o4", "stopwatch", "stop", -30, other),
+        ]
+        response = self.client.post(self.url, {"events": events}, format="json")
+        results = response.data["results"]
+        self.assertEqual((results["o3"]["status"], results["o4"]["status"]), ("invalid", "applied"))
+        response = self.client.get("/api/stopwatch-activities/overlaps/")
+        self.assertEqual(response.data["overlap_seconds"], 0)
+
+    def test_future_client_time_clamped(self):
+        event = self.event("k", "stopwatch", "start", 0)
+        event["at"] = (timezone.now() + timedelta(hours=1)).isoformat()
+        self.client.post(self.url, {"events": [event]}, format="json")
+        self.stopwatch.refresh_from_db()
+        self.assertLessEqual(self.stopwatch.start_time, timezone.now())
@@ -0,0 +1,220 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from tasks.models import Task
+from .models import StopwatchActivity
+from .overlaps import overlap_groups
+
+User = get_user_model()
+
+
+def brute_force_overlapping_ids(intervals):
+    """两两比较，作为扫描结果的对照"""
+    ids = set()
+    for i, (a, a_start, a_end) in enumerate(intervals):
+        for b, b_start, b_end in intervals[i + 1:]:
+            if a_start < b_end and b_start < a_end:
+                ids.update((a, b))
+    return ids
+
+
+class OverlapSweepTests(SimpleTestCase):
+    base = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+    def random_intervals(self, count, seed):
+        rng = random.Random(seed)
+        intervals = []
+        for pk in range(count):
+            start = self.base + timedelta(minutes=rng.randrange(count * 10))
+            intervals.append((pk, start, start + timedelta(minutes=rng.randrange(1, 30))))
+        return sorted(intervals, key=lambda interval: (interval[1], interval[0]))
+
+    def test_matches_pairwise_comparison(self):
+        for seed in range(20):
+            intervals = self.random_intervals(200, seed)
+            groups = list(overlap_groups(intervals))
+            self.assertEqual(
+                {pk for group in groups for pk in group.activity_ids},
+                brute_force_overlapping_ids(intervals),
+            )
+            durations = {pk: end - start for pk, start, end in intervals}
+            for group in groups:
+                # 重复计算的时长 = 各区间时长之和 - 合并后的时长
+                self.assertEqual(
+                    group.overlap,
+                    sum((durations[pk] for pk in group.activity_ids), timedelta())
+                    - (group.end - group.start),
+                )
+
+    def test_touching_intervals_do_not_overlap(self):
+        t = self.base
+        intervals = [(1, t, t + timedelta(hours=1)), (2, t + timedelta(hours=1), t + timedelta(hours=2))]
+        self.assertEqual(list(overlap_groups(intervals)), [])
+
+    def test_nested_intervals_grouped(self):
+        t = self.base
+        intervals = [
+            (1, t, t + timedelta(hours=3)),
+            (2, t + timedelta(hours=1), t + timedelta(hours=2)),
+            (3, t + timedelta(hours=2, minutes=30), t + timedelta(hours=4)),
+        ]
+        (group,) = overlap_groups(intervals)
+        self.assertEqual(group.activity_ids, [1, 2, 3])
+        self.assertEqual(group.end, t + timedelta(hours=4))
+        self.assertEqual(group.overlap, timedelta(hours=1, minutes=30))
+
+    def test_100k_intervals(self):
+        intervals = self.random_intervals(100_000, 0)
+        started = time.perf_counter()
+        groups = list(overlap_groups(intervals))
+        self.assertTrue(groups)
+        # 线性扫描，十万个区间远小于一秒；两两比较需要约 50 亿次
+        self.assertLess(time.perf_counter() - started, 2)
+
+
+class StopwatchOverlapApiTests(APITestCase):
+    base_url = "/api/stopwatch-activities/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        self.start = timezone.now() - timedelta(days=1)
+        self.logged = self.create(0, 60)
+
+    def at(self, minutes):
+        return self.start + timedelta(minutes=minutes)
+
+    def create(self, start, end, user=None):
+        return StopwatchActivity.objects.create(
+            title="正计时",
+            user=user or self.user,
+            task=self.task,
+            status="COMPLETED",
+            start_time=self.at(start),
+            end_time=self.at(end),
+            duration=timedelta(minutes=end - start),
+        )
+
+    def payload(self, start, end):
+        return {
+            "title": "补录",
+            "task_id": self.task.id,
+            "status": "COMPLETED",
+            "start_time": self.at(start).isoformat(),
+            "end_time": self.at(end).isoformat(),
+            "duration": str(timedelta(minutes=end - start)),
+        }
+
+    def test_create_rejects_overlap(self):
+        response = self.client.post(self.base_url, self.payload(30, 90), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("start_time", response.data)
+
+        response = self.client.post(self.base_url, self.payload(60, 90), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update_rejects_overlap(self):
+        later = self.create(120, 150)
+        url = f"{self.base_url}{later.id}/"
+        response = self.client.patch(
+            url, {"start_time": self.at(50).isoformat()}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # 修改自身的时间不算与自己重叠
+        response = self.client.patch(
+            url, {"end_time": self.at(160).isoformat()}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_running_row_checked_until_now(self):
+        """测试只有开始时间的正计时视为持续到现在"""
+        payload = self.payload(30, 0)
+        del payload["end_time"], payload["duration"]
+        payload["status"] = "IN_PROGRESS"
+        response = self.client.post(self.base_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("start_time", response.data)
+
+        later = self.create(120, 150)
+        response = self.client.patch(
+            f"{self.base_url}{later.id}/",
+            {"end_time": None, "duration": None, "status": "IN_PROGRESS"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 进行中的 later 持续到现在，补录其后的区间与之重叠
+        response = self.client.post(self.base_url, self.payload(200, 230), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_checks_batch_together(self):
+        """测试批量更新的行与已有记录以及同一批的其他行一起检查"""
+        first = self.create(100, 130)
+        second = self.create(200, 230)
+        third = self.create(300, 330)
+
+        def move(activity, start, end):
+            return {
+                "id": activity.id,
+                "start_time": self.at(start).isoformat(),
+                "end_time": self.at(end).isoformat(),
+            }
+
+        # first 移到 second 原来的位置，second 同时移走，不算重叠；
+        # third 移到与 first 的新位置重叠
+        response = self.client.post(
+            self.base_url + "bulk_update/",
+            {"activity_updates": [
+                move(first, 200, 230), move(second, 400, 430), move(third, 220, 250),
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[str(second.id)], {"status": "updated"})
+        self.assertEqual(results[str(first.id)]["status"], "invalid")
+        self.assertEqual(results[str(third.id)]["status"], "invalid")
+        self.assertIn(f"ID {first.id}", results[str(third.id)]["errors"]["start_time"][0])
+        first.refresh_from_db()
+        self.assertEqual(first.start_time, self.at(100))
+
+        # 只改标题的行不检查时间
+        self.create(410, 420)
+        response = self.client.post(
+            self.base_url + "bulk_update/",
+            {"activity_updates": [{"id": second.id, "title": "新标题"}]},
+            format="json",
+        )
+        self.assertEqual(response.data["results"][str(second.id)], {"status": "updated"})
+
+    def test_audit(self):
+        # 已有 [0, 60)，再构造 [30, 90)、[80, 100) 一组和不重叠的 [200, 210)
+        second = self.create(30, 90)
+        third = self.create(80, 100)
+        self.create(200, 210)
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="otherpass123"
+        )
+        self.create(0, 500, user=other)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.base_url + "overlaps/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        (group,) = response.data["groups"]
+        self.assertEqual(group["activity_ids"], [self.logged.id, second.id, third.id])
+        # 60 + 60 + 20 分钟，合并后 100 分钟
+        self.assertEqual(group["overlap_seconds"], 40 * 60)
+        self.assertEqual(response.data["overlap_seconds"], 40 * 60)
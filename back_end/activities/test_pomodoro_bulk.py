@@ -0,0 +1,147 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from app_settings.models import AppSettings
+from tasks.models import Task
+from data_stats.models import StatsDirtyDay
+from push.events import TIMER_EVENT
+from .models import ActiveTimer, FocusSession, PomodoroActivity
+
+User = get_user_model()
+
+
+class PomodoroBulkTests(APITestCase):
+    base_url = "/api/pomodoro-activities/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        AppSettings.objects.create(user=self.user, pomodoro_duration=25)
+        due = timezone.now() + timedelta(days=1)
+        self.task = Task.objects.create(title="任务", user=self.user, due_date=due)
+        self.target = Task.objects.create(title="目标任务", user=self.user, due_date=due)
+        # 每个活动完成 2 个番茄钟，任务统计为 6 个
+        self.activities = [
+            PomodoroActivity.objects.create(
+                title=f"番茄钟{i}", user=self.user, task=self.task,
+                pomodoro_count=2, status="COMPLETED",
+            )
+            for i in range(3)
+        ]
+        Task.objects.filter(pk=self.task.pk).add_focus(pomodoros=6, pomodoro_seconds=6 * 25 * 60)
+
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="otherpass123"
+        )
+        self.foreign = PomodoroActivity.objects.create(title="他人", user=other)
+        self.foreign_task = Task.objects.create(title="他人任务", user=other, due_date=due)
+
+    def ids(self, *activities):
+        return [activity.id for activity in activities]
+
+    def assert_task_totals(self, task, pomodoros):
+        task.refresh_from_db()
+        self.assertEqual(task.pomodoro_count, pomodoros)
+        self.assertEqual(task.focused_seconds, pomodoros * 25 * 60)
+
+    def test_bulk_delete(self):
+        response = self.client.post(
+            self.base_url + "bulk_delete/",
+            {"activity_ids": self.ids(*self.activities[:2], self.foreign)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertTrue(PomodoroActivity.objects.filter(pk=self.foreign.pk).exists())
+        self.assert_task_totals(self.task, 2)
+
+    def test_bulk_status(self):
+        running = self.activities[0]
+        running.start_pomodoro()
+        response = self.client.post(
+            self.base_url + "bulk_status/",
+            {"activity_ids": self.ids(running, self.foreign), "status": "CANCELLED"},
+            format="json",
+        )
+        self.assertEqual(response.data["updated"], 1)
+        running.refresh_from_db()
+        self.assertEqual(running.status, "CANCELLED")
+        self.assertIsNone(running.current_pomodoro_start)
+        self.assertFalse(ActiveTimer.objects.filter(user=self.user).exists())
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, "PENDING")
+
+        response = self.client.post(
+            self.base_url + "bulk_status/",
+            {"activity_ids": self.ids(running), "status": "IN_PROGRESS"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_status_logs_running_phase(self):
+        """测试结束进行中的阶段时记录计时区间，并在提交后推送状态变化"""
+        pomodoro, rest = self.activities[:2]
+        pomodoro.start_pomodoro(at=timezone.now() - timedelta(minutes=10))
+        # 同时只能登记一个计时，休息中的活动直接写入状态
+        PomodoroActivity.objects.filter(pk=rest.pk).update(
+            status="IN_PROGRESS",
+            current_pomodoro_start=timezone.now() - timedelta(minutes=40),
+            current_break_start=timezone.now() - timedelta(minutes=5),
+            is_break=True,
+        )
+        broker = mock.Mock()
+        with mock.patch("push.events.get_broker", return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    self.base_url + "bulk_status/",
+                    {"activity_ids": self.ids(*self.activities), "status": "CANCELLED"},
+                    format="json",
+                )
+        self.assertEqual(response.data["updated"], 3)
+        logged = list(FocusSession.objects.order_by("activity_id"))
+        self.assertEqual(
+            [(session.activity_id, session.kind) for session in logged],
+            [(pomodoro.id, FocusSession.POMODORO), (rest.id, FocusSession.SHORT_BREAK)],
+        )
+        self.assertAlmostEqual(logged[0].seconds, 600, delta=5)
+        self.assertAlmostEqual(logged[1].seconds, 300, delta=5)
+        self.assertTrue(StatsDirtyDay.objects.filter(user_id=self.user.pk, at=logged[0].start).exists())
+        events = [call.args for call in broker.publish.call_args_list]
+        self.assertEqual(
+            sorted((event_type, data["activity_id"], data["status"]) for _, event_type, data in events),
+            [(TIMER_EVENT, pomodoro.id, "CANCELLED"), (TIMER_EVENT, rest.id, "CANCELLED")],
+        )
+        self.assert_task_totals(self.task, 6)
+
+    def test_bulk_reassign(self):
+        with self.assertNumQueries(10):
+            # 查目标任务、保存点、旧任务ID、UPDATE，两个任务的统计各一次加锁查询和批量写入，
+            # 以及查出用户时区和计时区间所在的日期登记统计待重算
+            response = self.client.post(
+                self.base_url + "bulk_reassign/",
+                {"activity_ids": self.ids(*self.activities[:2]), "task_id": self.target.id},
+                format="json",
+            )
+        self.assertEqual(response.data["updated"], 2)
+        self.assert_task_totals(self.task, 2)
+        self.assert_task_totals(self.target, 4)
+
+        response = self.client.post(
+            self.base_url + "bulk_reassign/",
+            {"activity_ids": self.ids(self.activities[2]), "task_id": self.foreign_task.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ids_rejected(self):
+        for payload in ({}, {"activity_ids": []}, {"activity_ids": ["x"]}, {"activity_ids": 1}):
+            response = self.client.post(self.base_url + "bulk_delete/", payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(PomodoroActivity.objects.filter(user=self.user).count(), 3)
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from app_settings.models import AppSettings
+from schedule_system.test_query_plans import find_full_scans
+from tasks.models import Task
+from .models import ActiveTimer, Activity, FocusSession, PomodoroActivity, StopwatchActivity
+from .reaper import reap_stale_timers
+
+User = get_user_model()
+
+
+class StaleTimerReaperTests(TestCase):
+    def setUp(self):
+        self.start = timezone.now()
+        self.users = [
+            User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="testpass123"
+            )
+            for i in range(3)
+        ]
+        for user, duration in zip(self.users, (25, 25, 120)):
+            AppSettings.objects.create(user=user, pomodoro_duration=duration)
+        self.task = Task.objects.create(
+            title="任务", user=self.users[0], due_date=self.start + timedelta(days=1)
+        )
+        self.stopwatch = StopwatchActivity.objects.create(
+            title="正计时", user=self.users[0], task=self.task
+        )
+        self.stopwatch.start_stopwatch(at=self.start)
+        self.pomodoro = PomodoroActivity.objects.create(title="番茄钟", user=self.users[1])
+        self.pomodoro.start_pomodoro(at=self.start)
+        # 番茄钟时长设置为 120 分钟的用户，两小时后仍在正常计时
+        self.long_pomodoro = PomodoroActivity.objects.create(title="长番茄钟", user=self.users[2])
+        self.long_pomodoro.start_pomodoro(at=self.start)
+
+    def test_closes_stale_pomodoro_only(self):
+        closed = reap_stale_timers(now=self.start + timedelta(hours=2), batch_size=1)
+        self.assertEqual([activity.pk for activity in closed], [self.pomodoro.pk])
+
+        self.pomodoro.refresh_from_db()
+        self.assertEqual(self.pomodoro.status, "COMPLETED")
+        self.assertEqual(self.pomodoro.pomodoro_count, 1)
+        self.assertIsNone(self.pomodoro.current_pomodoro_start)
+        session = FocusSession.objects.get(activity=self.pomodoro)
+        self.assertEqual(session.seconds, 25 * 60)
+        self.assertEqual(
+            set(ActiveTimer.objects.values_list("activity_id", flat=True)),
+            {self.stopwatch.pk, self.long_pomodoro.pk},
+        )
+
+    def test_stopwatch_duration_capped(self):
+        reap_stale_timers(now=self.start + timedelta(days=3))
+        self.stopwatch.refresh_from_db()
+        self.assertEqual(self.stopwatch.status, "COMPLETED")
+        self.assertEqual(self.stopwatch.duration, timedelta(hours=12))
+        self.assertEqual(self.stopwatch.end_time, self.start + timedelta(hours=12))
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 12 * 3600)
+        self.assertEqual(self.task.last_focused_at, self.start + timedelta(hours=12))
+        self.assertFalse(ActiveTimer.objects.exists())
+        self.assertFalse(Activity.objects.filter(status="IN_PROGRESS").exists())
+
+        # 已关闭的计时不会再次处理
+        self.assertEqual(reap_stale_timers(now=self.start + timedelta(days=3)), [])
+
+    def test_pomodoro_sets_last_focused(self):
+        task = Task.objects.create(
+            title="番茄钟任务", user=self.users[1], due_date=self.start + timedelta(days=1)
+        )
+        PomodoroActivity.objects.filter(pk=self.pomodoro.pk).update(task=task)
+        reap_stale_timers(now=self.start + timedelta(hours=2))
+        task.refresh_from_db()
+        self.assertEqual(task.pomodoro_count, 1)
+        self.assertEqual(task.last_focused_at, self.start + timedelta(minutes=25))
+
+    def test_resumed_timer_not_closed(self):
+        """测试候选活动在加锁前已被用户重新开始时不会被关闭"""
+        self.pomodoro.start_break(at=self.start + timedelta(minutes=25))
+        self.pomodoro.start_pomodoro(at=self.start + timedelta(hours=2))
+        closed = reap_stale_timers(now=self.start + timedelta(hours=2))
+        self.assertNotIn(self.pomodoro.pk, [activity.pk for activity in closed])
+
+    def test_candidate_scan_uses_index(self):
+        now = self.start + timedelta(hours=2)
+        queryset = Activity.objects.filter(
+            status="IN_PROGRESS", updated_at__lte=now - timedelta(hours=1)
+        ).order_by("id").values_list("id", flat=True)[:500]
+        self.assertEqual(find_full_scans(queryset), [], queryset.explain())
+
+    def test_command(self):
+        out = StringIO()
+        call_command("reap_stale_timers", stdout=out)
+        self.assertIn("已关闭 0 个遗留的计时", out.getvalue())
@@ -0,0 +1,164 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from data_sync.models import Tombstone
+from reminders.models import Reminder
+from tasks.models import Task
+from .models import Activity, PomodoroActivity, StopwatchActivity
+
+User = get_user_model()
+
+
+class ActivityTimelineTests(APITestCase):
+    url = "/api/activities/timeline/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        # 两种活动交替创建
+        self.activities = []
+        for i in range(6):
+            model = PomodoroActivity if i % 2 == 0 else StopwatchActivity
+            self.activities.append(
+                model.objects.create(title=f"活动{i}", user=self.user, task=self.task)
+            )
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="otherpass123"
+        )
+        PomodoroActivity.objects.create(title="他人", user=other)
+
+    def test_mixed_kinds_in_one_query(self):
+        """测试时间线一次查询返回两种活动，字段与各自的接口一致"""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"page_size": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [item["id"] for item in results],
+            [activity.id for activity in reversed(self.activities)],
+        )
+        pomodoro = next(item for item in results if item["kind"] == "POMODORO")
+        stopwatch = next(item for item in results if item["kind"] == "STOPWATCH")
+        self.assertIn("pomodoro_count", pomodoro)
+        self.assertNotIn("duration", pomodoro)
+        self.assertIn("duration", stopwatch)
+        self.assertNotIn("pomodoro_count", stopwatch)
+
+    def test_keyset_pages(self):
+        """测试游标翻页覆盖全部活动且不重复"""
+        ids = []
+        url = self.url + "?page_size=4"
+        while url:
+            response = self.client.get(url)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(ids, [activity.id for activity in reversed(self.activities)])
+
+        response = self.client.get(self.url, {"kind": "stopwatch"})
+        self.assertEqual(
+            {item["kind"] for item in response.data["results"]}, {"STOPWATCH"}
+        )
+
+    def test_proxy_models_stay_separate(self):
+        """测试代理模型只查到自己类型的活动，通过基础模型查询时返回对应类型的实例"""
+        stopwatch = self.activities[1]
+        self.assertFalse(PomodoroActivity.objects.filter(pk=stopwatch.pk).exists())
+        response = self.client.get(f"/api/pomodoro-activities/{stopwatch.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsInstance(Activity.objects.get(pk=stopwatch.pk), StopwatchActivity)
+
+    def test_cascade_tombstones_use_kind(self):
+        """测试删除任务级联删除两种活动时，删除记录按各自类型分组"""
+        Reminder.objects.create(
+            title="提醒",
+            user=self.user,
+            reminder_type="ACTIVITY",
+            activity=self.activities[1],
+            remind_at=timezone.now() + timedelta(hours=1),
+        )
+        self.task.delete()
+        self.assertFalse(Activity.objects.filter(user=self.user).exists())
+        self.assertFalse(Reminder.objects.exists())
+        tombstones = set(
+            Tombstone.objects.filter(model__endswith="_activities").values_list(
+                "model", "object_id"
+            )
+        )
+        expected = {
+            ("pomodoro_activities" if i % 2 == 0 else "stopwatch_activities", activity.id)
+            for i, activity in enumerate(self.activities)
+        }
+        self.assertEqual(tombstones, expected)
+
+
+class MigrateActivityTablesTests(APITestCase):
+    """旧的两张活动表复制到统一的活动表"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE activities_pomodoroactivity (id integer PRIMARY KEY, title varchar(200),"
+                " description text, user_id integer, task_id integer, status varchar(20),"
+                " start_time datetime, end_time datetime, duration bigint, created_at datetime,"
+                " updated_at datetime, pomodoro_count integer, current_pomodoro_start datetime,"
+                " current_break_start datetime, is_break bool, is_long_break bool)"
+            )
+            cursor.execute(
+                "CREATE TABLE activities_stopwatchactivity (id integer PRIMARY KEY, title varchar(200),"
+                " description text, user_id integer, task_id integer, status varchar(20),"
+                " start_time datetime, end_time datetime, duration bigint, created_at datetime,"
+                " updated_at datetime)"
+            )
+            for i in range(1, 6):
+                cursor.execute(
+                    "INSERT INTO activities_pomodoroactivity VALUES"
+                    " (%s, %s, '', %s, NULL, 'COMPLETED', NULL, NULL, NULL, %s, %s, %s, NULL, NULL, 0, 0)",
+                    [i, f"番茄钟{i}", self.user.id, self.now, self.now, i],
+                )
+            for i in range(1, 4):
+                cursor.execute(
+                    "INSERT INTO activities_stopwatchactivity VALUES"
+                    " (%s, %s, '', %s, NULL, 'COMPLETED', NULL, NULL, 60000000, %s, %s)",
+                    [i, f"正计时{i}", self.user.id, self.now, self.now],
+                )
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE activities_pomodoroactivity")
+            cursor.execute("DROP TABLE activities_stopwatchactivity")
+
+    def test_copy_in_batches_and_resume(self):
+        call_command("migrate_activity_tables", batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(PomodoroActivity.objects.order_by("id").values_list("id", "pomodoro_count")),
+            [(i, i) for i in range(1, 6)],
+        )
+        stopwatches = StopwatchActivity.objects.order_by("id")
+        self.assertEqual([s.id for s in stopwatches], [6, 7, 8])
+        self.assertEqual(stopwatches[0].title, "正计时1")
+        self.assertEqual(stopwatches[0].duration, timedelta(minutes=1))
+        self.assertEqual(
+            set(Tombstone.objects.values_list("model", "object_id")),
+            {("stopwatch_activities", i) for i in range(1, 4)},
+        )
+
+        # 重复执行不会重复复制
+        call_command("migrate_activity_tables", batch_size=2, stdout=StringIO())
+        self.assertEqual(Activity.objects.count(), 8)
+        self.assertEqual(StopwatchActivity.objects.create(title="新", user=self.user).id, 9)
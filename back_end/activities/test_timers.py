@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from app_settings.cache import TimerSettings, local_cache
+from app_settings.models import AppSettings
+from tasks.models import Task
+from .models import PomodoroActivity, StopwatchActivity
+from .timers import (
+    PHASE_IDLE,
+    PHASE_LONG_BREAK,
+    PHASE_POMODORO,
+    PHASE_RUNNING,
+    PHASE_SHORT_BREAK,
+    PHASE_STOPPED,
+    pomodoro_state,
+    stopwatch_state,
+)
+
+User = get_user_model()
+
+
+class TimerStateTests(SimpleTestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.settings = TimerSettings(1, 25, 5, 15, 4)
+
+    def test_pomodoro_phases(self):
+        state = pomodoro_state(
+            False, False, self.now - timedelta(minutes=10), None, 0, self.settings, self.now
+        )
+        self.assertEqual(state.phase, PHASE_POMODORO)
+        self.assertEqual(state.remaining, 15 * 60)
+        self.assertEqual(state.elapsed, 10 * 60)
+        self.assertEqual(state.next_long_break, 4)
+
+        break_start = self.now - timedelta(minutes=2)
+        state = pomodoro_state(True, False, None, break_start, 1, self.settings, self.now)
+        self.assertEqual(state.phase, PHASE_SHORT_BREAK)
+        self.assertEqual(state.phase_start, break_start)
+        self.assertEqual(state.remaining, 3 * 60)
+        self.assertEqual(state.next_long_break, 3)
+
+        state = pomodoro_state(True, True, None, break_start, 4, self.settings, self.now)
+        self.assertEqual(state.phase, PHASE_LONG_BREAK)
+        self.assertEqual(state.remaining, 13 * 60)
+
+    def test_pomodoro_idle_and_overrun(self):
+        state = pomodoro_state(False, False, None, None, 3, self.settings, self.now)
+        self.assertEqual(state.phase, PHASE_IDLE)
+        self.assertIsNone(state.remaining)
+        self.assertEqual(state.next_long_break, 1)
+
+        state = pomodoro_state(
+            False, False, self.now - timedelta(hours=1), None, 0, self.settings, self.now
+        )
+        self.assertEqual(state.remaining, 0)
+
+        # 开始时间晚于当前时间（时钟偏差）时不会出现负数
+        state = pomodoro_state(
+            False, False, self.now + timedelta(seconds=3), None, 0, self.settings, self.now
+        )
+        self.assertEqual(state.elapsed, 0)
+        self.assertEqual(state.remaining, 25 * 60)
+
+    def test_stopwatch(self):
+        start = self.now - timedelta(minutes=30)
+        self.assertEqual(stopwatch_state(None, None, self.now).phase, PHASE_IDLE)
+
+        state = stopwatch_state(start, None, self.now)
+        self.assertEqual(state.phase, PHASE_RUNNING)
+        self.assertEqual(state.elapsed, 30 * 60)
+
+        state = stopwatch_state(start, start + timedelta(minutes=5), self.now)
+        self.assertEqual(state.phase, PHASE_STOPPED)
+        self.assertEqual(state.elapsed, 5 * 60)
+
+        # 进行中的计时忽略遗留的结束时间
+        state = stopwatch_state(start, start - timedelta(minutes=5), self.now, "IN_PROGRESS")
+        self.assertEqual((state.phase, state.elapsed), (PHASE_RUNNING, 30 * 60))
+        state = stopwatch_state(start, start + timedelta(minutes=5), self.now, "COMPLETED")
+        self.assertEqual((state.phase, state.elapsed), (PHASE_STOPPED, 5 * 60))
+
+
+class TimerStateApiTests(APITestCase):
+    def setUp(self):
+        local_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        AppSettings.objects.create(user=self.user, pomodoro_duration=30, long_break_interval=3)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def test_model_state_without_queries(self):
+        activity = PomodoroActivity.objects.create(
+            title="番茄钟",
+            user=self.user,
+            task=self.task,
+            pomodoro_count=1,
+            current_pomodoro_start=timezone.now() - timedelta(minutes=5),
+        )
+        activity.get_timer_state()
+        with self.assertNumQueries(0):
+            state = activity.get_timer_state()
+        self.assertEqual(state.next_long_break, 2)
+        self.assertAlmostEqual(state.remaining, 25 * 60, delta=5)
+
+    def test_serialized_state(self):
+        """测试列表和详情接口都返回计时状态"""
+        pomodoro = PomodoroActivity.objects.create(
+            title="番茄钟",
+            user=self.user,
+            task=self.task,
+            current_pomodoro_start=timezone.now() - timedelta(minutes=5),
+        )
+        stopwatch = StopwatchActivity.objects.create(
+            title="正计时",
+            user=self.user,
+            task=self.task,
+            start_time=timezone.now() - timedelta(minutes=1),
+        )
+
+        for url in ("/api/pomodoro-activities/", f"/api/pomodoro-activities/{pomodoro.id}/"):
+            data = self.client.get(url, {"paginate": "false"}).data
+            state = (data[0] if isinstance(data, list) else data)["timer_state"]
+            self.assertEqual(state["phase"], PHASE_POMODORO)
+            self.assertAlmostEqual(state["remaining"], 25 * 60, delta=5)
+            self.assertEqual(state["next_long_break"], 3)
+            self.assertTrue(state["phase_start"].endswith("Z"))
+
+        for url in ("/api/stopwatch-activities/", f"/api/stopwatch-activities/{stopwatch.id}/"):
+            data = self.client.get(url, {"paginate": "false"}).data
+            state = (data[0] if isinstance(data, list) else data)["timer_state"]
+            self.assertEqual(state["phase"], PHASE_RUNNING)
+            self.assertAlmostEqual(state["elapsed"], 60, delta=5)
+            self.assertIsNone(state["remaining"])
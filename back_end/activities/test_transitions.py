@@ -0,0 +1,177 @@
+import threading
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from tasks.models import Task
+from .models import ActiveTimer, PomodoroActivity, StopwatchActivity, TransitionConflict
+
+User = get_user_model()
+
+
+class TransitionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        self.pomodoro = PomodoroActivity.objects.create(
+            title="番茄钟", user=self.user, task=self.task
+        )
+
+    def test_only_changed_columns_written(self):
+        """测试状态转换是单条条件 UPDATE，只写变化的列"""
+        with CaptureQueriesContext(connection) as context:
+            self.pomodoro.start_pomodoro()
+        queries = [q["sql"] for q in context.captured_queries if '"activities_activity"' in q["sql"]]
+        # 不先读取活动，检查和写入在同一条语句中完成
+        (update,) = queries
+        columns, condition = update.split("WHERE")
+        self.assertTrue(update.startswith("UPDATE"))
+        self.assertIn("\"status\" = 'IN_PROGRESS'", columns)
+        self.assertNotIn('"title"', columns)
+        self.assertIn("\"status\" = 'IN_PROGRESS'", condition)
+
+    def test_stale_instance_conflicts(self):
+        """测试实例状态过期时转换失败，不覆盖其他设备的修改"""
+        stale = PomodoroActivity.objects.get(pk=self.pomodoro.pk)
+        self.pomodoro.start_pomodoro()
+        self.pomodoro.complete_pomodoro()
+
+        stale.current_pomodoro_start = timezone.now()
+        stale.status = "IN_PROGRESS"
+        with self.assertRaises(TransitionConflict):
+            stale.complete_pomodoro()
+        self.pomodoro.refresh_from_db()
+        self.assertEqual(self.pomodoro.pomodoro_count, 1)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.pomodoro_count, 1)
+
+    def test_conflict_response(self):
+        self.pomodoro.start_pomodoro()
+        url = f"/api/pomodoro-activities/{self.pomodoro.id}/start_pomodoro/"
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["detail"].code, "timer_state_conflict")
+
+        # 正在休息时可以开始下一个番茄钟
+        self.pomodoro.start_break()
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.pomodoro.refresh_from_db()
+        self.assertFalse(self.pomodoro.is_break)
+
+    def test_stop_uses_stored_start_time(self):
+        stopwatch = StopwatchActivity.objects.create(title="正计时", user=self.user, task=self.task)
+        stopwatch.start_stopwatch()
+        stale = StopwatchActivity.objects.get(pk=stopwatch.pk)
+        stale.start_time -= timedelta(hours=1)
+        with self.assertRaises(TransitionConflict):
+            stale.stop_stopwatch()
+
+        stopwatch.stop_stopwatch()
+        stopwatch.refresh_from_db()
+        self.assertEqual(stopwatch.status, "COMPLETED")
+        self.assertEqual(stopwatch.duration, stopwatch.end_time - stopwatch.start_time)
+        self.assertFalse(ActiveTimer.objects.filter(user=self.user).exists())
+
+    def test_restart_completed_stopwatch(self):
+        """测试重新开始已结束的正计时清除上次的结束时间和时长，计时状态为进行中"""
+        stopwatch = StopwatchActivity.objects.create(title="正计时", user=self.user, task=self.task)
+        stopwatch.start_stopwatch(at=timezone.now() - timedelta(hours=2))
+        stopwatch.stop_stopwatch(at=timezone.now() - timedelta(hours=1))
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 3600)
+
+        stopwatch.start_stopwatch(at=timezone.now() - timedelta(minutes=10))
+        stopwatch.refresh_from_db()
+        self.assertEqual((stopwatch.end_time, stopwatch.duration), (None, None))
+        response = self.client.get(f"/api/stopwatch-activities/{stopwatch.id}/")
+        self.assertEqual(response.data["timer_state"]["phase"], "RUNNING")
+        self.assertAlmostEqual(response.data["timer_state"]["elapsed"], 600, delta=5)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 0)
+
+        stopwatch.stop_stopwatch()
+        self.task.refresh_from_db()
+        self.assertAlmostEqual(self.task.stopwatch_seconds, 600, delta=5)
+
+
+class ConcurrentTransitionTests(TransactionTestCase):
+    """多个线程（相当于多个设备）同时对同一活动执行状态转换"""
+
+    workers = 8
+    rounds = 5
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def race(self, model, pk, method):
+        """每个线程各自读取活动后同时执行转换，返回成功次数"""
+        barrier = threading.Barrier(self.workers)
+        results = []
+
+        def worker():
+            try:
+                activity = model.objects.get(pk=pk)
+                barrier.wait()
+                while True:
+                    try:
+                        getattr(activity, method)()
+                        results.append(True)
+                    except TransitionConflict:
+                        results.append(False)
+                    except OperationalError:
+                        # SQLite 并发写入时整库加锁，事务已回滚，像客户端一样重试
+                        continue
+                    break
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), self.workers)
+        return results.count(True)
+
+    def test_parallel_pomodoro_transitions(self):
+        """测试并发开始和完成番茄钟：每轮只成功一次，计数不丢失也不重复"""
+        activity = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        for _ in range(self.rounds):
+            self.assertEqual(self.race(PomodoroActivity, activity.pk, "start_pomodoro"), 1)
+            self.assertEqual(self.race(PomodoroActivity, activity.pk, "complete_pomodoro"), 1)
+
+        activity.refresh_from_db()
+        self.task.refresh_from_db()
+        self.assertEqual(activity.pomodoro_count, self.rounds)
+        self.assertEqual(self.task.pomodoro_count, self.rounds)
+
+    def test_parallel_stop_stopwatch(self):
+        """测试并发停止正计时：每轮只累计一次时长"""
+        activity = StopwatchActivity.objects.create(title="正计时", user=self.user, task=self.task)
+        expected = 0
+        for _ in range(self.rounds):
+            self.assertEqual(self.race(StopwatchActivity, activity.pk, "start_stopwatch"), 1)
+            self.assertEqual(self.race(StopwatchActivity, activity.pk, "stop_stopwatch"), 1)
+            activity.refresh_from_db()
+            expected += int(activity.duration.total_seconds())
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, expected)
+        self.assertFalse(ActiveTimer.objects.exists())
@@ -0,0 +1,111 @@
+from collections import namedtuple
+from datetime import timedelta
+from math import ceil
+
+
+def pomodoro_remaining_time(
+    is_break, is_long_break, pomodoro_start, break_start, durations, now
+):
+    """
+    番茄钟当前阶段的剩余时间，阶段未开始时返回 None。
+    durations 为 (番茄钟, 短休息, 长休息) 时长（分钟）
+    """
+    pomodoro_minutes, short_break_minutes, long_break_minutes = durations
+    if is_break:
+        start = break_start
+        total = long_break_minutes if is_long_break else short_break_minutes
+    else:
+        start = pomodoro_start
+        total = pomodoro_minutes
+    if not start:
+        return None
+    return max(timedelta(minutes=total) - (now - start), timedelta())
+
+
+def pomodoro_elapsed_time(is_break, pomodoro_start, break_start, now):
+    """番茄钟当前阶段已进行的时间，阶段未开始时返回 None"""
+    start = break_start if is_break else pomodoro_start
+    if not start:
+        return None
+    return now - start
+
+
+def stopwatch_elapsed_time(start_time, end_time, now, status=None):
+    """正计时已进行的时间，已停止时为开始到结束的时长；进行中时忽略遗留的结束时间"""
+    if not start_time:
+        return None
+    if status == "IN_PROGRESS":
+        end_time = None
+    return (end_time or now) - start_time
+
+
+# 计时状态机的阶段
+PHASE_IDLE = "IDLE"
+PHASE_POMODORO = "POMODORO"
+PHASE_SHORT_BREAK = "SHORT_BREAK"
+PHASE_LONG_BREAK = "LONG_BREAK"
+PHASE_RUNNING = "RUNNING"
+PHASE_STOPPED = "STOPPED"
+
+# remaining / elapsed 为秒数（浮点），没有倒计时的阶段 remaining 为 None；
+# next_long_break 为距离下一次长休息还需完成的番茄钟数，正计时为 None
+TimerState = namedtuple(
+    "TimerState", ("phase", "phase_start", "remaining", "elapsed", "next_long_break")
+)
+
+
+def pomodoro_state(
+    is_break, is_long_break, pomodoro_start, break_start, pomodoro_count, settings, now
+):
+    """
+    由存储的时间戳计算番茄钟的计时状态，不访问数据库。
+    settings 提供 pomodoro_duration / short_break_duration / long_break_duration
+    （分钟）和 long_break_interval，通常为 app_settings.cache.TimerSettings
+    """
+    interval = settings.long_break_interval
+    next_long_break = interval - pomodoro_count % interval if interval > 0 else None
+
+    if is_break:
+        start = break_start
+        if is_long_break:
+            phase, minutes = PHASE_LONG_BREAK, settings.long_break_duration
+        else:
+            phase, minutes = PHASE_SHORT_BREAK, settings.short_break_duration
+    else:
+        start = pomodoro_start
+        phase, minutes = PHASE_POMODORO, settings.pomodoro_duration
+
+    if start is None:
+        return TimerState(PHASE_IDLE, None, None, None, next_long_break)
+    elapsed = (now - start).total_seconds()
+    if elapsed < 0:
+        # 客户端与服务器时钟偏差导致开始时间晚于当前时间
+        elapsed = 0.0
+    remaining = minutes * 60 - elapsed
+    return TimerState(phase, start, remaining if remaining > 0 else 0.0, elapsed, next_long_break)
+
+
+def stopwatch_state(start_time, end_time, now, status=None):
+    """
+    由存储的时间戳计算正计时的计时状态，有结束时间的为已停止。
+    状态为进行中时忽略结束时间（旧数据中重新开始的正计时可能留有上次的结束时间）
+    """
+    if start_time is None:
+        return TimerState(PHASE_IDLE, None, None, None, None)
+    if end_time is not None and status != "IN_PROGRESS":
+        return TimerState(
+            PHASE_STOPPED, start_time, None, (end_time - start_time).total_seconds(), None
+        )
+    elapsed = (now - start_time).total_seconds()
+    return TimerState(PHASE_RUNNING, start_time, None, elapsed if elapsed > 0 else 0.0, None)
+
+
+def timer_state_data(state, format_datetime):
+    """计时状态的接口输出：剩余时间向上取整、已用时间向下取整到秒"""
+    return {
+        "phase": state.phase,
+        "phase_start": format_datetime(state.phase_start) if state.phase_start else None,
+        "remaining": ceil(state.remaining) if state.remaining is not None else None,
+        "elapsed": int(state.elapsed) if state.elapsed is not None else None,
+        "next_long_break": state.next_long_break,
+    }
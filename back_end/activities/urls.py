@@ -1,10 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PomodoroActivityViewSet, StopwatchActivityViewSet
+from .views import (
+    ActiveTimerViewSet,
+    ActivityTimelineViewSet,
+    PomodoroActivityViewSet,
+    StopwatchActivityViewSet,
+    TimerEventViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"pomodoro-activities", PomodoroActivityViewSet, basename="pomodoro-activity")
 router.register(r"stopwatch-activities", StopwatchActivityViewSet, basename="stopwatch-activity")
+router.register(r"timers", ActiveTimerViewSet, basename="timer")
+router.register(r"activities/timeline", ActivityTimelineViewSet, basename="activity-timeline")
+router.register(r"activities", TimerEventViewSet, basename="activity")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,24 +1,90 @@
 from django.shortcuts import render
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from django.utils import timezone
 from django.db import transaction
 from django.core.exceptions import ValidationError
-from .models import PomodoroActivity, StopwatchActivity
-from .serializers import PomodoroActivitySerializer, StopwatchActivitySerializer
+from tasks.models import Task
+from app_settings.models import TaskCategory
+from data_stats.rollup import mark_activities_dirty, mark_sessions_dirty
+from data_sync.tombstones import batch_tombstones
+from schedule_system.bulk import BulkUpdateMixin, collect_ids, parse_ids
+from schedule_system.conditional import ConditionalRequestMixin
+from schedule_system.fields import SparseFieldsMixin
+from schedule_system.values import ValuesListMixin
+from .models import (
+    ActiveTimer,
+    Activity,
+    FocusSession,
+    PomodoroActivity,
+    StopwatchActivity,
+    TimerConflict,
+    TransitionConflict,
+)
+from .offline import apply_timer_events
+from .overlaps import batch_overlaps, overlap_groups, stopwatch_intervals
+from .serializers import (
+    ACTIVITY_SERIALIZERS,
+    DATETIME_FIELD,
+    ActivityTimelineSerializer,
+    PomodoroActivitySerializer,
+    PomodoroActivityValuesSerializer,
+    StopwatchActivitySerializer,
+    StopwatchActivityValuesSerializer,
+    TimerEventSerializer,
+)
 
 # Create your views here.
 
 
-class PomodoroActivityViewSet(viewsets.ModelViewSet):
+class TimerAlreadyRunning(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "已有正在进行的计时，请先结束当前计时"
+    default_code = "timer_already_running"
+
+
+class TimerStateConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "计时状态已被其他设备修改，请刷新后重试"
+    default_code = "timer_state_conflict"
+
+
+class TimerConflictMixin:
+    """
+    开始计时、创建或修改为进行中的活动时，用户已有其他计时则返回 409；
+    计时状态转换的前置条件不成立（已被其他设备转换）时同样返回 409
+    """
+
+    def handle_exception(self, exc):
+        if isinstance(exc, TimerConflict):
+            exc = TimerAlreadyRunning(str(exc))
+        elif isinstance(exc, TransitionConflict):
+            exc = TimerStateConflict(str(exc))
+        return super().handle_exception(exc)
+
+
+class PomodoroActivityViewSet(
+    TimerConflictMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = PomodoroActivitySerializer
+    values_serializer_class = PomodoroActivityValuesSerializer
     permission_classes = [IsAuthenticated]
+    etag_related_models = (Task, TaskCategory)  # 列表中嵌套展示任务及其分类
+    etag_related_paths = ("task", "task__category")
+    etag_volatile = Q(status="IN_PROGRESS")  # 剩余/已用时间随当前时间变化
 
     def get_queryset(self):
-        queryset = PomodoroActivity.objects.filter(user=self.request.user)
+        queryset = PomodoroActivity.objects.filter(
+            user=self.request.user
+        ).select_related("task__category")
 
         # 按任务筛选
         task_id = self.request.query_params.get("task_id", None)
@@ -75,13 +141,146 @@ class PomodoroActivityViewSet(viewsets.ModelViewSet):
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    def perform_update(self, serializer):
+        # 修改所属任务后，同步新旧任务的番茄钟统计
+        old_task_id = serializer.instance.task_id
+        with transaction.atomic():
+            activity = serializer.save()
+            Task.objects.filter(
+                id__in={old_task_id, activity.task_id}
+            ).sync_pomodoro_totals()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Task.objects.filter(id=instance.task_id).sync_pomodoro_totals()
+
+    def get_bulk_activities(self, request):
+        """请求中 activity_ids 指定的当前用户的番茄钟活动，ID 列表无效时返回 None"""
+        activity_ids = parse_ids(request.data.get("activity_ids"))
+        if activity_ids is None:
+            return None
+        return PomodoroActivity.objects.filter(id__in=activity_ids, user=request.user)
+
+    def get_task_ids(self, activities):
+        return set(activities.order_by().values_list("task_id", flat=True).distinct())
+
+    @action(detail=False, methods=["post"])
+    def bulk_delete(self, request):
+        """批量删除番茄钟活动，返回删除条数，同步相关任务的番茄钟统计"""
+        activities = self.get_bulk_activities(request)
+        if activities is None:
+            return Response(
+                {"error": "请提供要删除的活动ID列表"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic(), batch_tombstones():
+            task_ids = self.get_task_ids(activities)
+            _, deleted = activities.delete()
+            Task.objects.filter(id__in=task_ids).sync_pomodoro_totals()
+        count = deleted.get(PomodoroActivity._meta.label, 0)
+        return Response({"message": f"成功删除 {count} 条数据", "deleted": count})
+
+    @action(detail=False, methods=["post"])
+    def bulk_status(self, request):
+        """
+        批量修改状态，不能改为进行中。正在计时的活动同时结束当前阶段（不计入完成数），
+        记录结束的计时区间并注销当前计时，提交后推送状态变化，返回更新条数
+        """
+        new_status = request.data.get("status")
+        allowed = [
+            value for value, _ in PomodoroActivity.STATUS_CHOICES if value != "IN_PROGRESS"
+        ]
+        if new_status not in allowed:
+            return Response(
+                {"error": f"状态必须是 {', '.join(allowed)} 之一"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        activities = self.get_bulk_activities(request)
+        if activities is None:
+            return Response(
+                {"error": "请提供要更新的活动ID列表"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        now = timezone.now()
+        changes = {
+            "status": new_status,
+            "current_pomodoro_start": None,
+            "current_break_start": None,
+            "is_break": False,
+            "is_long_break": False,
+        }
+        with transaction.atomic():
+            # 锁定正在计时的活动，结束的阶段与更新前的状态一致
+            running = list(activities.select_for_update().filter(status="IN_PROGRESS"))
+            sessions = []
+            for activity in running:
+                try:
+                    _, phase = activity.end_phase(now)
+                except ValidationError:
+                    # 阶段开始时间晚于当前时间（设备时钟偏差），不记录区间
+                    continue
+                if phase is not None:
+                    sessions.append(FocusSession.build(activity, *phase))
+            updated = activities.update(updated_at=now, **changes)
+            FocusSession.objects.bulk_create(sessions)
+            mark_sessions_dirty(sessions)
+            ActiveTimer.objects.filter(
+                user=request.user, activity__in=activities.values("id")
+            ).delete()
+            for activity in running:
+                for name, value in changes.items():
+                    setattr(activity, name, value)
+                activity.publish_timer_event("status")
+        return Response({"message": f"成功更新 {updated} 条数据", "updated": updated})
+
+    @action(detail=False, methods=["post"])
+    def bulk_reassign(self, request):
+        """批量改为关联到当前用户的另一个任务，同步新旧任务的番茄钟统计，返回更新条数"""
+        try:
+            task = Task.objects.filter(
+                id=int(request.data.get("task_id")), user=request.user
+            ).first()
+        except (TypeError, ValueError):
+            task = None
+        if task is None:
+            return Response(
+                {"task_id": "任务不存在或不属于当前用户"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        activities = self.get_bulk_activities(request)
+        if activities is None:
+            return Response(
+                {"error": "请提供要更新的活动ID列表"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-class StopwatchActivityViewSet(viewsets.ModelViewSet):
+        with transaction.atomic():
+            task_ids = self.get_task_ids(activities) | {task.id}
+            updated = activities.update(task=task, updated_at=timezone.now())
+            Task.objects.filter(id__in=task_ids).sync_pomodoro_totals()
+            # 计时区间改归新任务的分类，所在日期的时间分配需要重算
+            mark_activities_dirty(activities.values("id"))
+        return Response({"message": f"成功更新 {updated} 条数据", "updated": updated})
+
+
+class StopwatchActivityViewSet(
+    TimerConflictMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    SparseFieldsMixin,
+    BulkUpdateMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = StopwatchActivitySerializer
+    values_serializer_class = StopwatchActivityValuesSerializer
     permission_classes = [IsAuthenticated]
+    etag_related_models = (Task, TaskCategory)  # 列表中嵌套展示任务及其分类
+    etag_related_paths = ("task", "task__category")
+    etag_volatile = Q(status="IN_PROGRESS")  # 剩余/已用时间随当前时间变化
 
     def get_queryset(self):
-        queryset = StopwatchActivity.objects.filter(user=self.request.user)
+        queryset = StopwatchActivity.objects.filter(
+            user=self.request.user
+        ).select_related("task__category")
 
         # 按任务筛选
         task_id = self.request.query_params.get("task_id", None)
@@ -128,6 +327,20 @@ class StopwatchActivityViewSet(viewsets.ModelViewSet):
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    def perform_update(self, serializer):
+        # 修改时长、状态或所属任务后，同步新旧任务的正计时统计
+        old_task_id = serializer.instance.task_id
+        with transaction.atomic():
+            activity = serializer.save()
+            Task.objects.filter(
+                id__in={old_task_id, activity.task_id}
+            ).sync_stopwatch_totals()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Task.objects.filter(id=instance.task_id).sync_stopwatch_totals()
+
     @action(detail=False, methods=["post"])
     def bulk_delete(self, request):
         activity_ids = request.data.get("activity_ids", [])
@@ -137,8 +350,11 @@ class StopwatchActivityViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        with transaction.atomic():
-            StopwatchActivity.objects.filter(id__in=activity_ids, user=request.user).delete()
+        with transaction.atomic(), batch_tombstones():
+            activities = StopwatchActivity.objects.filter(id__in=activity_ids, user=request.user)
+            task_ids = set(activities.values_list("task_id", flat=True))
+            activities.delete()
+            Task.objects.filter(id__in=task_ids).sync_stopwatch_totals()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=["post"])
@@ -149,21 +365,140 @@ class StopwatchActivityViewSet(viewsets.ModelViewSet):
                 {"error": "请提供要更新的活动数据"}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        if not isinstance(activity_updates, list):
+            return Response(
+                {"error": "activity_updates 必须是列表"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 一次查出涉及的新旧任务，用于归属校验和同步专注统计
+        owned_task_ids = set(
+            Task.objects.filter(
+                id__in=collect_ids(activity_updates, "task_id"), user=request.user
+            ).values_list("id", flat=True)
+        )
         with transaction.atomic():
-            for update in activity_updates:
-                activity_id = update.get("id")
-                if not activity_id:
-                    continue
+            old_task_ids = set(
+                self.get_queryset()
+                .filter(id__in=collect_ids(activity_updates))
+                .values_list("task_id", flat=True)
+            )
+            updated, results = self.perform_bulk_update(
+                activity_updates,
+                context={"owned_task_ids": owned_task_ids, "batch_overlaps": True},
+            )
+            # bulk_update 不经过 save()，单独维护当前计时的登记
+            for activity in updated:
+                activity.sync_active_timer()
+            Task.objects.filter(
+                id__in=old_task_ids | {activity.task_id for activity in updated}
+            ).sync_stopwatch_totals()
+
+        return self.bulk_update_response(updated, results)
+
+    def validate_bulk_update(self, changes):
+        """修改了起止时间的行与已有记录一起扫描，同一批中相互重叠的行同样拒绝"""
+        conflicts = batch_overlaps(
+            self.request.user.pk,
+            [
+                (activity.pk, activity.start_time, activity.end_time)
+                for activity, fields in changes
+                if activity.start_time and {"start_time", "end_time"} & set(fields)
+            ],
+        )
+        return {
+            pk: {"start_time": [f"与已有的正计时记录（ID {other}）时间重叠"]}
+            for pk, other in conflicts.items()
+        }
+
+    @action(detail=False, methods=["get"])
+    def overlaps(self, request):
+        """
+        检查当前用户时间重叠的正计时，返回相互重叠的区间组及其被重复计算的时长。
+        按开始时间顺序读取（走 (user, kind, start_time) 索引）后一次扫描完成
+        """
+        groups = list(
+            overlap_groups(stopwatch_intervals(StopwatchActivity.objects.filter(user=request.user)))
+        )
+        return Response({
+            "count": len(groups),
+            "overlap_seconds": sum(int(group.overlap.total_seconds()) for group in groups),
+            "groups": [
+                {
+                    "activity_ids": group.activity_ids,
+                    "start": DATETIME_FIELD.to_representation(group.start),
+                    "end": DATETIME_FIELD.to_representation(group.end),
+                    "overlap_seconds": int(group.overlap.total_seconds()),
+                }
+                for group in groups
+            ],
+        })
 
-                activity = StopwatchActivity.objects.filter(
-                    id=activity_id, user=request.user
-                ).first()
 
-                if activity:
-                    serializer = self.get_serializer(
-                        activity, data=update, partial=True
-                    )
-                    if serializer.is_valid():
-                        serializer.save()
+class ActiveTimerViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=["get"])
+    def active(self, request):
+        """
+        获取当前用户正在进行的计时及其计时状态，没有时 kind 和 activity 为 null。
+        按 user 唯一索引查询一行，同时连接出活动、任务和分类
+        """
+        timer = (
+            ActiveTimer.objects.filter(user=request.user)
+            .select_related("activity__task__category")
+            .first()
+        )
+        if timer is None:
+            return Response({"kind": None, "activity": None})
+
+        context = {"request": request, "view": self}
+        serializer_class = ACTIVITY_SERIALIZERS[timer.activity.kind]
+        data = serializer_class(timer.activity, context=context).data
+        return Response({"kind": timer.activity.kind, "activity": data})
 
-        return Response({"message": "批量更新完成"})
+
+class TimerEventViewSet(TimerConflictMixin, viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+    max_events = 1000
+
+    @action(detail=False, methods=["post"])
+    def events(self, request):
+        """
+        批量执行客户端离线期间排队的计时事件，请求体为 {"events": [...]}，按顺序执行。
+        每个事件带客户端生成的幂等键，重试整批请求是安全的
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"error": "请求体必须是包含 events 列表的JSON对象"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = TimerEventSerializer(
+            data=request.data.get("events"), many=True, max_length=self.max_events
+        )
+        serializer.is_valid(raise_exception=True)
+        results = apply_timer_events(request.user, serializer.validated_data)
+        applied = sum(
+            1 for result in results.values()
+            if result["status"] == "applied" and not result.get("replayed")
+        )
+        return Response({"applied": applied, "results": results})
+
+
+class ActivityTimelineViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    番茄钟和正计时按创建时间倒序的时间线，每项带 kind，其余字段与对应类型的接口一致。
+    两种活动在同一张表中，按 (user, -created_at, id) 索引游标分页，每页一次查询
+    """
+
+    serializer_class = ActivityTimelineSerializer
+    permission_classes = [IsAuthenticated]
+    keyset_ordering = ("-created_at", "id")
+
+    def get_queryset(self):
+        queryset = Activity.objects.filter(user=self.request.user).select_related(
+            "task__category"
+        )
+        kind = self.request.query_params.get("kind")
+        if kind:
+            queryset = queryset.filter(kind=kind.upper())
+        return queryset
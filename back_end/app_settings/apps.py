@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_settings'
+
+    def ready(self):
+        from . import signals  # noqa: F401  注册设置缓存的失效处理
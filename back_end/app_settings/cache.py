@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .models import AppSettings
+
+CACHED_FIELDS = (
+    "pomodoro_duration",
+    "short_break_duration",
+    "long_break_duration",
+    "long_break_interval",
+)
+
+
+class TimerSettings(namedtuple("TimerSettings", ("id",) + CACHED_FIELDS)):
+    """计时相关的用户设置快照；id 为 None 表示用户还没有设置记录，取默认值"""
+
+    __slots__ = ()
+
+    @property
+    def durations(self):
+        """(番茄钟, 短休息, 长休息) 时长（分钟），与 timers 中的参数顺序一致"""
+        return self.pomodoro_duration, self.short_break_duration, self.long_break_duration
+
+    @classmethod
+    def defaults(cls):
+        return cls(None, *(AppSettings._meta.get_field(name).default for name in CACHED_FIELDS))
+
+
+class LocalLRU:
+    """进程内带过期时间的 LRU，线程安全"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# 进程内一级缓存只保留很短时间，其他进程修改设置后最多延迟 ttl 秒生效
+local_cache = LocalLRU(
+    settings.APP_SETTINGS_LOCAL_CACHE_SIZE, settings.APP_SETTINGS_LOCAL_CACHE_TTL
+)
+
+
+def _shared_cache():
+    return caches[settings.APP_SETTINGS_CACHE_ALIAS]
+
+
+def _cache_key(user_id):
+    return f"app_settings:timer:{user_id}"
+
+
+def get_timer_settings(user_id):
+    """
+    读取用户的计时设置：进程内 LRU → 共享缓存 → 数据库，
+    用户没有设置记录时返回默认值（同样缓存，创建设置时失效）
+    """
+    key = _cache_key(user_id)
+    value = local_cache.get(key)
+    if value is not None:
+        return value
+
+    shared = _shared_cache()
+    row = shared.get(key)
+    if row is not None:
+        value = TimerSettings(*row)
+    else:
+        row = (
+            AppSettings.objects.filter(user_id=user_id)
+            .order_by()
+            .values_list("id", *CACHED_FIELDS)
+            .first()
+        )
+        value = TimerSettings(*row) if row else TimerSettings.defaults()
+        # 共享缓存只存元组，不依赖本模块的类定义
+        shared.set(key, tuple(value), settings.APP_SETTINGS_CACHE_TIMEOUT)
+    local_cache.set(key, value)
+    return value
+
+
+def invalidate_timer_settings(user_id):
+    """
+    使用户的设置缓存失效。立即删除一次，事务提交后再删除一次，
+    避免提交前其他请求把旧值重新写回缓存
+    """
+    key = _cache_key(user_id)
+
+    def delete():
+        local_cache.delete(key)
+        _shared_cache().delete(key)
+
+    delete()
+    transaction.on_commit(delete)
+
+
+def ensure_app_settings(user):
+    """确保用户有设置记录；缓存中已有记录时不访问数据库"""
+    if get_timer_settings(user.pk).id is None:
+        AppSettings.objects.get_or_create(user=user)
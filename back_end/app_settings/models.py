@@ -21,6 +21,10 @@ class TaskCategory(models.Model):
         verbose_name_plural = "任务分类"
         unique_together = ["name", "user"]
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["user", "name", "id"]),  # 列表游标分页
+            models.Index(fields=["user", "updated_at"]),  # 增量同步
+        ]
 
     def __str__(self):
         return self.name
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from schedule_system.fields import DynamicFieldsMixin
+from schedule_system.values import ValuesSerializer
 from .models import AppSettings, TaskCategory
 
 
@@ -48,8 +50,12 @@ class AppSettingsSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TaskCategorySerializer(serializers.ModelSerializer):
+class TaskCategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TaskCategory
         fields = ['id', 'name', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+
+
+class TaskCategoryValuesSerializer(ValuesSerializer):
+    serializer_class = TaskCategorySerializer
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import invalidate_timer_settings
+from .models import AppSettings
+
+
+@receiver(post_save, sender=AppSettings, dispatch_uid="app_settings_cache_save")
+@receiver(post_delete, sender=AppSettings, dispatch_uid="app_settings_cache_delete")
+def invalidate_settings_cache(sender, instance, **kwargs):
+    invalidate_timer_settings(instance.user_id)
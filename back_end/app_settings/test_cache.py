@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity
+from tasks.models import Task
+from .cache import TimerSettings, get_timer_settings, local_cache
+from .models import AppSettings
+
+User = get_user_model()
+
+
+class TimerSettingsCacheTests(APITestCase):
+    def setUp(self):
+        local_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_cached_after_first_read(self):
+        """测试首次读取后两级缓存都不再查询数据库"""
+        AppSettings.objects.create(user=self.user, pomodoro_duration=30)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_timer_settings(self.user.id).pomodoro_duration, 30)
+        with self.assertNumQueries(0):
+            get_timer_settings(self.user.id)
+
+        # 进程内缓存失效后从共享缓存读取
+        local_cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_timer_settings(self.user.id).pomodoro_duration, 30)
+
+    def test_defaults_without_settings(self):
+        self.assertEqual(get_timer_settings(self.user.id), TimerSettings.defaults())
+
+    def test_invalidated_on_save_and_delete(self):
+        """测试修改和删除设置后缓存失效"""
+        self.assertIsNone(get_timer_settings(self.user.id).id)
+        settings = AppSettings.objects.create(user=self.user)
+        self.assertEqual(get_timer_settings(self.user.id).id, settings.id)
+
+        settings.short_break_duration = 8
+        settings.save()
+        self.assertEqual(get_timer_settings(self.user.id).durations, (25, 8, 15))
+
+        settings.delete()
+        self.assertIsNone(get_timer_settings(self.user.id).id)
+
+    def test_update_through_api(self):
+        settings = AppSettings.objects.create(user=self.user)
+        get_timer_settings(self.user.id)
+        response = self.client.patch(
+            reverse("appsettings-detail", args=[settings.id]),
+            {"pomodoro_duration": 50},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_timer_settings(self.user.id).pomodoro_duration, 50)
+
+    def test_registration_creates_settings(self):
+        response = APIClient().post(
+            reverse("register"),
+            {"username": "newuser", "email": "new@example.com", "password": "Str0ngPass!23"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(AppSettings.objects.filter(user__username="newuser").exists())
+
+    def test_settings_list(self):
+        """测试设置列表在没有设置时创建默认设置，已有设置时不再检查"""
+        url = reverse("appsettings-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AppSettings.objects.filter(user=self.user).count(), 1)
+
+        # 创建设置使缓存失效，下一次访问重新读取后即被缓存
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            # ETag 聚合 + 列表
+            self.client.get(url, {"paginate": "false"})
+
+    def test_timer_reads_cached_settings(self):
+        """测试计时逻辑从缓存读取时长设置"""
+        AppSettings.objects.create(user=self.user, pomodoro_duration=40)
+        task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+        activity = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=task)
+        get_timer_settings(self.user.id)
+
+        with CaptureQueriesContext(connection) as context:
+            activity.start_pomodoro()
+        self.assertFalse(
+            [q for q in context.captured_queries if "app_settings_appsettings" in q["sql"]]
+        )
+        with self.assertNumQueries(0):
+            remaining = activity.get_remaining_time()
+        self.assertAlmostEqual(remaining.total_seconds(), 40 * 60, delta=5)
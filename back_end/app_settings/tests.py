@@ -53,8 +53,8 @@ class AppSettingsTests(APITestCase):
         url = reverse("appsettings-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["pomodoro_duration"], 25)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["pomodoro_duration"], 25)
 
     def test_settings_update(self):
         """测试设置更新"""
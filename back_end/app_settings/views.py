@@ -4,13 +4,20 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import IntegrityError
 from rest_framework import serializers
+from schedule_system.conditional import ConditionalRequestMixin
+from schedule_system.values import ValuesListMixin
+from .cache import ensure_app_settings
 from .models import AppSettings, TaskCategory
-from .serializers import AppSettingsSerializer, TaskCategorySerializer
+from .serializers import (
+    AppSettingsSerializer,
+    TaskCategorySerializer,
+    TaskCategoryValuesSerializer,
+)
 
 # Create your views here.
 
 
-class AppSettingsViewSet(viewsets.ModelViewSet):
+class AppSettingsViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     serializer_class = AppSettingsSerializer
     permission_classes = [IsAuthenticated]
 
@@ -60,12 +67,8 @@ class AppSettingsViewSet(viewsets.ModelViewSet):
         return super().retrieve(request, *args, **kwargs)
 
     def list(self, request, *args, **kwargs):
-        # 确保用户只能查看自己的设置
-        queryset = self.get_queryset()
-        if not queryset.exists():
-            # 如果用户没有设置，创建一个默认设置
-            AppSettings.objects.create(user=request.user)
-            queryset = self.get_queryset()
+        # 如果用户没有设置，创建一个默认设置；已缓存存在时不再查询
+        ensure_app_settings(request.user)
         return super().list(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
@@ -82,9 +85,13 @@ class AppSettingsViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class TaskCategoryViewSet(viewsets.ModelViewSet):
+class TaskCategoryViewSet(
+    ConditionalRequestMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     serializer_class = TaskCategorySerializer
+    values_serializer_class = TaskCategoryValuesSerializer
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ("name", "id")
 
     def get_queryset(self):
         return TaskCategory.objects.filter(user=self.request.user)
@@ -39,6 +39,7 @@ class DataBackup(models.Model):
             models.Index(fields=['user', 'backup_type']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['user', '-created_at', 'id']),
         ]
 
     def __str__(self):
@@ -91,6 +92,7 @@ class BackupSchedule(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_active']),
             models.Index(fields=['next_run']),
+            models.Index(fields=['user', '-created_at', 'id']),
         ]
 
     def __str__(self):
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from schedule_system.fields import DynamicFieldsMixin
 from .models import DataBackup, BackupSchedule
 
 
-class DataBackupSerializer(serializers.ModelSerializer):
+class DataBackupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     file_size_display = serializers.CharField(source='get_file_size_display', read_only=True)
 
     class Meta:
@@ -14,8 +15,10 @@ class DataBackupSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'created_at', 'completed_at', 'file_size', 'file_size_display']
 
+    field_columns = {'file_size_display': ('file_size',)}
 
-class BackupScheduleSerializer(serializers.ModelSerializer):
+
+class BackupScheduleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BackupSchedule
         fields = [
@@ -51,6 +54,8 @@ class BackupScheduleDetailSerializer(BackupScheduleSerializer):
     class Meta(BackupScheduleSerializer.Meta):
         fields = BackupScheduleSerializer.Meta.fields + ['recent_backups']
 
+    field_columns = {'recent_backups': ('user', 'backup_type', 'included_modules')}
+
     def get_recent_backups(self, obj):
         """
         获取最近的5个备份记录
@@ -291,12 +291,12 @@ class BackupViewSetTests(APITestCase):
         # 测试按备份类型筛选
         response = self.client.get('/api/backups/?backup_type=FULL')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
         # 测试按状态筛选
         response = self.client.get('/api/backups/?status=COMPLETED')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(len(response.data) >= 1)
+        self.assertTrue(len(response.data['results']) >= 1)
 
     def test_backup_restore_validation(self):
         """测试备份恢复验证"""
@@ -375,12 +375,12 @@ class BackupScheduleViewSetTests(APITestCase):
         # 测试按激活状态筛选
         response = self.client.get('/api/schedules/?is_active=true')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
         # 测试按备份类型筛选
         response = self.client.get('/api/schedules/?backup_type=FULL')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_schedule_validation(self):
         """测试备份计划验证"""
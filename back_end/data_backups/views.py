@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from django.db.models import Q
+from schedule_system.fields import SparseFieldsMixin
 from .models import DataBackup, BackupSchedule
 from .serializers import (
     DataBackupSerializer,
@@ -13,7 +14,7 @@ from .serializers import (
 )
 
 
-class DataBackupViewSet(viewsets.ModelViewSet):
+class DataBackupViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = DataBackupSerializer
     permission_classes = [IsAuthenticated]
     queryset = DataBackup.objects.all()
@@ -87,7 +88,7 @@ class DataBackupViewSet(viewsets.ModelViewSet):
             )
 
 
-class BackupScheduleViewSet(viewsets.ModelViewSet):
+class BackupScheduleViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = BackupScheduleSerializer
     permission_classes = [IsAuthenticated]
     queryset = BackupSchedule.objects.all()
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DataStatsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'data_stats'
+
+    def ready(self):
+        from . import signals  # noqa: F401  任务和计时区间变化时登记待重算的日期
+
+        # 配置了间隔时在进程内定时汇总，否则由管理命令定时执行
+        interval = getattr(settings, "STATS_ROLLUP_INTERVAL", None)
+        if interval:
+            from .rollup import start_stats_rollup
+
+            start_stats_rollup(interval)
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from data_stats.rollup import backfill_shard
+
+
+class Command(BaseCommand):
+    help = "按用户分片并行回填历史统计，中断后重新执行会从各分片的检查点继续"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shards", type=int, default=4, help="用户分片数（按用户ID取模）")
+        parser.add_argument(
+            "--shard",
+            type=int,
+            help="只处理指定分片，便于分散到多个进程或机器；不指定时在线程中并行处理全部分片",
+        )
+        parser.add_argument(
+            "--days-per-batch", type=int, default=366, help="每次聚合查询覆盖的天数"
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="忽略检查点，从头回填"
+        )
+
+    def handle(self, *args, **options):
+        shards = options["shards"]
+        if shards < 1:
+            raise CommandError("分片数必须大于 0")
+        if options["shard"] is not None:
+            if not 0 <= options["shard"] < shards:
+                raise CommandError(f"分片必须在 0 到 {shards - 1} 之间")
+            targets = [options["shard"]]
+        else:
+            targets = list(range(shards))
+
+        def run(shard):
+            users = backfill_shard(
+                shard,
+                shards,
+                days_per_batch=options["days_per_batch"],
+                restart=options["restart"],
+                progress=lambda user_id, days: self.stdout.write(
+                    f"分片 {shard}：用户 {user_id}，{days} 天"
+                ),
+            )
+            self.stdout.write(self.style.SUCCESS(f"分片 {shard} 完成，本次回填 {users} 个用户"))
+            return users
+
+        def run_in_thread(shard):
+            try:
+                return run(shard)
+            finally:
+                # 每个线程有自己的数据库连接，结束时关闭
+                connections.close_all()
+
+        if len(targets) == 1:
+            total = run(targets[0])
+        else:
+            with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+                total = sum(executor.map(run_in_thread, targets))
+        self.stdout.write(self.style.SUCCESS(f"回填完成，共 {total} 个用户"))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from data_stats.rollup import process_dirty_days
+
+
+class Command(BaseCommand):
+    help = "重算任务和计时区间变化后登记的日期的统计"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="每批重算的登记数量"
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="循环执行的间隔秒数，不指定时只执行一次（适合由 cron 调度）",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = process_dirty_days(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"已重算 {count} 天的统计"))
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
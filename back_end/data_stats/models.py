@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from users.models import User
 
 
@@ -55,3 +56,36 @@ class EfficiencyStats(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.date}"
+
+
+class StatsDirtyDay(models.Model):
+    """
+    需要重算统计的 (用户, 时间点)，任务和计时区间变化时在事务提交后写入，汇总后删除。
+    记录时间点而不是日期：汇总时才按用户时区换算成本地日期，登记时不必查询用户。
+    只追加不去重：汇总期间新写入的行不会被这一轮删除，留到下一轮处理
+    """
+    user_id = models.BigIntegerField(verbose_name='用户ID')
+    at = models.DateTimeField(verbose_name='所在日期内的时间点')
+    marked_at = models.DateTimeField(default=timezone.now, verbose_name='登记时间')
+
+    class Meta:
+        verbose_name = '待重算统计'
+        verbose_name_plural = '待重算统计'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.at}"
+
+
+class RollupCheckpoint(models.Model):
+    """统计回填每个分片的进度：已处理到的用户ID，中断后从下一个用户继续"""
+    name = models.CharField(max_length=50, unique=True, verbose_name='分片名称')
+    last_user_id = models.BigIntegerField(default=0, verbose_name='已处理到的用户ID')
+    finished = models.BooleanField(default=False, verbose_name='是否完成')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        verbose_name = '统计回填进度'
+        verbose_name_plural = '统计回填进度'
+
+    def __str__(self):
+        return f"{self.name}: {self.last_user_id}"
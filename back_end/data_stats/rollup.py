@@ -0,0 +1,328 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Mod
+from activities.models import FocusSession
+from schedule_system.days import DayBoundaries, day_start, get_zone, local_date
+from schedule_system.periodic import start_periodic
+from tasks.models import Task
+from .models import ActivityStats, EfficiencyStats, RollupCheckpoint, StatsDirtyDay, TaskStats
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+FOCUS_KINDS = (FocusSession.POMODORO, FocusSession.STOPWATCH)
+UNCATEGORIZED = "未分类"
+# 完成时间分布的时段及其开始的小时
+DAY_PERIODS = (("night", 0), ("morning", 6), ("afternoon", 12), ("evening", 18))
+
+
+def mark_dirty(events):
+    """
+    当前事务提交后登记需要重算的 (用户ID, 时间点)，不在事务中时立即写入。
+    时间点所在的本地日期由汇总时按用户时区换算
+    """
+    events = {(user_id, at) for user_id, at in events if user_id and at}
+    if events:
+        transaction.on_commit(
+            lambda: StatsDirtyDay.objects.bulk_create(
+                StatsDirtyDay(user_id=user_id, at=at) for user_id, at in events
+            )
+        )
+
+
+def mark_sessions_dirty(sessions):
+    mark_dirty((session.user_id, session.start) for session in sessions)
+
+
+def mark_tasks_dirty(tasks):
+    """任务统计按截止日期归属，截止时间修改过的任务新旧两天都要重算"""
+    mark_dirty(
+        (task.user_id, due_date)
+        for task in tasks
+        for due_date in (task.due_date, getattr(task, "_stats_due_date", None))
+    )
+
+
+def mark_activities_dirty(activity_ids):
+    """
+    活动改了所属任务后，其计时区间所在日期的时间分配需要重算。
+    区间可能很多，先按用户时区换算成本地日期，每个日期只登记一次（登记该日零点）
+    """
+    sessions = FocusSession.objects.filter(activity_id__in=activity_ids).order_by()
+    zones = user_zones(sessions.values_list("user_id", flat=True).distinct())
+    days = {
+        (user_id, local_date(start, zones[user_id]))
+        for user_id, start in sessions.values_list("user_id", "start").iterator(chunk_size=2000)
+        if user_id in zones
+    }
+    mark_dirty((user_id, day_start(day, zones[user_id])) for user_id, day in days)
+
+
+def user_zones(user_ids):
+    """用户ID到时区，不存在的用户不在结果中"""
+    return {
+        user_id: get_zone(name)
+        for user_id, name in User.objects.filter(pk__in=user_ids)
+        .order_by()
+        .values_list("pk", "time_zone")
+    }
+
+
+def day_period(hour):
+    name = DAY_PERIODS[0][0]
+    for period, start in DAY_PERIODS:
+        if hour >= start:
+            name = period
+    return name
+
+
+def build_task_stats(user_id, day, rows):
+    total = completed = overdue = 0
+    priorities = defaultdict(int)
+    periods = defaultdict(int)
+    for task_status, priority, hour, count in rows:
+        total += count
+        priorities[priority] += count
+        if task_status == "COMPLETED":
+            # 没有单独的完成时间，以最后修改时间近似
+            completed += count
+            periods[day_period(hour)] += count
+        elif task_status == "OVERDUE":
+            overdue += count
+    return TaskStats(
+        user_id=user_id,
+        date=day,
+        total_tasks=total,
+        completed_tasks=completed,
+        overdue_tasks=overdue,
+        priority_distribution=dict(priorities),
+        completion_time_distribution=dict(periods),
+    )
+
+
+def build_activity_stats(user_id, day, rows):
+    kinds = defaultdict(int)
+    trend = defaultdict(int)
+    for hour, kind, category, seconds, count in rows:
+        kinds[kind] += seconds
+        if kind in FOCUS_KINDS:
+            trend[str(hour)] += seconds
+    return ActivityStats(
+        user_id=user_id,
+        date=day,
+        pomodoro_duration=timedelta(seconds=kinds.get(FocusSession.POMODORO, 0)),
+        stopwatch_duration=timedelta(seconds=kinds.get(FocusSession.STOPWATCH, 0)),
+        activity_type_distribution=dict(kinds),
+        daily_trend=dict(trend),
+    )
+
+
+def build_efficiency_stats(user_id, day, rows, task_stats):
+    focus = rest = pomodoros = focus_sessions = 0
+    allocation = defaultdict(int)
+    for hour, kind, category, seconds, count in rows:
+        if kind in FOCUS_KINDS:
+            focus += seconds
+            focus_sessions += count
+            allocation[category or UNCATEGORIZED] += seconds
+            if kind == FocusSession.POMODORO:
+                pomodoros += count
+        else:
+            rest += seconds
+    tracked = focus + rest
+    total_tasks = task_stats.total_tasks
+    return EfficiencyStats(
+        user_id=user_id,
+        date=day,
+        # 专注时间占计时时间（含休息）的百分比
+        efficiency_score=round(focus / tracked * 100, 1) if tracked else 0,
+        time_allocation=dict(allocation),
+        goal_achievement_rate=(
+            round(task_stats.completed_tasks / total_tasks * 100, 1) if total_tasks else 0
+        ),
+        habit_tracking={
+            "focused": focus > 0,
+            "pomodoros": pomodoros,
+            "focus_sessions": focus_sessions,
+        },
+    )
+
+
+def compute_rollups(keys, zones):
+    """
+    按用户时区重算一批 (用户ID, 本地日期) 的统计，返回 (任务统计, 活动统计, 效率统计) 实例列表。
+    每个用户的日期范围预先换算成 UTC 边界，计时区间和任务各用一条范围查询取出，
+    再按边界归入本地日期
+    """
+    keys = set(keys)
+    if not keys:
+        return [], [], []
+    days_by_user = defaultdict(list)
+    for user_id, day in keys:
+        days_by_user[user_id].append(day)
+    boundaries = {
+        user_id: DayBoundaries(min(days), max(days), zones[user_id])
+        for user_id, days in days_by_user.items()
+    }
+
+    def in_ranges(field):
+        condition = Q()
+        for user_id, bounds in boundaries.items():
+            condition |= Q(
+                user_id=user_id, **{f"{field}__gte": bounds.start, f"{field}__lt": bounds.end}
+            )
+        return condition
+
+    def local_key(user_id, value):
+        return user_id, boundaries[user_id].day_of(value)
+
+    def local_hour(user_id, value):
+        return value.astimezone(zones[user_id]).hour
+
+    sessions = defaultdict(list)
+    rows = (
+        FocusSession.objects.filter(in_ranges("start"))
+        .order_by()
+        .values_list("user_id", "start", "kind", "activity__task__category__name", "seconds")
+    )
+    for user_id, start, kind, category, seconds in rows:
+        key = local_key(user_id, start)
+        if key in keys:
+            sessions[key].append((local_hour(user_id, start), kind, category, seconds, 1))
+
+    tasks = defaultdict(list)
+    rows = (
+        Task.objects.filter(in_ranges("due_date"))
+        .order_by()
+        .values_list("user_id", "due_date", "status", "priority", "updated_at")
+    )
+    for user_id, due_date, task_status, priority, updated_at in rows:
+        key = local_key(user_id, due_date)
+        if key in keys:
+            tasks[key].append((task_status, priority, local_hour(user_id, updated_at), 1))
+
+    task_stats, activity_stats, efficiency_stats = [], [], []
+    for user_id, day in sorted(keys):
+        day_tasks = build_task_stats(user_id, day, tasks[user_id, day])
+        task_stats.append(day_tasks)
+        activity_stats.append(build_activity_stats(user_id, day, sessions[user_id, day]))
+        efficiency_stats.append(
+            build_efficiency_stats(user_id, day, sessions[user_id, day], day_tasks)
+        )
+    return task_stats, activity_stats, efficiency_stats
+
+
+def upsert(model, instances):
+    """按 (user, date) 唯一约束插入或覆盖"""
+    update_fields = [
+        field.name
+        for field in model._meta.concrete_fields
+        if field.name not in ("id", "user", "date")
+    ]
+    # MySQL 的 ON DUPLICATE KEY UPDATE 不能指定冲突的唯一键
+    unique_fields = (
+        ["user", "date"] if connection.features.supports_update_conflicts_with_target else None
+    )
+    model.objects.bulk_create(
+        instances,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
+
+
+def save_rollups(keys, zones):
+    """重算并写回一批 (用户ID, 本地日期)，zones 中没有的（已删除的）用户跳过，返回写回的天数"""
+    keys = {(user_id, day) for user_id, day in keys if user_id in zones}
+    task_stats, activity_stats, efficiency_stats = compute_rollups(keys, zones)
+    with transaction.atomic():
+        upsert(TaskStats, task_stats)
+        upsert(ActivityStats, activity_stats)
+        upsert(EfficiencyStats, efficiency_stats)
+    return len(keys)
+
+
+def process_dirty_days(batch_size=500):
+    """
+    按登记顺序分批重算待处理的日期，返回重算的天数。
+    只删除本批读到的登记，重算期间新登记的同一天留到下一批再算一次
+    """
+    total = 0
+    while True:
+        rows = list(
+            StatsDirtyDay.objects.order_by("id").values_list("id", "user_id", "at")[:batch_size]
+        )
+        if not rows:
+            return total
+        zones = user_zones({user_id for _, user_id, _ in rows})
+        total += save_rollups(
+            {(user_id, local_date(at, zones[user_id])) for _, user_id, at in rows if user_id in zones},
+            zones,
+        )
+        StatsDirtyDay.objects.filter(id__in=[row_id for row_id, _, _ in rows]).delete()
+
+
+def user_days(user_id, zone):
+    """用户有计时区间或任务截止的全部本地日期，在内存中换算，不依赖数据库的时区表"""
+    days = set()
+    for queryset, field in ((FocusSession.objects, "start"), (Task.objects, "due_date")):
+        values = queryset.filter(user_id=user_id).order_by().values_list(field, flat=True)
+        days.update(local_date(value, zone) for value in values.iterator(chunk_size=2000))
+    return days
+
+
+def backfill_shard(shard, shards, days_per_batch=366, restart=False, progress=None):
+    """
+    回填 id % shards == shard 的用户的全部历史统计，返回本次处理的用户数。
+    每个用户写完后在同一事务内推进检查点，中断后从下一个用户继续；已完成的分片直接返回
+    """
+    checkpoint, _ = RollupCheckpoint.objects.get_or_create(name=f"backfill:{shards}:{shard}")
+    if restart:
+        checkpoint.last_user_id = 0
+        checkpoint.finished = False
+        checkpoint.save()
+    if checkpoint.finished:
+        return 0
+
+    users = 0
+    while True:
+        user_ids = list(
+            User.objects.annotate(shard=Mod("pk", shards))
+            .filter(shard=shard, pk__gt=checkpoint.last_user_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:100]
+        )
+        if not user_ids:
+            break
+        zones = user_zones(user_ids)
+        for user_id in user_ids:
+            days = sorted(user_days(user_id, zones[user_id]))
+            with transaction.atomic():
+                for i in range(0, len(days), days_per_batch):
+                    save_rollups([(user_id, day) for day in days[i:i + days_per_batch]], zones)
+                checkpoint.last_user_id = user_id
+                checkpoint.save(update_fields=["last_user_id", "updated_at"])
+            users += 1
+            if progress:
+                progress(user_id, len(days))
+
+    checkpoint.finished = True
+    checkpoint.save(update_fields=["finished", "updated_at"])
+    return users
+
+
+def _process_and_log(batch_size):
+    count = process_dirty_days(batch_size=batch_size)
+    if count:
+        logger.info("已重算 %s 天的统计", count)
+
+
+def start_stats_rollup(interval, batch_size=500):
+    """启动进程内的统计汇总线程（每个进程只启动一次）"""
+    return start_periodic("stats-rollup", interval, lambda: _process_and_log(batch_size))
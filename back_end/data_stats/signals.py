@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from activities.models import FocusSession
+from tasks.models import Task
+from .rollup import mark_sessions_dirty, mark_tasks_dirty
+
+
+@receiver(post_init, sender=Task, dispatch_uid="stats_task_loaded")
+def remember_task_due_date(sender, instance, **kwargs):
+    # 记下加载时的截止时间，修改后新旧两天都要重算；延迟加载的字段不触发查询
+    instance._stats_due_date = instance.__dict__.get("due_date")
+
+
+@receiver(post_save, sender=Task, dispatch_uid="stats_task_saved")
+@receiver(post_delete, sender=Task, dispatch_uid="stats_task_deleted")
+def mark_task_day(sender, instance, **kwargs):
+    mark_tasks_dirty([instance])
+    instance._stats_due_date = instance.due_date
+
+
+@receiver(post_save, sender=FocusSession, dispatch_uid="stats_session_saved")
+@receiver(post_delete, sender=FocusSession, dispatch_uid="stats_session_deleted")
+def mark_session_day(sender, instance, **kwargs):
+    # 批量写入不发信号，由写入方显式登记
+    mark_sessions_dirty([instance])
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.db.models import Avg, Count, Q, Sum
+from schedule_system.days import day_range, local_today, user_zone
+from tasks.models import Task
+from .models import ActivityStats, EfficiencyStats
+
+TREND_DAYS = 7
+
+
+def rate(part, total):
+    return (part / total * 100) if total > 0 else 0
+
+
+def task_summary(user, today=None):
+    """
+    任务计数用条件聚合一次查出。today 为用户时区的本地日期（默认当天），
+    换算成 UTC 时间范围比较，不对每行做时区转换
+    """
+    zone = user_zone(user)
+    start, end = day_range(today or local_today(zone), zone)
+    today_q = Q(created_at__gte=start, created_at__lt=end) | Q(due_date__gte=start, due_date__lt=end)
+    counts = Task.objects.filter(user=user).aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="COMPLETED")),
+        overdue=Count("id", filter=Q(status="OVERDUE")),
+        today_total=Count("id", filter=today_q),
+        today_completed=Count("id", filter=today_q & Q(status="COMPLETED")),
+    )
+    return {
+        "total_tasks": counts["total"],
+        "completed_tasks": counts["completed"],
+        "overdue_tasks": counts["overdue"],
+        "completion_rate": rate(counts["completed"], counts["total"]),
+        "overdue_rate": rate(counts["overdue"], counts["total"]),
+        "today_total": counts["today_total"],
+        "today_completed": counts["today_completed"],
+        "today_completion_rate": rate(counts["today_completed"], counts["today_total"]),
+    }
+
+
+def activity_summary(queryset, today=None):
+    """
+    活动时长合计；给出 today 时同一条查询中按日期条件求和，得到截至当天最近 7 天的趋势
+    """
+    aggregates = {
+        "pomodoro": Sum("pomodoro_duration"),
+        "stopwatch": Sum("stopwatch_duration"),
+    }
+    days = []
+    if today is not None:
+        days = [today - timedelta(days=i) for i in range(TREND_DAYS - 1, -1, -1)]
+        for i, day in enumerate(days):
+            aggregates[f"pomodoro_{i}"] = Sum("pomodoro_duration", filter=Q(date=day))
+            aggregates[f"stopwatch_{i}"] = Sum("stopwatch_duration", filter=Q(date=day))
+    totals = queryset.aggregate(**aggregates)
+
+    total_pomodoro = totals["pomodoro"] or 0
+    total_stopwatch = totals["stopwatch"] or 0
+    summary = {
+        "total_pomodoro_duration": total_pomodoro,
+        "total_stopwatch_duration": total_stopwatch,
+        "total_duration": total_pomodoro + total_stopwatch,
+    }
+    if days:
+        # 趋势以分钟为单位，没有统计的日期为 0
+        summary["daily_pomodoro_duration"] = [
+            totals[f"pomodoro_{i}"].total_seconds() / 60 if totals[f"pomodoro_{i}"] else 0
+            for i in range(len(days))
+        ]
+        summary["daily_stopwatch_duration"] = [
+            totals[f"stopwatch_{i}"].total_seconds() / 60 if totals[f"stopwatch_{i}"] else 0
+            for i in range(len(days))
+        ]
+    return summary
+
+
+def efficiency_summary(queryset):
+    averages = queryset.aggregate(
+        efficiency=Avg("efficiency_score"), goal=Avg("goal_achievement_rate")
+    )
+    return {
+        "average_efficiency_score": averages["efficiency"] or 0,
+        "average_goal_achievement_rate": averages["goal"] or 0,
+    }
+
+
+def stats_summary(user, today=None):
+    """仪表盘汇总：任务、活动（含趋势）和效率各一条聚合查询，today 默认为用户时区的当天"""
+    today = today or local_today(user_zone(user))
+    return {
+        "task_stats": task_summary(user, today),
+        "activity_stats": activity_summary(ActivityStats.objects.filter(user=user), today),
+        "efficiency_stats": efficiency_summary(EfficiencyStats.objects.filter(user=user)),
+    }
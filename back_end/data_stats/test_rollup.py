@@ -0,0 +1,171 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from activities.models import FocusSession, PomodoroActivity
+from app_settings.models import TaskCategory
+from tasks.models import Task
+from .models import ActivityStats, EfficiencyStats, RollupCheckpoint, StatsDirtyDay, TaskStats
+from .rollup import backfill_shard, mark_activities_dirty, process_dirty_days
+
+User = get_user_model()
+
+
+def at(day, hour, minute=0):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+class RollupTests(TestCase):
+    # 任务的截止时间不能早于当前时间，统计日期取未来的一天
+    day = date.today() + timedelta(days=10)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        category = TaskCategory.objects.create(name="工作", user=self.user)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, category=category, due_date=at(self.day, 18)
+        )
+        self.activity = PomodoroActivity.objects.create(
+            title="番茄钟", user=self.user, task=self.task
+        )
+
+    def add_session(self, kind, hour, minutes, user=None, activity=None):
+        start = at(self.day, hour)
+        return FocusSession.objects.create(
+            user=user or self.user,
+            activity=activity or self.activity,
+            kind=kind,
+            start=start,
+            end=start + timedelta(minutes=minutes),
+            seconds=minutes * 60,
+        )
+
+    def dirty_events(self):
+        return set(StatsDirtyDay.objects.values_list("user_id", "at"))
+
+    def test_marks_days_on_commit(self):
+        StatsDirtyDay.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_session(FocusSession.POMODORO, 9, 25)
+            self.task.due_date = at(self.day + timedelta(days=2), 12)
+            self.task.save()
+            # 提交之前不写入
+            self.assertFalse(StatsDirtyDay.objects.exists())
+        # 截止时间修改前后的两天都要重算
+        self.assertEqual(
+            self.dirty_events(),
+            {
+                (self.user.pk, at(self.day, 9)),
+                (self.user.pk, at(self.day, 18)),
+                (self.user.pk, at(self.day + timedelta(days=2), 12)),
+            },
+        )
+
+    def test_worker_recomputes_and_upserts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_session(FocusSession.POMODORO, 9, 25)
+            self.add_session(FocusSession.SHORT_BREAK, 9, 5)
+            self.add_session(FocusSession.POMODORO, 14, 25)
+            Task.objects.create(
+                title="完成", user=self.user, status="COMPLETED", priority="URGENT_IMPORTANT",
+                due_date=at(self.day, 20),
+            )
+        TaskStats.objects.create(
+            user=self.user, date=self.day, total_tasks=99, completed_tasks=0, overdue_tasks=0,
+            priority_distribution={}, completion_time_distribution={},
+        )
+
+        # 读登记、用户和两条聚合，三条 upsert 及其保存点，删除登记，再读一次确认已处理完
+        with self.assertNumQueries(11):
+            self.assertEqual(process_dirty_days(), 1)
+        self.assertFalse(StatsDirtyDay.objects.exists())
+
+        tasks = TaskStats.objects.get(user=self.user, date=self.day)
+        self.assertEqual((tasks.total_tasks, tasks.completed_tasks), (2, 1))
+        self.assertEqual(tasks.priority_distribution, {"NOT_URGENT_NOT_IMPORTANT": 1, "URGENT_IMPORTANT": 1})
+
+        activity = ActivityStats.objects.get(user=self.user, date=self.day)
+        self.assertEqual(activity.pomodoro_duration, timedelta(minutes=50))
+        self.assertEqual(activity.daily_trend, {"9": 25 * 60, "14": 25 * 60})
+
+        efficiency = EfficiencyStats.objects.get(user=self.user, date=self.day)
+        self.assertEqual(efficiency.efficiency_score, 90.9)
+        self.assertEqual(efficiency.time_allocation, {"工作": 50 * 60})
+        self.assertEqual(efficiency.goal_achievement_rate, 50)
+        self.assertEqual(efficiency.habit_tracking["pomodoros"], 2)
+
+    def test_days_follow_user_time_zone(self):
+        self.user.time_zone = "Asia/Shanghai"
+        self.user.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            # UTC 17:00 是上海次日 1 点；setUp 中截止于 UTC 18:00 的任务同样落在次日
+            self.add_session(FocusSession.POMODORO, 17, 25)
+            self.task.save()
+        process_dirty_days()
+
+        next_day = self.day + timedelta(days=1)
+        self.assertFalse(ActivityStats.objects.filter(date=self.day).exists())
+        activity = ActivityStats.objects.get(user=self.user, date=next_day)
+        self.assertEqual(activity.daily_trend, {"1": 25 * 60})
+        self.assertEqual(TaskStats.objects.get(user=self.user, date=next_day).total_tasks, 1)
+
+    def test_activity_marks_one_per_local_day(self):
+        """测试活动改动按本地日期登记，同一天的多个计时区间只登记一次"""
+        self.user.time_zone = "Asia/Kolkata"
+        self.user.save()
+        for hour in range(8, 18):
+            self.add_session(FocusSession.POMODORO, hour, 25)
+        # UTC 19:00 是加尔各答次日 0:30
+        self.add_session(FocusSession.POMODORO, 19, 25)
+        StatsDirtyDay.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_activities_dirty([self.activity.id])
+        # 登记的是两个本地日期的零点
+        next_day = self.day + timedelta(days=1)
+        midnight = at(self.day, 18, 30)
+        self.assertEqual(
+            self.dirty_events(),
+            {(self.user.pk, midnight - timedelta(days=1)), (self.user.pk, midnight)},
+        )
+
+        process_dirty_days()
+        self.assertEqual(
+            set(ActivityStats.objects.values_list("date", "pomodoro_duration")),
+            {(self.day, timedelta(minutes=250)), (next_day, timedelta(minutes=25))},
+        )
+
+    def test_backfill_resumes_from_checkpoint(self):
+        users = [self.user] + [
+            User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="testpass123"
+            )
+            for i in range(3)
+        ]
+        for user in users[1:]:
+            Task.objects.create(title="任务", user=user, due_date=at(self.day, 10))
+        self.add_session(FocusSession.POMODORO, 9, 25)
+
+        shard = users[0].pk % 2
+        shard_users = [user.pk for user in users if user.pk % 2 == shard]
+        # 模拟中断：检查点已推进到分片的第一个用户
+        RollupCheckpoint.objects.create(name=f"backfill:2:{shard}", last_user_id=shard_users[0])
+        self.assertEqual(backfill_shard(shard, 2), len(shard_users) - 1)
+        self.assertEqual(
+            set(TaskStats.objects.values_list("user_id", flat=True)), set(shard_users[1:])
+        )
+        # 已完成的分片再执行不重复处理
+        self.assertEqual(backfill_shard(shard, 2), 0)
+
+        out = StringIO()
+        call_command("backfill_stats", shards=2, shard=1 - shard, stdout=out)
+        call_command("backfill_stats", shards=2, shard=shard, restart=True, stdout=out)
+        self.assertEqual(TaskStats.objects.count(), len(users))
+        self.assertEqual(
+            ActivityStats.objects.get(user=self.user, date=self.day).pomodoro_duration,
+            timedelta(minutes=25),
+        )
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from tasks.models import Task
+from .models import ActivityStats, EfficiencyStats
+
+User = get_user_model()
+
+
+class SummaryQueryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+        now = timezone.now()
+        Task.objects.bulk_create(
+            Task(title=f"任务{i}", user=self.user, status=task_status, due_date=due)
+            for i, (task_status, due) in enumerate([
+                ("COMPLETED", now),
+                ("COMPLETED", now + timedelta(days=3)),
+                ("OVERDUE", now - timedelta(days=3)),
+                ("PENDING", now + timedelta(days=3)),
+            ])
+        )
+        # 最近 7 天中隔天有统计，另有一条 7 天之前的
+        for days_ago in (0, 2, 4, 6, 10):
+            ActivityStats.objects.create(
+                user=self.user,
+                date=self.today - timedelta(days=days_ago),
+                pomodoro_duration=timedelta(minutes=25 * (days_ago + 1)),
+                stopwatch_duration=timedelta(minutes=10),
+                activity_type_distribution={},
+                daily_trend={},
+            )
+        for score in (60, 80):
+            EfficiencyStats.objects.create(
+                user=self.user,
+                date=self.today - timedelta(days=score // 20),
+                efficiency_score=score,
+                time_allocation={},
+                goal_achievement_rate=score / 100,
+                habit_tracking={},
+            )
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="otherpass123"
+        )
+        Task.objects.create(title="他人", user=other, due_date=now + timedelta(days=1))
+
+    def test_dashboard_summary_in_three_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/stats/summary/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        tasks = response.data["task_stats"]
+        self.assertEqual(tasks["total_tasks"], 4)
+        self.assertEqual(tasks["completed_tasks"], 2)
+        self.assertEqual(tasks["overdue_tasks"], 1)
+        self.assertEqual(tasks["completion_rate"], 50)
+        self.assertEqual(tasks["overdue_rate"], 25)
+        # 今天创建的 4 个任务都算今日任务
+        self.assertEqual(tasks["today_total"], 4)
+        self.assertEqual(tasks["today_completed"], 2)
+
+        activity = response.data["activity_stats"]
+        self.assertEqual(
+            activity["daily_pomodoro_duration"], [175, 0, 125, 0, 75, 0, 25]
+        )
+        self.assertEqual(activity["daily_stopwatch_duration"], [10, 0, 10, 0, 10, 0, 10])
+        self.assertEqual(activity["total_pomodoro_duration"], timedelta(minutes=25 * 27))
+        self.assertEqual(activity["total_stopwatch_duration"], timedelta(minutes=50))
+
+        efficiency = response.data["efficiency_stats"]
+        self.assertEqual(efficiency["average_efficiency_score"], 70)
+        self.assertAlmostEqual(efficiency["average_goal_achievement_rate"], 0.7)
+
+    def test_single_summaries_in_one_query(self):
+        for url in (
+            "/api/task-stats/summary/",
+            "/api/activity-stats/summary/",
+            "/api/efficiency-stats/summary/",
+        ):
+            with self.subTest(url=url), self.assertNumQueries(1):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_empty_summary(self):
+        Task.objects.filter(user=self.user).delete()
+        ActivityStats.objects.all().delete()
+        EfficiencyStats.objects.all().delete()
+        response = self.client.get("/api/stats/summary/")
+        self.assertEqual(response.data["task_stats"]["completion_rate"], 0)
+        self.assertEqual(response.data["activity_stats"]["total_duration"], 0)
+        self.assertEqual(response.data["activity_stats"]["daily_pomodoro_duration"], [0] * 7)
+        self.assertEqual(response.data["efficiency_stats"]["average_efficiency_score"], 0)
@@ -129,19 +129,19 @@ class StatsViewSetTests(APITestCase):
         """测试获取任务统计列表"""
         response = self.client.get('/api/task-stats/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_activity_stats_list(self):
         """测试获取活动统计列表"""
         response = self.client.get('/api/activity-stats/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_efficiency_stats_list(self):
         """测试获取效率统计列表"""
         response = self.client.get('/api/efficiency-stats/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_stats_summary(self):
         """测试获取统计汇总"""
@@ -180,19 +180,19 @@ class StatsViewSetTests(APITestCase):
         # 测试开始日期过滤
         response = self.client.get(f'/api/task-stats/?start_date={date.today()}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # 今天和明天的数据
+        self.assertEqual(len(response.data['results']), 2)  # 今天和明天的数据
         
         # 测试结束日期过滤
         response = self.client.get(f'/api/task-stats/?end_date={date.today()}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # 昨天和今天的数据
+        self.assertEqual(len(response.data['results']), 2)  # 昨天和今天的数据
         
         # 测试日期范围过滤
         response = self.client.get(
             f'/api/task-stats/?start_date={yesterday}&end_date={date.today()}'
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # 昨天和今天的数据
+        self.assertEqual(len(response.data['results']), 2)  # 昨天和今天的数据
 
     def test_task_stats_summary(self):
         """测试任务统计摘要"""
@@ -261,5 +261,5 @@ class StatsViewSetTests(APITestCase):
         # 验证当前用户只能看到自己的数据
         response = self.client.get('/api/task-stats/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['total_tasks'], self.task_stats.total_tasks)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['total_tasks'], self.task_stats.total_tasks)
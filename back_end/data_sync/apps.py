@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DataSyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'data_sync'
+
+    def ready(self):
+        from . import signals  # noqa: F401  注册删除记录的信号处理
@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    已删除数据的记录，供增量同步告知客户端删除本地副本。
+    只保存用户ID而不建外键，删除用户时级联删除的数据同样会留下记录，由清理命令按保留期删除
+    """
+
+    user_id = models.BigIntegerField(verbose_name="所属用户ID")
+    model = models.CharField(max_length=50, verbose_name="数据类型")
+    object_id = models.BigIntegerField(verbose_name="数据ID")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="删除时间")
+
+    class Meta:
+        verbose_name = "删除记录"
+        verbose_name_plural = "删除记录"
+        indexes = [
+            models.Index(fields=["user_id", "deleted_at"]),  # 增量同步
+            models.Index(fields=["deleted_at"]),  # 按保留期清理
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id}"
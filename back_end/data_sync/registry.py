@@ -0,0 +1,30 @@
+from activities.models import Activity, PomodoroActivity, StopwatchActivity
+from app_settings.models import TaskCategory
+from reminders.models import Reminder
+from tasks.models import Task
+
+# 参与增量同步的模型，键同时用作响应中的分组名和删除记录中的数据类型
+SYNC_MODELS = {
+    "tasks": Task,
+    "pomodoro_activities": PomodoroActivity,
+    "stopwatch_activities": StopwatchActivity,
+    "reminders": Reminder,
+    "task_categories": TaskCategory,
+}
+
+# 两种活动共用一张表，按 kind 确定所属分组
+ACTIVITY_SYNC_KEYS = {
+    model.KIND: model_key
+    for model_key, model in SYNC_MODELS.items()
+    if issubclass(model, Activity)
+}
+
+
+def get_sync_fields(model):
+    """同步返回的列：除所属用户外的全部字段，外键只返回ID；活动不返回类型和该类型不使用的字段"""
+    excluded = {"user"}
+    if issubclass(model, Activity):
+        excluded.update(("kind", *model.unused_fields))
+    return [
+        field.attname for field in model._meta.concrete_fields if field.name not in excluded
+    ]
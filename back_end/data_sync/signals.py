@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+from activities.models import Activity
+from app_settings.models import TaskCategory
+from tasks.models import Task
+from . import tombstones
+from .registry import ACTIVITY_SYNC_KEYS, SYNC_MODELS
+
+
+def tombstone_recorder(model_key):
+    def record_tombstone(sender, instance, **kwargs):
+        # 级联删除同样会触发，任务被删除时其活动和提醒也会留下记录；
+        # 批量删除在 batch_tombstones() 中进行，记录合并为一条批量插入
+        tombstones.record_tombstone(instance.user_id, model_key, instance.pk)
+
+    return record_tombstone
+
+
+def record_activity_tombstone(sender, instance, **kwargs):
+    # 级联删除时两种活动可能以同一个 sender 发出，分组以活动自身的 kind 为准
+    tombstones.record_tombstone(instance.user_id, ACTIVITY_SYNC_KEYS[instance.kind], instance.pk)
+
+
+def touch_category_tasks(sender, instance, **kwargs):
+    # 删除分类时任务的分类由 SET_NULL 直接置空，不经过 save()；
+    # 更新这些任务的修改时间，增量同步才会返回清空了分类的任务
+    Task.objects.filter(category_id=instance.pk).update(updated_at=timezone.now())
+
+
+pre_delete.connect(
+    touch_category_tasks,
+    sender=TaskCategory,
+    weak=False,
+    dispatch_uid="data_sync_touch_category_tasks",
+)
+
+for model_key, model in SYNC_MODELS.items():
+    if issubclass(model, Activity):
+        continue
+    post_delete.connect(
+        tombstone_recorder(model_key),
+        sender=model,
+        weak=False,
+        dispatch_uid=f"data_sync_tombstone_{model_key}",
+    )
+
+for model in (Activity, *(m for m in SYNC_MODELS.values() if issubclass(m, Activity))):
+    post_delete.connect(
+        record_activity_tombstone,
+        sender=model,
+        weak=False,
+        dispatch_uid=f"data_sync_tombstone_{model._meta.model_name}",
+    )
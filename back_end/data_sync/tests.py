@@ -0,0 +1,163 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity, StopwatchActivity
+from app_settings.models import TaskCategory
+from reminders.models import Reminder
+from tasks.models import Task
+from . import views
+from .models import Tombstone
+from .views import encode_sync_token
+
+User = get_user_model()
+
+
+class SyncTests(APITestCase):
+    url = "/api/sync/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="otheruser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = TaskCategory.objects.create(name="学习", user=self.user)
+        self.task = self.create_task("任务1")
+        self.reminder = Reminder.objects.create(
+            user=self.user, title="提醒", task=self.task, remind_at=self.task.due_date
+        )
+        self.create_task("其他用户的任务", user=self.other_user)
+        # 去掉重叠余量，使令牌之前的写入不会被重复返回
+        patcher = mock.patch.object(views, "SYNC_OVERLAP", timedelta(0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_task(self, title, user=None):
+        return Task.objects.create(
+            title=title,
+            user=user or self.user,
+            category=self.category if user is None else None,
+            due_date=timezone.now() + timedelta(days=1),
+        )
+
+    def sync(self, token=None):
+        response = self.client.get(self.url, {"since": token} if token else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        """测试首次同步返回当前用户的全部数据"""
+        data = self.sync()
+        self.assertTrue(data["reset"])
+        self.assertEqual([row["id"] for row in data["changes"]["tasks"]], [self.task.id])
+        self.assertEqual(data["changes"]["tasks"][0]["category_id"], self.category.id)
+        self.assertNotIn("user_id", data["changes"]["tasks"][0])
+        self.assertEqual(len(data["changes"]["reminders"]), 1)
+        self.assertEqual(len(data["changes"]["task_categories"]), 1)
+        self.assertTrue(data["token"])
+
+    def test_only_changes_after_token(self):
+        """测试带令牌时只返回之后变化的数据"""
+        token = self.sync()["token"]
+        new_task = self.create_task("任务2")
+
+        data = self.sync(token)
+        self.assertFalse(data["reset"])
+        self.assertEqual([row["id"] for row in data["changes"]["tasks"]], [new_task.id])
+        self.assertEqual(data["changes"]["reminders"], [])
+        self.assertEqual(data["deleted"]["tasks"], [])
+
+    def test_deletes_produce_tombstones(self):
+        """测试单条删除、批量删除和级联删除都会返回删除记录"""
+        activity = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        stopwatch = StopwatchActivity.objects.create(title="正计时", user=self.user, task=self.task)
+        other = self.create_task("任务2")
+        token = self.sync()["token"]
+
+        response = self.client.post(
+            "/api/tasks/bulk_delete/", {"task_ids": [self.task.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.delete(f"/api/tasks/{other.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        data = self.sync(token)
+        self.assertCountEqual(data["deleted"]["tasks"], [self.task.id, other.id])
+        self.assertEqual(data["deleted"]["pomodoro_activities"], [activity.id])
+        self.assertEqual(data["deleted"]["stopwatch_activities"], [stopwatch.id])
+        self.assertEqual(data["deleted"]["reminders"], [self.reminder.id])
+
+    def test_category_delete_returns_affected_tasks(self):
+        """测试删除分类后，分类被置空的任务出现在增量同步中"""
+        token = self.sync()["token"]
+        category_id = self.category.id
+        self.category.delete()
+
+        data = self.sync(token)
+        self.assertEqual(data["deleted"]["task_categories"], [category_id])
+        (task,) = data["changes"]["tasks"]
+        self.assertEqual((task["id"], task["category_id"]), (self.task.id, None))
+
+    def test_bulk_delete_inserts_tombstones_once(self):
+        """测试批量删除及其级联删除的删除记录只用一条 INSERT 写入"""
+        tasks = [self.task] + [self.create_task(f"任务{i}") for i in range(5)]
+        for task in tasks:
+            PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=task)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                "/api/tasks/bulk_delete/", {"task_ids": [t.id for t in tasks]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        inserts = [
+            q["sql"] for q in context.captured_queries
+            if q["sql"].startswith('INSERT INTO "data_sync_tombstone"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        # 6 个任务、6 个番茄钟和 1 个提醒
+        self.assertEqual(Tombstone.objects.filter(user_id=self.user.id).count(), 13)
+
+    def test_steady_state_is_small_and_constant(self):
+        """测试没有变化时不返回数据，查询数不随数据量增长"""
+        for i in range(20):
+            self.create_task(f"批量任务{i}")
+        token = self.sync()["token"]
+
+        with CaptureQueriesContext(connection) as context:
+            data = self.sync(token)
+        self.assertTrue(all(rows == [] for rows in data["changes"].values()))
+        self.assertTrue(all(ids == [] for ids in data["deleted"].values()))
+        # 五个模型各一次查询，加一次删除记录查询
+        self.assertEqual(len(context.captured_queries), 6)
+
+    def test_expired_token_resets(self):
+        """测试令牌超过删除记录保留期时返回全量数据"""
+        data = self.sync(encode_sync_token(timezone.now() - timedelta(days=365)))
+        self.assertTrue(data["reset"])
+        self.assertEqual(len(data["changes"]["tasks"]), 1)
+
+    def test_invalid_token(self):
+        """测试无效令牌"""
+        response = self.client.get(self.url, {"since": "无效令牌"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_tombstones(self):
+        """测试清理过期的删除记录"""
+        Tombstone.objects.create(
+            user_id=self.user.id,
+            model="tasks",
+            object_id=1,
+            deleted_at=timezone.now() - timedelta(days=365),
+        )
+        Tombstone.objects.create(user_id=self.user.id, model="tasks", object_id=2)
+        call_command("prune_sync_tombstones", stdout=mock.MagicMock())
+        self.assertEqual(list(Tombstone.objects.values_list("object_id", flat=True)), [2])
@@ -0,0 +1,33 @@
+import threading
+from contextlib import contextmanager
+
+from .models import Tombstone
+
+_batch = threading.local()
+
+
+@contextmanager
+def batch_tombstones():
+    """
+    上下文内的删除（含级联删除）产生的删除记录先收集起来，正常退出时一次 bulk_create 写入，
+    而不是每行一条 INSERT。应在删除所在的事务内使用，嵌套时由最外层写入
+    """
+    if getattr(_batch, "pending", None) is not None:
+        yield
+        return
+    _batch.pending = []
+    try:
+        yield
+        Tombstone.objects.bulk_create(_batch.pending, batch_size=1000)
+    finally:
+        _batch.pending = None
+
+
+def record_tombstone(user_id, model_key, object_id):
+    """记录一条删除；在 batch_tombstones() 中时加入本批，否则立即写入"""
+    tombstone = Tombstone(user_id=user_id, model=model_key, object_id=object_id)
+    pending = getattr(_batch, "pending", None)
+    if pending is None:
+        tombstone.save()
+    else:
+        pending.append(tombstone)
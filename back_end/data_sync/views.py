@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .models import Tombstone
+from .registry import SYNC_MODELS, get_sync_fields
+
+# 令牌时间向前回退的余量，覆盖写入时间戳早于提交时间的并发事务。
+# 余量内的行可能重复返回，客户端按ID覆盖即可
+SYNC_OVERLAP = timedelta(seconds=2)
+
+
+def encode_sync_token(moment):
+    return base64.urlsafe_b64encode(json.dumps({"t": moment.isoformat()}).encode()).decode()
+
+
+def decode_sync_token(token):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        moment = datetime.fromisoformat(data["t"])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValidationError({"since": "无效的同步令牌"})
+    if timezone.is_naive(moment):
+        raise ValidationError({"since": "无效的同步令牌"})
+    return moment
+
+
+class SyncViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """
+        增量同步：返回令牌之后有变化的数据和删除记录，以及下一次同步用的新令牌。
+        不带令牌或令牌已超过删除记录的保留期时返回全量数据（reset 为 true），
+        客户端应以此替换本地全部数据
+        """
+        now = timezone.now()
+        since = None
+        token = request.query_params.get("since")
+        if token:
+            since = decode_sync_token(token)
+            retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+            if since < now - retention:
+                since = None
+
+        changes = {}
+        deleted = {key: [] for key in SYNC_MODELS}
+        for key, model in SYNC_MODELS.items():
+            queryset = model.objects.filter(user=request.user)
+            if since:
+                queryset = queryset.filter(updated_at__gt=since - SYNC_OVERLAP)
+            changes[key] = list(queryset.order_by().values(*get_sync_fields(model)))
+
+        if since:
+            tombstones = Tombstone.objects.filter(
+                user_id=request.user.id, deleted_at__gt=since - SYNC_OVERLAP
+            ).values_list("model", "object_id")
+            for key, object_id in tombstones:
+                if key in deleted:
+                    deleted[key].append(object_id)
+
+        return Response({
+            "token": encode_sync_token(now),
+            "reset": since is None,
+            "changes": changes,
+            "deleted": deleted,
+        })
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class PushConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'push'
+
+    def ready(self):
+        from . import signals  # noqa: F401  注册任务变化的推送
+
+        # 配置了间隔时在进程内定时推送到期提醒
+        interval = getattr(settings, "PUSH_REMINDER_INTERVAL", None)
+        if interval:
+            from .reminders import start_reminder_pusher
+
+            start_reminder_pusher(interval)
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+Event = namedtuple("Event", ("id", "user_id", "type", "data"))
+
+
+class Subscription:
+    """
+    一个推送连接的订阅，事件放入所属事件循环的队列。
+    publish 可能在同步视图的线程中调用，入队通过 call_soon_threadsafe 切回事件循环
+    """
+
+    def __init__(self, broker, user_id, maxsize):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        # 无法补发断线期间的事件，客户端应重新拉取全量数据
+        self.reset = False
+        # 消费过慢导致队列溢出，连接应结束并让客户端重连
+        self.overflowed = False
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def push(self, event):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._put(event)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout):
+        """等待下一个事件，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """
+    单节点的进程内发布订阅
+
+    每个用户保留最近 history_size 个事件，用于断线重连时按 Last-Event-ID 补发；
+    没有连接超过 history_ttl 秒的用户丢弃其历史，内存只与近期活跃的用户数有关。
+    需要的事件已被淘汰、随历史丢弃或进程重启过时，订阅标记为 reset
+    """
+
+    # 单调时钟，测试中可替换
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, history_size=None, queue_size=None, history_ttl=None):
+        self.history_size = history_size or settings.PUSH_HISTORY_SIZE
+        self.queue_size = queue_size or settings.PUSH_QUEUE_SIZE
+        self.history_ttl = history_ttl or settings.PUSH_HISTORY_TTL
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._history = {}
+        self._evicted = {}
+        # 用户最后一次收到事件或断开连接的时间，用于丢弃闲置的历史
+        self._touched = {}
+        # 已丢弃的历史中最大的事件 ID
+        self._dropped_id = 0
+        self._last_id = 0
+        self._last_prune = self.clock()
+
+    def publish(self, user_id, event_type, data):
+        with self._lock:
+            event = Event(self._last_id + 1, user_id, event_type, data)
+            self._deliver(event)
+        return event
+
+    def deliver(self, event):
+        """记录并分发到本节点上该用户的全部连接"""
+        with self._lock:
+            self._deliver(event)
+
+    def _deliver(self, event):
+        # 在锁内分发（只入队不阻塞），保证每个连接收到的事件按 ID 递增
+        self._last_id = max(self._last_id, event.id)
+        history = self._history.get(event.user_id)
+        if history is None:
+            history = self._history[event.user_id] = deque(maxlen=self.history_size)
+        if len(history) == history.maxlen:
+            self._evicted[event.user_id] = history[0].id
+        history.append(event)
+        self._touched[event.user_id] = self.clock()
+        for subscription in self._subscribers.get(event.user_id, ()):
+            subscription.push(event)
+        self._prune()
+
+    def _prune(self):
+        """每隔 history_ttl 秒丢弃一次没有连接且闲置超过 history_ttl 秒的用户的历史"""
+        now = self.clock()
+        if now - self._last_prune < self.history_ttl:
+            return
+        self._last_prune = now
+        for user_id, touched in list(self._touched.items()):
+            if user_id in self._subscribers or now - touched < self.history_ttl:
+                continue
+            history = self._history.pop(user_id, None)
+            if history:
+                self._dropped_id = max(self._dropped_id, history[-1].id)
+            self._evicted.pop(user_id, None)
+            del self._touched[user_id]
+
+    def subscribe(self, user_id, last_event_id=None):
+        """订阅用户的事件；带 last_event_id 时先补发之后的事件，补发与订阅之间不会漏发"""
+        subscription = Subscription(self, user_id, self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                if (
+                    last_event_id > self._last_id
+                    or last_event_id < self._evicted.get(user_id, 0)
+                    # 历史可能已被丢弃，无法确认断线期间没有该用户的事件
+                    or (user_id not in self._history and last_event_id < self._dropped_id)
+                ):
+                    subscription.reset = True
+                else:
+                    for event in self._history.get(user_id, ()):
+                        if event.id > last_event_id:
+                            subscription._put(event)
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+                    # 最后一个连接关闭后开始计算闲置时间，留出重连补发的窗口
+                    self._touched[subscription.user_id] = self.clock()
+            self._prune()
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class LocalBus:
+    """
+    多节点测试用的本地消息代理，相当于多个进程共享的 Redis 发布订阅：
+    统一分配事件 ID，并把事件分发到所有接入的节点
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self.nodes = []
+
+    def attach(self, node):
+        with self._lock:
+            self.nodes.append(node)
+
+    def publish(self, user_id, event_type, data):
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, user_id, event_type, data)
+            for node in self.nodes:
+                node.deliver(event)
+        return event
+
+
+default_bus = LocalBus()
+
+
+class BusBroker(InMemoryBroker):
+    """通过 LocalBus 与其他节点互通的发布订阅，任一节点发布的事件所有节点都会收到"""
+
+    def __init__(self, bus=None, history_size=None, queue_size=None, history_ttl=None):
+        super().__init__(history_size, queue_size, history_ttl)
+        self.bus = bus or default_bus
+        self.bus.attach(self)
+
+    def publish(self, user_id, event_type, data):
+        return self.bus.publish(user_id, event_type, data)
+
+
+_broker = None
+
+
+def get_broker():
+    """按 PUSH_BROKER 配置创建的进程内唯一实例"""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.PUSH_BROKER)()
+    return _broker
@@ -0,0 +1,12 @@
+from django.db import transaction
+from .broker import get_broker
+
+TIMER_EVENT = "timer"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+REMINDER_DUE = "reminder.due"
+
+
+def publish_on_commit(user_id, event_type, data):
+    """事务提交后再推送，回滚的修改不会通知客户端"""
+    transaction.on_commit(lambda: get_broker().publish(user_id, event_type, data))
@@ -0,0 +1,67 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from push.broker import InMemoryBroker
+from push.views import event_stream
+
+
+class Command(BaseCommand):
+    help = "在单个进程内建立大量空闲事件流，测量内存占用和事件送达延迟"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--streams", type=int, default=10000, help="连接数")
+        parser.add_argument("--users", type=int, default=0, help="用户数，默认每个连接一个用户")
+
+    def handle(self, *args, **options):
+        streams = options["streams"]
+        users = options["users"] or streams
+        if streams <= 0:
+            raise CommandError("连接数必须大于 0")
+        asyncio.run(self.run(streams, users))
+
+    async def run(self, streams, users):
+        broker = InMemoryBroker(history_size=10, queue_size=10)
+        received = asyncio.Queue()
+
+        async def consume(user_id):
+            subscription = broker.subscribe(user_id)
+            # 心跳间隔足够长，测试期间的连接都处于空闲状态
+            async for chunk in event_stream(subscription, heartbeat=3600):
+                if chunk.startswith("id:"):
+                    received.put_nowait(time.perf_counter())
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(consume(i % users)) for i in range(streams)]
+        # 让所有连接完成订阅并进入等待
+        while broker.connection_count() < streams:
+            await asyncio.sleep(0.01)
+        setup = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"{streams} 个连接（{users} 个用户），建立耗时 {setup:.2f} 秒，"
+            f"每个连接约 {memory / streams / 1024:.1f} KB"
+        )
+
+        published = time.perf_counter()
+        for user_id in range(users):
+            broker.publish(user_id, "timer", {"action": "start"})
+        latencies = sorted(
+            [(await received.get()) - published for _ in range(streams)]
+        )
+        self.stdout.write(
+            f"向每个用户发布一个事件，全部送达 {latencies[-1] * 1000:.1f} 毫秒，"
+            f"P50 {latencies[len(latencies) // 2] * 1000:.1f} 毫秒"
+        )
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if broker.connection_count():
+            raise CommandError(f"关闭后仍有 {broker.connection_count()} 个订阅未注销")
+        self.stdout.write("所有连接关闭后订阅均已注销")
@@ -0,0 +1,49 @@
+import logging
+
+from django.utils import timezone
+from reminders.models import Reminder
+from schedule_system.periodic import start_periodic
+from tasks.models import SweepWatermark
+from .broker import get_broker
+from .events import REMINDER_DUE
+
+logger = logging.getLogger(__name__)
+
+REMINDER_WATERMARK = "reminder_push"
+
+
+def push_due_reminders(now=None):
+    """
+    推送提醒时间落在 (上次水位, now] 的未读提醒，返回推送数量。
+    首次运行只记录水位，不补推历史提醒
+    """
+    now = now or timezone.now()
+    state = SweepWatermark.objects.filter(name=REMINDER_WATERMARK).first()
+    count = 0
+    if state is not None:
+        reminders = (
+            Reminder.objects.filter(
+                remind_at__gt=state.watermark, remind_at__lte=now, is_read=False
+            )
+            .order_by("remind_at", "id")
+            .values("id", "user_id", "title", "description", "task_id", "remind_at")
+        )
+        broker = get_broker()
+        for reminder in reminders.iterator():
+            broker.publish(reminder.pop("user_id"), REMINDER_DUE, reminder)
+            count += 1
+    SweepWatermark.objects.update_or_create(
+        name=REMINDER_WATERMARK, defaults={"watermark": now}
+    )
+    return count
+
+
+def _push_and_log():
+    count = push_due_reminders()
+    if count:
+        logger.info("已推送 %s 个到期提醒", count)
+
+
+def start_reminder_pusher(interval):
+    """启动进程内的到期提醒推送线程，事件需要在提供事件流的进程中发布"""
+    return start_periodic("reminder-pusher", interval, _push_and_log)
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from tasks.models import Task
+from .events import TASK_DELETED, TASK_UPDATED, publish_on_commit
+
+
+@receiver(post_save, sender=Task, dispatch_uid="push_task_saved")
+def push_task_saved(sender, instance, **kwargs):
+    # 只推送摘要，客户端据此按需刷新；批量修改不经过 save()，由增量同步补齐
+    publish_on_commit(
+        instance.user_id,
+        TASK_UPDATED,
+        {"id": instance.id, "status": instance.status, "updated_at": instance.updated_at},
+    )
+
+
+@receiver(post_delete, sender=Task, dispatch_uid="push_task_deleted")
+def push_task_deleted(sender, instance, **kwargs):
+    publish_on_commit(instance.user_id, TASK_DELETED, {"id": instance.id})
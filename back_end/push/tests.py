@@ -0,0 +1,229 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from activities.models import PomodoroActivity
+from reminders.models import Reminder
+from tasks.models import Task
+from . import views
+from .broker import BusBroker, InMemoryBroker, LocalBus
+from .events import REMINDER_DUE, TASK_UPDATED, TIMER_EVENT
+from .reminders import push_due_reminders
+from .views import event_stream
+
+User = get_user_model()
+
+
+class BrokerTests(SimpleTestCase):
+    async def drain(self, subscription):
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        return events
+
+    async def test_fan_out_to_all_connections(self):
+        broker = InMemoryBroker(history_size=10, queue_size=10)
+        tab1, tab2 = broker.subscribe(1), broker.subscribe(1)
+        other = broker.subscribe(2)
+        broker.publish(1, "timer", {"action": "start"})
+
+        for subscription in (tab1, tab2):
+            events = await self.drain(subscription)
+            self.assertEqual([event.data for event in events], [{"action": "start"}])
+        self.assertEqual(await self.drain(other), [])
+
+        tab1.close()
+        tab2.close()
+        other.close()
+        self.assertEqual(broker.connection_count(), 0)
+
+    async def test_replay_after_last_event_id(self):
+        """测试重连时补发 Last-Event-ID 之后的事件"""
+        broker = InMemoryBroker(history_size=3, queue_size=10)
+        first = broker.publish(1, "task.updated", {"id": 1})
+        broker.publish(2, "task.updated", {"id": 2})
+        third = broker.publish(1, "task.updated", {"id": 3})
+
+        subscription = broker.subscribe(1, last_event_id=first.id)
+        self.assertFalse(subscription.reset)
+        self.assertEqual([event.id for event in await self.drain(subscription)], [third.id])
+
+    async def test_reset_when_history_evicted(self):
+        """测试需要补发的事件已被淘汰或 ID 未知时要求客户端重新拉取"""
+        broker = InMemoryBroker(history_size=2, queue_size=10)
+        events = [broker.publish(1, "task.updated", {"id": i}) for i in range(4)]
+        self.assertTrue(broker.subscribe(1, last_event_id=events[0].id).reset)
+        self.assertFalse(broker.subscribe(1, last_event_id=events[2].id).reset)
+        self.assertTrue(broker.subscribe(1, last_event_id=999).reset)
+
+    async def test_idle_history_dropped(self):
+        """测试没有连接的用户闲置超过保留时间后丢弃历史，之后按旧 ID 重连要求重新拉取"""
+        now = [0]
+        broker = InMemoryBroker(history_size=10, queue_size=10, history_ttl=60)
+        broker.clock = lambda: now[0]
+        broker._last_prune = 0
+        subscription = broker.subscribe(1)
+        first = broker.publish(1, "timer", {})
+        broker.publish(2, "timer", {})
+        subscription.close()
+
+        now[0] = 30
+        broker.publish(3, "timer", {})
+        self.assertEqual(set(broker._history), {1, 2, 3})
+        # 保留期内重连仍可补发
+        reconnected = broker.subscribe(1, last_event_id=first.id - 1)
+        self.assertFalse(reconnected.reset)
+        reconnected.close()
+
+        now[0] = 100
+        broker.publish(3, "timer", {})
+        self.assertEqual(set(broker._history), {3})
+        self.assertTrue(broker.subscribe(1, last_event_id=first.id).reset)
+
+    async def test_publish_from_other_thread(self):
+        broker = InMemoryBroker(history_size=10, queue_size=10)
+        subscription = broker.subscribe(1)
+        await asyncio.to_thread(broker.publish, 1, "timer", {})
+        event = await subscription.get(1)
+        self.assertEqual(event.type, "timer")
+
+    async def test_multi_node_bus(self):
+        """测试多节点时任一节点发布的事件，其他节点上的连接也能收到"""
+        bus = LocalBus()
+        node_a = BusBroker(bus, history_size=10, queue_size=10)
+        node_b = BusBroker(bus, history_size=10, queue_size=10)
+        subscription = node_b.subscribe(1)
+
+        event = node_a.publish(1, "timer", {"action": "stop"})
+        received = await subscription.get(1)
+        self.assertEqual(received.id, event.id)
+        # 事件 ID 由代理统一分配，换节点重连同样可以补发
+        self.assertEqual(
+            [e.id for e in await self.drain(node_a.subscribe(1, last_event_id=0))], [event.id]
+        )
+
+    async def test_stream_heartbeat_and_overflow(self):
+        broker = InMemoryBroker(history_size=10, queue_size=1)
+        subscription = broker.subscribe(1)
+        stream = event_stream(subscription, heartbeat=0.01)
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+        self.assertEqual(await anext(stream), ": heartbeat\n\n")
+
+        broker.publish(1, "timer", {"n": 1})
+        self.assertIn('data: {"n": 1}', await anext(stream))
+
+        # 队列溢出时发送 reset 并结束连接
+        broker.publish(1, "timer", {"n": 2})
+        broker.publish(1, "timer", {"n": 3})
+        self.assertTrue((await anext(stream)).startswith("event: reset"))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(broker.connection_count(), 0)
+
+
+class StreamViewTests(TestCase):
+    url = "/api/events/stream/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.broker = InMemoryBroker(history_size=10, queue_size=10)
+        patcher = mock.patch.object(views, "get_broker", return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_requires_token(self):
+        response = await AsyncClient().get(self.url)
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient().get(self.url, {"token": "invalid"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_inactive_user_rejected(self):
+        """测试令牌有效但用户已停用时返回 401 而不是 500"""
+        token = str(AccessToken.for_user(self.user))
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await AsyncClient().get(self.url, {"token": token})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_events(self):
+        """测试通过查询参数中的令牌连接，并收到之后发布的事件"""
+        token = str(AccessToken.for_user(self.user))
+        previous = self.broker.publish(self.user.pk, "timer", {"action": "start"})
+        response = await AsyncClient().get(
+            self.url, {"token": token}, headers={"Last-Event-ID": str(previous.id - 1)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b"retry:"))
+        # 补发断线期间的事件
+        self.assertIn(f"id: {previous.id}".encode(), await anext(content))
+
+        self.broker.publish(self.user.pk, TASK_UPDATED, {"id": 5})
+        chunk = (await anext(content)).decode()
+        self.assertIn(f"event: {TASK_UPDATED}", chunk)
+        self.assertEqual(json.loads(chunk.split("data: ")[1]), {"id": 5})
+
+
+class PublishTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.broker = mock.Mock()
+        for target in ("push.events.get_broker", "push.reminders.get_broker"):
+            patcher = mock.patch(target, return_value=self.broker)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.task = Task.objects.create(
+            title="任务", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def published(self, event_type):
+        return [
+            call.args[2] for call in self.broker.publish.call_args_list
+            if call.args[1] == event_type
+        ]
+
+    def test_timer_events_after_commit(self):
+        activity = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            activity.start_pomodoro()
+        self.assertEqual(self.published(TIMER_EVENT), [])
+
+        for callback in callbacks:
+            callback()
+        (event,) = self.published(TIMER_EVENT)
+        self.assertEqual(event["action"], "start")
+        self.assertEqual(event["timer_state"]["phase"], "POMODORO")
+
+    def test_task_updated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = "新标题"
+            self.task.save()
+        self.assertEqual(self.published(TASK_UPDATED)[-1]["id"], self.task.id)
+
+    def test_due_reminders(self):
+        """测试只推送上次水位之后到期的未读提醒"""
+        now = timezone.now()
+        push_due_reminders(now - timedelta(minutes=1))
+        for minutes, is_read in ((-5, False), (-0.5, False), (-0.5, True), (5, False)):
+            Reminder.objects.create(
+                title="提醒",
+                user=self.user,
+                task=self.task,
+                remind_at=now + timedelta(minutes=minutes),
+                is_read=is_read,
+            )
+
+        self.assertEqual(push_due_reminders(now), 1)
+        (reminder,) = self.published(REMINDER_DUE)
+        self.assertEqual(reminder["task_id"], self.task.id)
+        self.assertEqual(push_due_reminders(now + timedelta(seconds=1)), 0)
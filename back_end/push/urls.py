@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import stream
+
+urlpatterns = [
+    path("events/stream/", stream, name="event-stream"),
+]
@@ -0,0 +1,88 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .broker import get_broker
+
+# 客户端断线后的重连间隔（毫秒）
+RETRY_MILLISECONDS = 3000
+
+
+def format_event(event):
+    data = json.dumps(event.data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+async def event_stream(subscription, heartbeat):
+    """
+    SSE 事件流：空闲超过 heartbeat 秒发送注释行作为心跳，保持代理和客户端的连接；
+    无法补发或队列溢出时发送 reset 事件，客户端应重新拉取数据
+    """
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        if subscription.reset:
+            yield "event: reset\ndata: {}\n\n"
+        while True:
+            event = await subscription.get(heartbeat)
+            if subscription.overflowed:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            if event is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield format_event(event)
+    finally:
+        # 客户端断开时 ASGI 服务器取消生成器，在此注销订阅
+        subscription.close()
+
+
+async def authenticate(request):
+    """
+    按 JWT 访问令牌认证。EventSource 不能设置请求头，
+    除 Authorization 头外也接受 ?token= 查询参数
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = (
+        authentication.get_raw_token(header) if header else request.GET.get("token")
+    )
+    if not raw_token:
+        return None
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # 令牌有效但用户已停用、被删除或修改过密码时 get_user 抛出 AuthenticationFailed
+        return None
+
+
+def parse_last_event_id(request):
+    value = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+@require_GET
+async def stream(request):
+    """当前用户的事件流：计时状态变化、任务修改和到期提醒"""
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse({"detail": "身份认证信息未提供或无效"}, status=401)
+
+    subscription = get_broker().subscribe(user.pk, parse_last_event_id(request))
+    response = StreamingHttpResponse(
+        event_stream(subscription, settings.PUSH_HEARTBEAT_SECONDS),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # 关闭 nginx 的响应缓冲，事件立即送达
+    response["X-Accel-Buffering"] = "no"
+    return response
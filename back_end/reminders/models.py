@@ -2,7 +2,7 @@ from django.db import models
 from django.utils import timezone
 from users.models import User
 from tasks.models import Task
-from activities.models import PomodoroActivity, StopwatchActivity
+from activities.models import Activity
 from django.core.exceptions import ValidationError
 
 
@@ -34,19 +34,11 @@ class Reminder(models.Model):
         null=True,
         blank=True,
     )
-    pomodoro_activity = models.ForeignKey(
-        PomodoroActivity,
+    activity = models.ForeignKey(
+        Activity,
         on_delete=models.CASCADE,
         related_name="reminders",
-        verbose_name="关联番茄钟活动",
-        null=True,
-        blank=True,
-    )
-    stopwatch_activity = models.ForeignKey(
-        StopwatchActivity,
-        on_delete=models.CASCADE,
-        related_name="reminders",
-        verbose_name="关联正计时活动",
+        verbose_name="关联活动",
         null=True,
         blank=True,
     )
@@ -59,14 +51,20 @@ class Reminder(models.Model):
         verbose_name = "提醒"
         verbose_name_plural = "提醒"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "id"]),  # 列表游标分页
+            models.Index(fields=["user", "updated_at"]),  # 增量同步
+            models.Index(fields=["user", "remind_at", "id"]),  # 即将到来的提醒
+            models.Index(fields=["remind_at"]),  # 到期提醒推送
+        ]
 
     def __str__(self):
         return self.title
 
     def clean(self):
-        if self.reminder_type == "TASK" and not self.task:
+        if self.reminder_type == "TASK" and not self.task_id:
             raise ValidationError("任务提醒必须关联任务")
-        elif self.reminder_type == "ACTIVITY" and not (self.pomodoro_activity or self.stopwatch_activity):
+        elif self.reminder_type == "ACTIVITY" and not self.activity_id:
             raise ValidationError("活动提醒必须关联活动")
 
     def save(self, *args, **kwargs):
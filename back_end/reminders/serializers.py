@@ -1,14 +1,37 @@
 from rest_framework import serializers
 from .models import Reminder
+from activities.models import Activity
 from django.utils import timezone
+from schedule_system.bulk import BulkUpdateSerializerMixin
+from schedule_system.fields import DynamicFieldsMixin
+from schedule_system.values import ValuesSerializer
 
 
-class ReminderSerializer(serializers.ModelSerializer):
+class ReminderSerializer(DynamicFieldsMixin, BulkUpdateSerializerMixin, serializers.ModelSerializer):
+    # 番茄钟和正计时合并为 activity 之前的只读字段，按活动类型给出 activity 的ID
+    pomodoro_activity = serializers.SerializerMethodField()
+    stopwatch_activity = serializers.SerializerMethodField()
+
     class Meta:
         model = Reminder
         fields = '__all__'
         read_only_fields = ('user', 'created_at', 'current_repeats')
 
+    field_columns = {
+        'pomodoro_activity': ('activity_id', 'activity__kind'),
+        'stopwatch_activity': ('activity_id', 'activity__kind'),
+    }
+
+    def get_pomodoro_activity(self, obj):
+        if obj.activity_id and obj.activity.kind == Activity.POMODORO:
+            return obj.activity_id
+        return None
+
+    def get_stopwatch_activity(self, obj):
+        if obj.activity_id and obj.activity.kind == Activity.STOPWATCH:
+            return obj.activity_id
+        return None
+
     def validate_reminder_time(self, value):
         """
         验证提醒时间
@@ -47,4 +70,18 @@ class ReminderSerializer(serializers.ModelSerializer):
         创建提醒时设置用户
         """
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data) 
\ No newline at end of file
+        return super().create(validated_data) 
+
+
+class ReminderValuesSerializer(ValuesSerializer):
+    serializer_class = ReminderSerializer
+
+    def get_pomodoro_activity(self, row, prefix):
+        if row[prefix + 'activity__kind'] == Activity.POMODORO:
+            return row[prefix + 'activity_id']
+        return None
+
+    def get_stopwatch_activity(self, row, prefix):
+        if row[prefix + 'activity__kind'] == Activity.STOPWATCH:
+            return row[prefix + 'activity_id']
+        return None
@@ -362,7 +362,7 @@ class ReminderViewSetTests(APITestCase):
         """测试获取提醒列表"""
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 只能看到自己的提醒
+        self.assertEqual(len(response.data["results"]), 1)  # 只能看到自己的提醒
 
     def test_create_reminder(self):
         """测试创建提醒"""
@@ -417,20 +417,20 @@ class ReminderViewSetTests(APITestCase):
 
         response = self.client.get(f"{self.list_url}upcoming/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], future_reminder.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], future_reminder.id)
 
     def test_filter_by_reminder_type(self):
         """测试按提醒类型筛选"""
         response = self.client.get(f'{self.list_url}?reminder_type=CUSTOM')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_filter_by_reminder_method(self):
         """测试按提醒方式筛选"""
         response = self.client.get(f'{self.list_url}?reminder_method=EMAIL')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_filter_by_time_range(self):
         """测试按时间范围筛选"""
@@ -438,19 +438,19 @@ class ReminderViewSetTests(APITestCase):
         end_time = (timezone.now() + timedelta(days=2)).isoformat()
         response = self.client.get(f'{self.list_url}?start_time={start_time}&end_time={end_time}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_search_by_title(self):
         """测试按标题搜索"""
         response = self.client.get(f'{self.list_url}?search=测试')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_search_by_content(self):
         """测试按内容搜索"""
         response = self.client.get(f'{self.list_url}?search=内容')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_toggle_active(self):
         """测试切换提醒激活状态"""
@@ -598,8 +598,8 @@ class ReminderViewSetTests(APITestCase):
 
         response = self.client.get(f"{self.list_url}?task_id={task.id}")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["related_task"], task.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["related_task"], task.id)
 
     def test_filter_by_activity(self):
         """测试按关联活动筛选"""
@@ -624,8 +624,8 @@ class ReminderViewSetTests(APITestCase):
 
         response = self.client.get(f"{self.list_url}?activity_id={activity.id}")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["related_activity"], activity.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["related_activity"], activity.id)
 
     def test_filter_by_invalid_time_range(self):
         """测试无效的时间范围筛选"""
@@ -633,14 +633,14 @@ class ReminderViewSetTests(APITestCase):
             f"{self.list_url}?start_time=invalid&end_time=invalid"
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 应该返回所有提醒
+        self.assertEqual(len(response.data["results"]), 1)  # 应该返回所有提醒
 
     def test_search_by_title_and_content(self):
         """测试按标题和内容搜索"""
         response = self.client.get(f"{self.list_url}?search=测试")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "测试提醒")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "测试提醒")
 
     def test_toggle_active(self):
         """测试切换提醒激活状态"""
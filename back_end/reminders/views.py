@@ -4,17 +4,38 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
+from data_sync.tombstones import batch_tombstones
+from schedule_system.bulk import BulkUpdateMixin
+from schedule_system.conditional import ConditionalRequestMixin
+from schedule_system.fields import SparseFieldsMixin
+from schedule_system.values import ValuesListMixin
 from .models import Reminder
-from .serializers import ReminderSerializer
+from .serializers import ReminderSerializer, ReminderValuesSerializer
 
 
-class ReminderViewSet(viewsets.ModelViewSet):
+class ReminderViewSet(
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    SparseFieldsMixin,
+    BulkUpdateMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ReminderSerializer
+    values_serializer_class = ReminderValuesSerializer
     permission_classes = [IsAuthenticated]
 
+    @property
+    def keyset_ordering(self):
+        # 即将到来的提醒按提醒时间排序分页，其余列表按创建时间倒序
+        if self.action == 'upcoming':
+            return ('remind_at', 'id')
+        return ('-created_at', 'id')
+
     def get_queryset(self):
-        queryset = Reminder.objects.filter(user=self.request.user)
+        # 兼容字段按活动类型输出，单条序列化时一并取出活动
+        queryset = Reminder.objects.filter(user=self.request.user).select_related('activity')
 
         # 按提醒类型筛选
         reminder_type = self.request.query_params.get('reminder_type', None)
@@ -34,7 +55,7 @@ class ReminderViewSet(viewsets.ModelViewSet):
         # 按关联活动筛选
         activity_id = self.request.query_params.get('activity_id', None)
         if activity_id:
-            queryset = queryset.filter(related_activity_id=activity_id)
+            queryset = queryset.filter(activity_id=activity_id)
 
         # 按时间范围筛选
         start_time = self.request.query_params.get('start_time', None)
@@ -71,11 +92,16 @@ class ReminderViewSet(viewsets.ModelViewSet):
         """
         now = timezone.now()
         queryset = self.get_queryset().filter(
-            reminder_time__gte=now,
-            is_active=True
-        ).order_by('reminder_time')[:10]
-        
-        serializer = self.get_serializer(queryset, many=True)
+            remind_at__gte=now,
+            is_read=False
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset.order_by('remind_at')[:10], many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
@@ -99,11 +125,12 @@ class ReminderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
             
-        # 只删除当前用户的提醒
-        deleted_count = Reminder.objects.filter(
-            user=request.user,
-            id__in=reminder_ids
-        ).delete()[0]
+        # 只删除当前用户的提醒，删除记录合并为一条批量插入
+        with transaction.atomic(), batch_tombstones():
+            deleted_count = Reminder.objects.filter(
+                user=request.user,
+                id__in=reminder_ids
+            ).delete()[0]
         
         if deleted_count == 0:
             return Response(
@@ -131,69 +158,5 @@ class ReminderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        updated_count = 0
-        errors = []
-
-        for update in reminder_updates:
-            if not isinstance(update, dict):
-                errors.append({
-                    'error': '更新数据必须是字典格式',
-                    'data': str(update)
-                })
-                continue
-
-            reminder_id = update.get('id')
-            if not reminder_id:
-                errors.append({
-                    'error': '缺少提醒ID',
-                    'data': str(update)
-                })
-                continue
-
-            reminder = self.get_queryset().filter(id=reminder_id).first()
-            if not reminder:
-                errors.append({
-                    'error': f'找不到ID为{reminder_id}的提醒',
-                    'data': str(update)
-                })
-                continue
-
-            serializer = self.get_serializer(reminder, data=update, partial=True)
-            try:
-                if serializer.is_valid():
-                    serializer.save()
-                    updated_count += 1
-                else:
-                    errors.append({
-                        'id': reminder_id,
-                        'errors': serializer.errors,
-                        'data': str(update),
-                        'validation_data': serializer.validated_data
-                    })
-            except Exception as e:
-                errors.append({
-                    'id': reminder_id,
-                    'error': str(e),
-                    'data': str(update),
-                    'exception_type': type(e).__name__
-                })
-
-        response_data = {
-            'message': f'成功更新 {updated_count} 个提醒',
-            'errors': errors if errors else None,
-            'request_data': request.data
-        }
-
-        # 如果有任何更新成功，就返回 200
-        if updated_count > 0:
-            return Response(response_data)
-        
-        # 如果所有更新都失败，返回 400
-        if errors:
-            response_data['error'] = '所有更新都失败了'
-            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
-        
-        # 如果没有任何更新操作，返回 400
-        return Response({
-            'error': '没有可更新的数据'
-        }, status=status.HTTP_400_BAD_REQUEST)
+        updated, results = self.perform_bulk_update(reminder_updates)
+        return self.bulk_update_response(updated, results)
@@ -0,0 +1,361 @@
+import codecs
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+STREAM_READ_SIZE = 64 * 1024
+
+
+def collect_ids(items, key="id"):
+    """从请求的字典列表中收集可转换为整数的 ID，忽略无效项"""
+    ids = set()
+    for item in items:
+        try:
+            ids.add(int(item[key]))
+        except (TypeError, KeyError, ValueError):
+            continue
+    return ids
+
+
+def parse_ids(value):
+    """解析请求中的 ID 列表，不是非空列表或含有无效 ID 时返回 None"""
+    if not isinstance(value, list) or not value:
+        return None
+    try:
+        return {int(item) for item in value}
+    except (TypeError, ValueError):
+        return None
+
+
+def find_element_end(text, start):
+    """
+    从 start 找到数组元素之后的逗号或右括号的位置。只跟踪字符串和括号嵌套，不校验内容，
+    用于跳过格式错误的元素；文本中还没有完整的元素时返回 None
+    """
+    depth = 0
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            if depth == 0:
+                return index
+            depth -= 1
+        elif char == "," and depth == 0:
+            return index
+    return None
+
+
+def iter_json_array(stream):
+    """
+    增量解析 JSON 数组，逐个产出元素，内存占用与数组长度无关。
+    格式错误的元素产出 ValueError 实例并跳到下一个元素，由调用方记录为该行的错误
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        data = stream.read(STREAM_READ_SIZE)
+        if not data:
+            eof = True
+            buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[position:] + text_decoder.decode(data)
+        position = 0
+
+    def skip(chars):
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in chars:
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            fill()
+
+    try:
+        skip(" \t\r\n\ufeff")
+        if position >= len(buffer) or buffer[position] != "[":
+            raise ParseError("请求体必须是JSON数组")
+        position += 1
+        while True:
+            skip(" \t\r\n," if started else " \t\r\n")
+            if position >= len(buffer):
+                raise ParseError("JSON数组不完整")
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                item, end = None, None
+            # 元素可能被读取边界截断：要求其后还有字符，否则继续读取
+            if end is not None and (end < len(buffer) or eof):
+                started = True
+                position = end
+                yield item
+                continue
+            # 已读到元素的边界仍无法解析的是格式错误的元素，跳过它而不是一直读到末尾
+            boundary = find_element_end(buffer, position) if end is None else None
+            if boundary is not None:
+                started = True
+                position = boundary
+                yield ValueError("JSON格式错误")
+                continue
+            if eof:
+                raise ParseError("JSON数组不完整")
+            fill()
+    except UnicodeDecodeError:
+        raise ParseError("请求体必须是UTF-8编码")
+
+
+def iter_ndjson(stream):
+    """逐行解析 NDJSON，无法解析的行产出 ValueError 实例，由调用方记录为该行的错误"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def iter_request_rows(request):
+    """
+    按 Content-Type 以流的方式读取请求体中的行：JSON 数组或 NDJSON。
+    直接读取原始请求流，不经过 request.data，避免把整个请求体解析进内存
+    """
+    if request.stream is None:
+        return iter(())
+    media_type = request.content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        return iter_ndjson(request.stream)
+    return iter_json_array(request.stream)
+
+
+class BulkUpdateMixin:
+    """
+    视图集的批量更新引擎
+
+    - 用视图自身的序列化器（partial）逐条校验，规则与单条更新一致
+    - 一次查询加载全部目标（限定在 get_queryset() 范围内，即当前用户）
+    - 校验通过的行在一个事务内用 bulk_update 按批写回
+    - 返回以 id 为键的结果表，而不是回显整个请求
+    """
+
+    bulk_update_batch_size = 500
+
+    def perform_bulk_update(self, items, context=None):
+        """
+        返回 (已更新的实例列表, 结果表)。
+        结果表的值为 {"status": "updated"}、{"status": "not_found"}
+        或 {"status": "invalid", "errors": ...}
+        """
+        results = {}
+        valid_items = []
+        for index, item in enumerate(items):
+            try:
+                item_id = int(item["id"])
+            except (TypeError, KeyError, ValueError):
+                # 缺少或无效的 ID 按请求中的位置记录
+                results[f"#{index}"] = {"status": "invalid", "errors": "缺少有效的ID"}
+                continue
+            valid_items.append((item_id, item))
+
+        instances = self.get_queryset().in_bulk([item_id for item_id, _ in valid_items])
+
+        serializer_context = self.get_serializer_context()
+        serializer_context.update(context or {})
+        serializer_class = self.get_serializer_class()
+
+        updated = {}
+        instance_fields = {}
+        changed_fields = set()
+        for item_id, item in valid_items:
+            instance = instances.get(item_id)
+            if instance is None:
+                results[str(item_id)] = {"status": "not_found"}
+                continue
+
+            serializer = serializer_class(
+                instance, data=item, partial=True, context=serializer_context
+            )
+            if not serializer.is_valid():
+                results[str(item_id)] = {"status": "invalid", "errors": serializer.errors}
+                continue
+
+            fields = serializer.apply_validated_data(instance, serializer.validated_data)
+            try:
+                instance.clean()
+            except ValidationError as e:
+                results[str(item_id)] = {"status": "invalid", "errors": e.messages}
+                continue
+
+            changed_fields.update(fields)
+            updated[instance.pk] = instance
+            instance_fields[instance.pk] = fields
+            results[str(item_id)] = {"status": "updated"}
+
+        changes = [(instance, instance_fields[pk]) for pk, instance in updated.items()]
+        for pk, errors in self.validate_bulk_update(changes).items():
+            del updated[pk]
+            results[str(pk)] = {"status": "invalid", "errors": errors}
+
+        if updated and changed_fields:
+            model = self.get_queryset().model
+            for field in model._meta.concrete_fields:
+                if getattr(field, "auto_now", False):
+                    for instance in updated.values():
+                        field.pre_save(instance, False)
+                    changed_fields.add(field.name)
+            with transaction.atomic():
+                model.objects.bulk_update(
+                    list(updated.values()),
+                    sorted(changed_fields),
+                    batch_size=self.bulk_update_batch_size,
+                )
+
+        return list(updated.values()), results
+
+    def validate_bulk_update(self, changes):
+        """
+        逐条校验通过的 (实例, 修改的字段) 写回前整体再校验一次（如同一批中相互冲突的行），
+        返回 {id: 错误}，其中的行不写回；默认不做检查
+        """
+        return {}
+
+    def bulk_update_response(self, updated, results):
+        response_data = {
+            "message": f"成功更新 {len(updated)} 条数据",
+            "updated": len(updated),
+            "results": results,
+        }
+        if not updated and results:
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(response_data)
+
+
+def stop_at_parse_error(rows):
+    """请求体在中途无法继续解析时，把 ParseError 作为最后一行产出，而不是中断已经开始的导入"""
+    try:
+        yield from rows
+    except ParseError as e:
+        yield e
+
+
+class BulkCreateMixin:
+    """
+    视图集的批量创建引擎
+
+    - 按块读取行，用视图自身的序列化器逐条校验，规则与单条创建一致
+    - 每块校验通过的行用 bulk_create 一次写入，块与块之间不保留数据，内存占用平稳
+    - 校验失败的行记录行号和错误，不影响其他行
+    """
+
+    bulk_create_batch_size = 500
+
+    def bulk_created(self, instances):
+        """每块写入后在同一事务内调用，bulk_create 不发信号，需要后续处理时覆盖"""
+
+    def clean_bulk_instance(self, instance):
+        """写入前的模型校验，默认调用 clean()"""
+        instance.clean()
+
+    def get_bulk_create_defaults(self):
+        """所有新建实例共用的字段，默认归属当前用户"""
+        return {"user": self.request.user}
+
+    def perform_bulk_create(self, rows, context=None):
+        """返回 (创建条数, 错误列表)，错误项为 {"row": 行号, "errors": ...}"""
+        serializer_context = self.get_serializer_context()
+        serializer_context.update(context or {})
+        serializer_class = self.get_serializer_class()
+        model = self.get_queryset().model
+        defaults = self.get_bulk_create_defaults()
+
+        created = 0
+        errors = []
+        rows = enumerate(stop_at_parse_error(rows))
+        while True:
+            chunk = list(islice(rows, self.bulk_create_batch_size))
+            if not chunk:
+                break
+
+            instances = []
+            for index, row in chunk:
+                if isinstance(row, ParseError):
+                    # 之前的块已经写入，返回已导入的条数和出错的位置，客户端可以从这一行续传
+                    errors.append({"row": index, "errors": row.detail})
+                    continue
+                if isinstance(row, ValueError):
+                    errors.append({"row": index, "errors": "JSON格式错误"})
+                    continue
+                if not isinstance(row, dict):
+                    errors.append({"row": index, "errors": "每行必须是JSON对象"})
+                    continue
+                serializer = serializer_class(data=row, context=serializer_context)
+                if not serializer.is_valid():
+                    errors.append({"row": index, "errors": serializer.errors})
+                    continue
+
+                instance = model(**defaults)
+                serializer.apply_validated_data(instance, serializer.validated_data)
+                try:
+                    self.clean_bulk_instance(instance)
+                except ValidationError as e:
+                    errors.append({"row": index, "errors": e.messages})
+                    continue
+                instances.append(instance)
+
+            if instances:
+                with transaction.atomic():
+                    model.objects.bulk_create(instances)
+                    self.bulk_created(instances)
+                created += len(instances)
+
+        return created, errors
+
+    def bulk_create_response(self, created, errors):
+        response_data = {
+            "message": f"成功导入 {created} 条数据",
+            "created": created,
+            "failed": len(errors),
+            "errors": errors,
+        }
+        if not created and errors:
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+class BulkUpdateSerializerMixin:
+    """
+    配合 BulkUpdateMixin / BulkCreateMixin 使用：把校验后的数据赋值到实例上但不保存，
+    返回被修改的字段名
+    """
+
+    def apply_validated_data(self, instance, validated_data):
+        fields = []
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+            fields.append(instance._meta.get_field(attr).name)
+        return fields
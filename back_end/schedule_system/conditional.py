@@ -0,0 +1,158 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, Count, ExpressionWrapper, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "数据已被修改，请刷新后重试"
+    default_code = "precondition_failed"
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(":".join(map(str, parts)).encode()).hexdigest())
+
+
+def etag_matches(etag, header):
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+class ConditionalRequestMixin:
+    """
+    为列表和详情接口提供条件请求（ETag / Last-Modified）
+
+    - 列表的校验值为当前筛选范围内的 (行数, 最大 updated_at)，加上列表中嵌套展示的
+      关联模型（etag_related_models）在当前用户下的同样两个值，以及查询参数；
+      客户端带 If-None-Match 且未变化时直接返回 304，不再查询和序列化数据
+    - 详情的校验值为该行及其嵌套展示的关联行（etag_related_paths）的 updated_at，
+      支持 If-None-Match 和 If-Modified-Since
+    - 输出随当前时间变化的行（etag_volatile，如进行中的计时）不返回 304
+    - 修改和删除时校验 If-Match，数据已被他人修改则返回 412
+    """
+
+    etag_related_models = ()
+    etag_related_paths = ()
+    etag_volatile = None
+
+    def get_collection_validator(self):
+        """返回 (ETag, 最后修改时间)，每个涉及的模型一次聚合查询"""
+        return self._collection_validator()[:2]
+
+    def _collection_validator(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        parts = [
+            queryset.model._meta.label,
+            self.request.user.pk,
+            self.request.META.get("QUERY_STRING", ""),
+        ]
+        last_modified = None
+        volatile = False
+        for scope in [queryset] + [
+            model.objects.filter(user=self.request.user)
+            for model in self.etag_related_models
+        ]:
+            aggregates = {"count": Count("pk"), "last_modified": Max("updated_at")}
+            if scope is queryset and self.etag_volatile is not None:
+                aggregates["volatile"] = Count("pk", filter=self.etag_volatile)
+            result = scope.aggregate(**aggregates)
+            volatile = volatile or bool(result.get("volatile"))
+            parts += [result["count"], result["last_modified"]]
+            if result["last_modified"] and (
+                last_modified is None or result["last_modified"] > last_modified
+            ):
+                last_modified = result["last_modified"]
+        return make_etag(*parts), last_modified, volatile
+
+    def get_object_validator(self):
+        """
+        一次查询目标行及嵌套展示的关联行的 updated_at，返回 (ETag, 最后修改时间)；
+        行不存在时返回 (None, None)
+        """
+        return self._object_validator()[:2]
+
+    def _object_validator(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        columns = ["updated_at"] + [f"{path}__updated_at" for path in self.etag_related_paths]
+        queryset = self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        if self.etag_volatile is not None:
+            queryset = queryset.annotate(
+                etag_volatile=ExpressionWrapper(self.etag_volatile, output_field=BooleanField())
+            )
+            columns.append("etag_volatile")
+        try:
+            row = queryset.values_list(*columns).first()
+        except (ValueError, ValidationError):
+            return None, None, False
+        if row is None:
+            return None, None, False
+        volatile = bool(row[-1]) if self.etag_volatile is not None else False
+        stamps = row[:len(self.etag_related_paths) + 1]
+        etag = make_etag(
+            self.get_queryset().model._meta.label,
+            self.kwargs[lookup_url_kwarg],
+            *[stamp.isoformat() if stamp else None for stamp in stamps],
+        )
+        return etag, max(stamp for stamp in stamps if stamp), volatile
+
+    def not_modified(self, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        self.set_validator_headers(response, etag, last_modified)
+        return response
+
+    def set_validator_headers(self, response, etag, last_modified):
+        if etag:
+            response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified, volatile = self._collection_validator()
+        if not volatile and etag_matches(etag, request.headers.get("If-None-Match")):
+            return self.not_modified(etag, last_modified)
+        response = super().list(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified, volatile = self._object_validator()
+        if etag and not volatile:
+            if_none_match = request.headers.get("If-None-Match")
+            if if_none_match:
+                if etag_matches(etag, if_none_match):
+                    return self.not_modified(etag, last_modified)
+            else:
+                # HTTP 日期只精确到秒
+                since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+                if since is not None and int(last_modified.timestamp()) <= since:
+                    return self.not_modified(etag, last_modified)
+        response = super().retrieve(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag, last_modified)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if_match = request.headers.get("If-Match")
+        if if_match and self.action in ("update", "partial_update", "destroy"):
+            etag, _ = self.get_object_validator()
+            # 行不存在时交给后续的 get_object() 返回 404
+            if etag and not etag_matches(etag, if_match):
+                raise PreconditionFailed()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (
+            getattr(self, "action", None) in ("update", "partial_update")
+            and status.is_success(response.status_code)
+        ):
+            # 返回修改后的 ETag，客户端可直接用于下一次 If-Match
+            self.set_validator_headers(response, *self.get_object_validator())
+        return response
@@ -0,0 +1,75 @@
+from bisect import bisect_right
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.utils import timezone
+
+
+def get_zone(name):
+    """时区名称对应的时区，名称为空或无效时使用 UTC"""
+    if not name:
+        return dt_timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return dt_timezone.utc
+
+
+def is_valid_zone(name):
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def user_zone(user):
+    return get_zone(getattr(user, "time_zone", None))
+
+
+def local_date(value, zone):
+    """时间点在 zone 中的本地日期"""
+    return value.astimezone(zone).date()
+
+
+def local_today(zone, now=None):
+    return local_date(now or timezone.now(), zone)
+
+
+def day_start(day, zone):
+    """本地日期 day 零点对应的 UTC 时间"""
+    return datetime.combine(day, time.min, tzinfo=zone).astimezone(dt_timezone.utc)
+
+
+def day_range(day, zone):
+    """本地日期 day 对应的 UTC 时间范围 [开始, 结束)，用作查询的范围条件"""
+    return day_start(day, zone), day_start(day + timedelta(days=1), zone)
+
+
+class DayBoundaries:
+    """
+    预先算好 first 到 last 每个本地日期零点的 UTC 时间。
+    查询只用首尾边界做范围条件，可以走索引，不对每行做时区转换；
+    查出的时间点再二分查找所属的日期
+    """
+
+    def __init__(self, first, last, zone):
+        self.zone = zone
+        self.days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        self.bounds = [day_start(day, zone) for day in self.days]
+        self.bounds.append(day_start(last + timedelta(days=1), zone))
+
+    @property
+    def start(self):
+        return self.bounds[0]
+
+    @property
+    def end(self):
+        return self.bounds[-1]
+
+    def day_of(self, value):
+        """时间点所属的本地日期，不在范围内时返回 None"""
+        index = bisect_right(self.bounds, value) - 1
+        if 0 <= index < len(self.days):
+            return self.days[index]
+        return None
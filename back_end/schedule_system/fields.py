@@ -0,0 +1,134 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def parse_names(value):
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
+
+
+def get_requested_shape(context):
+    """
+    返回请求的 (fields, expand)，未传对应参数时为 None
+
+    values() 序列化器以此作为预编译结果的缓存键
+    """
+    request = (context or {}).get("request")
+    params = getattr(request, "query_params", None)
+    if not params:
+        return None, None
+    fields = params.get(FIELDS_PARAM)
+    expand = params.get(EXPAND_PARAM)
+    return (
+        parse_names(fields) if fields is not None else None,
+        parse_names(expand) if expand is not None else None,
+    )
+
+
+class DynamicFieldsMixin:
+    """
+    按查询参数裁剪输出字段的序列化器混入
+
+    - ?fields=id,title 只输出列出的字段，只作用于最外层序列化器，只写字段不受影响
+    - ?expand=task,category 只展开列出的嵌套对象，expandable_fields 中其余的嵌套对象
+      只输出主键；不传 expand 时保持原来的全部展开，兼容现有客户端
+    - field_columns 声明计算字段依赖的模型列，get_query_columns() 据此算出
+      only()/select_related 所需的列，视图只查询实际输出的数据
+    """
+
+    expandable_fields = ()
+    field_columns = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested, expand = get_requested_shape(self.context)
+
+        if expand is not None:
+            for name in self.expandable_fields:
+                if name in fields and name not in expand:
+                    source = fields[name].source
+                    kwargs = {"source": source} if source and source != name else {}
+                    fields[name] = serializers.PrimaryKeyRelatedField(
+                        read_only=True, **kwargs
+                    )
+
+        # 嵌套使用时 field_name 为字段名，最外层（包括 many=True 的子序列化器）为空
+        if requested is not None and not self.field_name:
+            for name in list(fields):
+                if name not in requested and not fields[name].write_only:
+                    del fields[name]
+        return fields
+
+    def get_query_columns(self):
+        """
+        返回 (only() 的列, select_related 的关联)；
+        存在无法确定依赖列的字段时返回 None，调用方应放弃裁剪
+        """
+        model = self.Meta.model
+        columns = [model._meta.pk.name]
+        related = []
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in self.field_columns:
+                columns += self.field_columns[name]
+                # 依赖关联表的列（如 activity__kind）需要连接对应的外键
+                related += [
+                    column.rsplit("__", 1)[0]
+                    for column in self.field_columns[name]
+                    if "__" in column
+                ]
+            elif isinstance(field, serializers.BaseSerializer):
+                if not isinstance(field, DynamicFieldsMixin):
+                    return None
+                nested = field.get_query_columns()
+                if nested is None:
+                    return None
+                nested_columns, nested_related = nested
+                columns += [f"{field.source}__{column}" for column in nested_columns]
+                related += [field.source] + [
+                    f"{field.source}__{path}" for path in nested_related
+                ]
+            else:
+                try:
+                    model_field = model._meta.get_field(field.source)
+                except FieldDoesNotExist:
+                    return None
+                if not model_field.concrete:
+                    return None
+                columns.append(field.source)
+        return list(dict.fromkeys(columns)), list(dict.fromkeys(related))
+
+
+def narrow_queryset(queryset, serializer):
+    """按序列化器实际输出的字段裁剪查询，只取需要的列和关联"""
+    query_columns = serializer.get_query_columns()
+    if query_columns is None:
+        return queryset
+    columns, related = query_columns
+    queryset = queryset.select_related(None)
+    if related:
+        # 不带参数的 select_related() 会连接全部外键，只在有嵌套时调用
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+class SparseFieldsMixin:
+    """
+    视图混入：请求带 fields/expand 参数时，列表和详情按输出字段裁剪查询
+
+    不带参数时不改变原有查询；values() 列表接口的列由 ValuesSerializer 自行裁剪
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, "action", None) not in ("list", "retrieve"):
+            return queryset
+        if get_requested_shape(self.get_serializer_context()) == (None, None):
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, DynamicFieldsMixin):
+            return queryset
+        return narrow_queryset(queryset, serializer)
@@ -0,0 +1,120 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    基于排序键的游标分页（keyset pagination）
+
+    游标记录上一页最后一行的排序键，下一页用 WHERE 条件直接定位，
+    配合 (user, 排序字段..., id) 复合索引，任意深度翻页的开销都只与页大小有关。
+    视图可以通过 keyset_ordering 属性指定排序字段，最后一个字段必须唯一（通常为 id）。
+    客户端传 paginate=false 时不分页，兼容原有返回完整列表的调用方式。
+    """
+
+    page_size = 50
+    max_page_size = 500
+    ordering = ("-created_at", "id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    paginate_query_param = "paginate"
+    invalid_cursor_message = "无效的分页游标"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.paginate_query_param, "").lower() == "false":
+            return None
+
+        self.request = request
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.build_keyset_filter(queryset.model, cursor))
+
+        # 多取一行用于判断是否还有下一页
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def build_keyset_filter(self, model, cursor):
+        """
+        构造 (f1, f2, ...) 越过游标位置的条件：
+        f1 越过，或 f1 相等且 f2 越过，依此类推
+        """
+        values = self.decode_cursor(cursor)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal_prefix = Q()
+        for field_name, raw_value in zip(self.ordering, values):
+            name = field_name.lstrip("-")
+            try:
+                value = model._meta.get_field(name).to_python(raw_value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = "lt" if field_name.startswith("-") else "gt"
+            condition |= equal_prefix & Q(**{f"{name}__{lookup}": value})
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, instance):
+        values = []
+        for field_name in self.ordering:
+            name = field_name.lstrip("-")
+            # 列表可能返回 values() 行
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
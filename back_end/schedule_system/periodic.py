@@ -0,0 +1,59 @@
+import logging
+import os
+import sys
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicThread(threading.Thread):
+    """进程内按固定间隔执行 func 的后台线程，每次执行前后清理数据库连接"""
+
+    def __init__(self, name, interval, func):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self.func = func
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            close_old_connections()
+            try:
+                self.func()
+            except Exception:
+                logger.exception("后台任务 %s 执行失败", self.name)
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_threads = {}
+
+
+def should_start_background_threads():
+    """
+    执行 runserver 以外的管理命令时不启动后台线程；
+    runserver 只在自动重载的子进程中启动，ASGI/WSGI 服务进程中总是启动
+    """
+    if sys.argv[0].endswith("manage.py"):
+        command = sys.argv[1] if len(sys.argv) > 1 else ""
+        if command != "runserver":
+            return False
+        if "--noreload" not in sys.argv and os.environ.get("RUN_MAIN") != "true":
+            return False
+    return True
+
+
+def start_periodic(name, interval, func):
+    """启动名为 name 的后台线程（每个进程只启动一次），不满足启动条件时返回 None"""
+    if name in _threads:
+        return _threads[name]
+    if not should_start_background_threads():
+        return None
+    _threads[name] = PeriodicThread(name, interval, func)
+    _threads[name].start()
+    return _threads[name]
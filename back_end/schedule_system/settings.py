@@ -52,6 +52,8 @@ INSTALLED_APPS = [
     "data_stats.apps.DataStatsConfig",  # 统计分析模块
     "data_backups.apps.BackupsConfig",  # 数据备份模块
     "app_settings.apps.SettingsConfig",  # 系统设置模块
+    "data_sync.apps.DataSyncConfig",  # 增量同步模块
+    "push.apps.PushConfig",  # 实时推送模块
 ]
 
 from rest_framework_simplejwt.settings import api_settings
@@ -67,8 +69,41 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # 所有列表接口默认使用游标分页，客户端可传 paginate=false 关闭
+    "DEFAULT_PAGINATION_CLASS": "schedule_system.pagination.KeysetPagination",
 }
 
+# 进程内逾期清扫的间隔（秒），为 None 时不启动，改用 sweep_overdue_tasks 管理命令定时执行
+TASK_OVERDUE_SWEEP_INTERVAL = None
+
+# 遗留计时清理：进程内执行的间隔（秒，为 None 时不启动，改用 reap_stale_timers 管理命令定时执行），
+# 正计时的最长时长（秒），以及番茄钟或休息超过设置时长多久（秒）后视为遗留
+ACTIVITY_REAPER_INTERVAL = None
+STALE_STOPWATCH_MAX_SECONDS = 12 * 3600
+STALE_POMODORO_GRACE_SECONDS = 3600
+
+# 统计汇总：进程内处理待重算日期的间隔（秒），为 None 时不启动，改用 rollup_stats 管理命令定时执行
+STATS_ROLLUP_INTERVAL = None
+
+# 增量同步删除记录的保留天数，同步令牌早于保留期时返回全量数据
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# 用户设置缓存：进程内 LRU 的容量和有效期（秒），以及共享缓存的别名和有效期（秒）
+APP_SETTINGS_LOCAL_CACHE_SIZE = 1024
+APP_SETTINGS_LOCAL_CACHE_TTL = 30
+APP_SETTINGS_CACHE_ALIAS = "default"
+APP_SETTINGS_CACHE_TIMEOUT = 3600
+
+# 实时推送：发布订阅后端（多节点时换成共享消息代理的实现）、每个用户保留用于断线补发的事件数、
+# 每个连接的队列上限、心跳间隔（秒），以及进程内推送到期提醒的间隔（秒，为 None 时不推送）。
+# 没有连接超过 PUSH_HISTORY_TTL 秒的用户丢弃其补发历史，之后重连需要重新拉取
+PUSH_BROKER = "push.broker.InMemoryBroker"
+PUSH_HISTORY_SIZE = 100
+PUSH_HISTORY_TTL = 600
+PUSH_QUEUE_SIZE = 1000
+PUSH_HEARTBEAT_SECONDS = 15
+PUSH_REMINDER_INTERVAL = None
+
 # 配置 JWT 参数（可选但推荐）
 from datetime import timedelta
 
@@ -198,8 +233,11 @@ CORS_ALLOW_HEADERS = [
     'Access-Control-Allow-Headers',
     'Access-Control-Allow-Methods',
     'Access-Control-Allow-Credentials',
+    'if-match',
+    'if-none-match',
+    'if-modified-since',
 ]
-CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken']
+CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken', 'ETag', 'Last-Modified']
 CORS_PREFLIGHT_MAX_AGE = 86400  # 24小时
 
 # 允许所有域名访问（仅用于开发环境）
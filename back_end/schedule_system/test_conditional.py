@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity
+from app_settings.models import TaskCategory
+from reminders.models import Reminder
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = TaskCategory.objects.create(name="学习", user=self.user)
+        self.task = self.create_task("任务1")
+
+    def create_task(self, title):
+        return Task.objects.create(
+            title=title,
+            user=self.user,
+            category=self.category,
+            due_date=timezone.now() + timedelta(days=1),
+        )
+
+    def get_etag(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response["ETag"]
+
+    def test_list_not_modified(self):
+        """测试列表未变化时返回304，且只执行聚合查询"""
+        for i in range(10):
+            self.create_task(f"任务{i + 2}")
+        etag = self.get_etag("/api/tasks/")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        # 任务和嵌套展示的分类各一次聚合
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_list_changes_invalidate_etag(self):
+        """测试新增、修改、删除以及嵌套的分类变化都会使列表ETag失效"""
+        etag = self.get_etag("/api/tasks/")
+
+        other = self.create_task("任务2")
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        other.delete()
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        self.category.name = "工作"
+        self.category.save()
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_depends_on_query(self):
+        """测试不同查询参数的列表ETag不同"""
+        self.assertNotEqual(
+            self.get_etag("/api/tasks/"),
+            self.get_etag("/api/tasks/", {"status": "COMPLETED"}),
+        )
+
+    def test_reminder_list_not_modified(self):
+        """测试提醒列表的条件请求"""
+        Reminder.objects.create(
+            user=self.user, title="提醒", task=self.task, remind_at=self.task.due_date
+        )
+        etag = self.get_etag("/api/reminders/")
+        response = self.client.get("/api/reminders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_not_modified(self):
+        """测试详情的 If-None-Match 和 If-Modified-Since"""
+        url = f"/api/tasks/{self.task.id}/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertEqual(response["Last-Modified"], http_date(self.task.updated_at.timestamp()))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context.captured_queries), 1)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(self.task.updated_at.timestamp() + 1)
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(self.task.updated_at.timestamp() - 60)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_related_changes_invalidate_etag(self):
+        """测试详情中嵌套展示的任务和分类变化后不再返回304"""
+        activity = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        url = f"/api/pomodoro-activities/{activity.id}/"
+        etag = self.get_etag(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.category.name = "工作"
+        self.category.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["task"]["category"]["name"], "工作")
+
+        etag = response["ETag"]
+        self.task.title = "新标题"
+        self.task.save()
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_running_timer_not_cached(self):
+        """测试进行中的计时输出随时间变化，详情和列表都不返回304"""
+        activity = PomodoroActivity.objects.create(title="番茄钟", user=self.user, task=self.task)
+        activity.start_pomodoro()
+        for url in (f"/api/pomodoro-activities/{activity.id}/", "/api/pomodoro-activities/"):
+            etag = self.get_etag(url)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_match_on_update(self):
+        """测试修改时 If-Match 不匹配返回412，匹配时正常修改并返回新的ETag"""
+        url = f"/api/tasks/{self.task.id}/"
+        etag = self.get_etag(url)
+
+        response = self.client.patch(
+            url, {"title": "新标题"}, format="json", HTTP_IF_MATCH='"stale"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "任务1")
+
+        response = self.client.patch(url, {"title": "新标题"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        # 用旧ETag再次修改视为过期写入
+        response = self.client.patch(url, {"title": "再次修改"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_if_match_on_delete(self):
+        """测试删除时校验 If-Match"""
+        url = f"/api/tasks/{self.task.id}/"
+        response = self.client.delete(url, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.delete(url, HTTP_IF_MATCH=self.get_etag(url))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
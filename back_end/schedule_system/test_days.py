@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from tasks.models import Task
+from .days import DayBoundaries, day_range, get_zone, local_today
+
+User = get_user_model()
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class DayBoundaryTests(SimpleTestCase):
+    def test_day_range_in_utc(self):
+        self.assertEqual(
+            day_range(date(2024, 3, 1), ZoneInfo("Asia/Shanghai")),
+            (utc(2024, 2, 29, 16), utc(2024, 3, 1, 16)),
+        )
+        # 半小时时差
+        self.assertEqual(
+            day_range(date(2024, 3, 1), ZoneInfo("Asia/Kolkata"))[0], utc(2024, 2, 29, 18, 30)
+        )
+
+    def test_daylight_saving_days(self):
+        zone = ZoneInfo("America/New_York")
+        start, end = day_range(date(2024, 3, 10), zone)
+        self.assertEqual(end - start, timedelta(hours=23))
+        start, end = day_range(date(2024, 11, 3), zone)
+        self.assertEqual(end - start, timedelta(hours=25))
+
+    def test_day_of(self):
+        boundaries = DayBoundaries(date(2024, 3, 1), date(2024, 3, 3), ZoneInfo("Asia/Shanghai"))
+        self.assertEqual(boundaries.start, utc(2024, 2, 29, 16))
+        self.assertEqual(boundaries.end, utc(2024, 3, 3, 16))
+        self.assertEqual(boundaries.day_of(utc(2024, 2, 29, 16)), date(2024, 3, 1))
+        self.assertEqual(boundaries.day_of(utc(2024, 3, 1, 15, 59)), date(2024, 3, 1))
+        self.assertEqual(boundaries.day_of(utc(2024, 3, 1, 16)), date(2024, 3, 2))
+        self.assertIsNone(boundaries.day_of(utc(2024, 2, 29, 15)))
+        self.assertIsNone(boundaries.day_of(utc(2024, 3, 3, 16)))
+
+    def test_invalid_zone_falls_back_to_utc(self):
+        self.assertEqual(get_zone(""), dt_timezone.utc)
+        self.assertEqual(get_zone("Mars/Olympus"), dt_timezone.utc)
+        self.assertEqual(get_zone("../etc"), dt_timezone.utc)
+
+
+class UserTimeZoneTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_update_time_zone(self):
+        response = self.client.patch("/api/users/profile/", {"time_zone": "Mars/Olympus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch("/api/users/profile/", {"time_zone": "Asia/Shanghai"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.time_zone, "Asia/Shanghai")
+
+    def test_today_uses_user_time_zone(self):
+        self.user.time_zone = "Pacific/Kiritimati"
+        self.user.save()
+        zone = get_zone(self.user.time_zone)
+        start, end = day_range(local_today(zone), zone)
+        # 截止于本地今天最后一刻的任务算今日任务，UTC 日期可能已是另一天
+        Task.objects.create(title="今日", user=self.user, due_date=end - timedelta(seconds=1))
+        Task.objects.create(title="明日", user=self.user, due_date=end + timedelta(hours=1))
+        Task.objects.filter(user=self.user).update(created_at=timezone.now() - timedelta(days=3))
+
+        response = self.client.get("/api/task-stats/summary/")
+        self.assertEqual(response.data["total_tasks"], 2)
+        self.assertEqual(response.data["today_total"], 1)
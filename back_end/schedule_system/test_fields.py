@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity
+from app_settings.models import TaskCategory
+from data_backups.models import DataBackup
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class SparseFieldsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = TaskCategory.objects.create(name="学习", user=self.user)
+        self.tasks = [
+            Task.objects.create(
+                title=f"任务{i}",
+                description="很长的描述" * 100,
+                user=self.user,
+                category=self.category,
+                due_date=timezone.now() + timedelta(days=1),
+            )
+            for i in range(3)
+        ]
+        self.activity = PomodoroActivity.objects.create(
+            title="番茄钟", user=self.user, task=self.tasks[0]
+        )
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 最后一条查询是取数据的查询
+        return response.data, context.captured_queries[-1]["sql"]
+
+    def test_task_list_fields(self):
+        """测试列表只输出并只查询请求的字段"""
+        data, sql = self.get("/api/tasks/", {"fields": "id,title", "paginate": "false"})
+        self.assertEqual([set(row) for row in data], [{"id", "title"}] * 3)
+        self.assertNotIn("description", sql)
+        self.assertNotIn("app_settings_taskcategory", sql)
+
+    def test_fields_with_pagination(self):
+        """测试未请求排序字段时游标分页仍然可用"""
+        data, _ = self.get("/api/tasks/", {"fields": "title", "page_size": 2})
+        self.assertEqual(set(data["results"][0]), {"title"})
+        response = self.client.get(data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_expand(self):
+        """测试未展开的嵌套对象只输出主键，且不连接关联表"""
+        url = "/api/pomodoro-activities/"
+        data, sql = self.get(url, {"expand": "", "paginate": "false"})
+        self.assertEqual(data[0]["task"], self.tasks[0].id)
+        self.assertNotIn("JOIN", sql)
+
+        data, _ = self.get(url, {"expand": "task", "paginate": "false"})
+        self.assertEqual(data[0]["task"]["title"], "任务0")
+        self.assertEqual(data[0]["task"]["category"], self.category.id)
+
+        data, _ = self.get(url, {"expand": "task,category", "paginate": "false"})
+        self.assertEqual(data[0]["task"]["category"]["name"], "学习")
+
+    def test_retrieve_fields(self):
+        """测试详情接口同样按字段裁剪查询"""
+        url = f"/api/pomodoro-activities/{self.activity.id}/"
+        data, sql = self.get(url, {"fields": "id,task,remaining_time", "expand": "task"})
+        self.assertEqual(set(data), {"id", "task", "remaining_time"})
+        self.assertEqual(data["task"]["title"], "任务0")
+        self.assertEqual(data["task"]["category"], self.category.id)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {"fields": "id,title"})
+        selects = [
+            query["sql"] for query in context.captured_queries
+            if "activities_activity" in query["sql"]
+        ]
+        self.assertNotIn("JOIN", selects[-1])
+        self.assertNotIn("description", selects[-1])
+
+    def test_unknown_fields_are_ignored(self):
+        data, _ = self.get("/api/tasks/", {"fields": "title,不存在", "paginate": "false"})
+        self.assertEqual(set(data[0]), {"title"})
+
+    def test_backup_fields(self):
+        """测试备份列表的字段裁剪"""
+        DataBackup.objects.create(
+            user=self.user, backup_type="FULL", file_size=2048, included_modules=["tasks"]
+        )
+        data, sql = self.get("/api/backups/", {"fields": "id,file_size_display"})
+        rows = data["results"] if isinstance(data, dict) else data
+        self.assertEqual(rows[0]["file_size_display"], "2.00 KB")
+        self.assertEqual(set(rows[0]), {"id", "file_size_display"})
+        self.assertNotIn("metadata", sql)
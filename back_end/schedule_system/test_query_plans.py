@@ -0,0 +1,227 @@
+import json
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from activities.models import Activity, PomodoroActivity, StopwatchActivity
+from activities.views import (
+    ActivityTimelineViewSet,
+    PomodoroActivityViewSet,
+    StopwatchActivityViewSet,
+)
+from app_settings.models import AppSettings, TaskCategory
+from app_settings.views import AppSettingsViewSet, TaskCategoryViewSet
+from data_backups.models import BackupSchedule, DataBackup
+from data_backups.views import BackupScheduleViewSet, DataBackupViewSet
+from data_stats.models import ActivityStats, EfficiencyStats
+from data_stats.views import ActivityStatsViewSet, EfficiencyStatsViewSet
+from reminders.models import Reminder
+from reminders.views import ReminderViewSet
+from tasks.models import Task
+from tasks.views import TaskViewSet
+
+from .pagination import KeysetPagination
+
+User = get_user_model()
+
+USER_COUNT = 20
+ROWS_PER_USER = 15
+
+
+def find_full_scans(queryset):
+    """返回执行计划中做全表扫描的表名"""
+    if connection.vendor == "mysql":
+        plan = json.loads(queryset.explain(format="json"))
+        scans = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get("access_type") == "ALL":
+                    scans.append(node.get("table_name"))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(plan)
+        return scans
+    if connection.vendor == "postgresql":
+        return re.findall(r"Seq Scan on (\w+)", queryset.explain())
+    # SQLite：SEARCH 表示按索引定位，不带索引的 SCAN 为全表扫描
+    return [
+        match.group(1)
+        for match in re.finditer(r"\bSCAN (\w+)(?! USING)", queryset.explain())
+    ]
+
+
+class ListQueryPlanTests(TestCase):
+    """
+    对每个视图 get_queryset() 构造的真实查询（加上分页排序）执行 EXPLAIN，
+    在多用户的种子数据上确认不会退化为全表扫描
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        users = [
+            User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="testpass123"
+            )
+            for i in range(USER_COUNT)
+        ]
+        cls.user = users[0]
+
+        categories = TaskCategory.objects.bulk_create(
+            TaskCategory(name="学习", user=user) for user in users
+        )
+        AppSettings.objects.bulk_create(AppSettings(user=user) for user in users)
+        tasks = Task.objects.bulk_create(
+            Task(
+                title=f"任务{i}",
+                user=user,
+                category=category,
+                status=["PENDING", "IN_PROGRESS", "COMPLETED", "OVERDUE"][i % 4],
+                priority=Task.PRIORITY_CHOICES[i % 4][0],
+                due_date=now + timedelta(days=i - ROWS_PER_USER // 2),
+            )
+            for user, category in zip(users, categories)
+            for i in range(ROWS_PER_USER)
+        )
+        cls.task = next(task for task in tasks if task.user_id == cls.user.id)
+        cls.category = categories[0]
+
+        for model in (PomodoroActivity, StopwatchActivity):
+            model.objects.bulk_create(
+                model(
+                    title="活动",
+                    user_id=task.user_id,
+                    task=task,
+                    status=["PENDING", "IN_PROGRESS", "COMPLETED"][task.id % 3],
+                )
+                for task in tasks
+            )
+        Reminder.objects.bulk_create(
+            Reminder(title="提醒", user_id=task.user_id, task=task, remind_at=task.due_date)
+            for task in tasks
+        )
+        DataBackup.objects.bulk_create(
+            DataBackup(
+                user=user,
+                backup_type=["FULL", "INCREMENTAL"][i % 2],
+                status=["PENDING", "COMPLETED"][i % 2],
+            )
+            for user in users
+            for i in range(ROWS_PER_USER)
+        )
+        BackupSchedule.objects.bulk_create(
+            BackupSchedule(
+                user=user,
+                name=f"计划{i}",
+                frequency="DAILY",
+                backup_type="FULL",
+                is_active=bool(i % 2),
+                retention_days=7,
+                included_modules=["tasks"],
+            )
+            for user in users
+            for i in range(ROWS_PER_USER)
+        )
+        ActivityStats.objects.bulk_create(
+            ActivityStats(
+                user=user,
+                date=date.today() - timedelta(days=i),
+                pomodoro_duration=timedelta(),
+                stopwatch_duration=timedelta(),
+                activity_type_distribution={},
+                daily_trend={},
+            )
+            for user in users
+            for i in range(ROWS_PER_USER)
+        )
+        EfficiencyStats.objects.bulk_create(
+            EfficiencyStats(
+                user=user,
+                date=date.today() - timedelta(days=i),
+                efficiency_score=0,
+                time_allocation={},
+                goal_achievement_rate=0,
+                habit_tracking={},
+            )
+            for user in users
+            for i in range(ROWS_PER_USER)
+        )
+
+        # 让查询优化器基于真实的数据分布选择执行计划
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("ANALYZE")
+            elif connection.vendor == "mysql":
+                tables = [model._meta.db_table for model in (
+                    Task, Activity, Reminder, DataBackup,
+                    BackupSchedule, ActivityStats, EfficiencyStats, TaskCategory, AppSettings,
+                )]
+                cursor.execute("ANALYZE TABLE " + ", ".join(tables))
+
+    def build_list_queryset(self, viewset_class, params=None):
+        """按列表接口的实际方式构造查询：get_queryset() + 分页排序和 LIMIT"""
+        request = APIRequestFactory().get("/", params or {})
+        force_authenticate(request, user=self.user)
+        view = viewset_class(action_map={"get": "list"}, kwargs={}, format_kwarg=None)
+        view.request = view.initialize_request(request)
+        ordering = getattr(view, "keyset_ordering", KeysetPagination.ordering)
+        queryset = view.get_queryset().order_by(*ordering)
+        return queryset[: KeysetPagination.page_size + 1]
+
+    def assert_no_full_scan(self, viewset_class, params=None):
+        with self.subTest(view=viewset_class.__name__, params=params):
+            queryset = self.build_list_queryset(viewset_class, params)
+            self.assertEqual(find_full_scans(queryset), [], queryset.explain())
+
+    def test_task_list_plans(self):
+        for params in (
+            None,
+            {"status": "PENDING"},
+            {"priority": "URGENT_IMPORTANT"},
+            {"category": self.category.id},
+            {"search": "任务"},
+        ):
+            self.assert_no_full_scan(TaskViewSet, params)
+
+    def test_activity_list_plans(self):
+        for viewset_class in (PomodoroActivityViewSet, StopwatchActivityViewSet):
+            for params in (
+                None,
+                {"status": "COMPLETED"},
+                {"task_id": self.task.id},
+                {"created_after": "2020-01-01T00:00:00Z"},
+                {"search": "活动"},
+            ):
+                self.assert_no_full_scan(viewset_class, params)
+
+    def test_timeline_plans(self):
+        for params in (None, {"kind": "stopwatch"}):
+            self.assert_no_full_scan(ActivityTimelineViewSet, params)
+
+    def test_reminder_list_plans(self):
+        self.assert_no_full_scan(ReminderViewSet)
+
+    def test_backup_list_plans(self):
+        for params in (None, {"backup_type": "FULL"}, {"status": "COMPLETED"}):
+            self.assert_no_full_scan(DataBackupViewSet, params)
+        for params in (None, {"is_active": "true"}, {"backup_type": "FULL"}):
+            self.assert_no_full_scan(BackupScheduleViewSet, params)
+
+    def test_stats_list_plans(self):
+        for viewset_class in (ActivityStatsViewSet, EfficiencyStatsViewSet):
+            for params in (None, {"start_date": date.today() - timedelta(days=3)}):
+                self.assert_no_full_scan(viewset_class, params)
+
+    def test_settings_list_plans(self):
+        self.assert_no_full_scan(TaskCategoryViewSet)
+        self.assert_no_full_scan(AppSettingsViewSet)
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity, StopwatchActivity
+from activities.serializers import PomodoroActivitySerializer, StopwatchActivitySerializer
+from app_settings.models import AppSettings, TaskCategory
+from app_settings.serializers import TaskCategorySerializer
+from reminders.models import Reminder
+from reminders.serializers import ReminderSerializer
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+
+User = get_user_model()
+
+
+class ValuesSerializerTests(APITestCase):
+    """列表接口的快速序列化器必须与完整序列化器输出完全一致"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        AppSettings.objects.create(user=self.user, pomodoro_duration=30)
+        category = TaskCategory.objects.create(name="学习", user=self.user)
+        now = timezone.now()
+
+        for i in range(3):
+            task = Task.objects.create(
+                title=f"任务{i}",
+                user=self.user,
+                category=category if i else None,
+                due_date=now + timedelta(days=1),
+                estimated_duration=timedelta(minutes=45) if i else None,
+            )
+            pomodoro = PomodoroActivity.objects.create(
+                title="番茄钟",
+                user=self.user,
+                task=task,
+                # 每个用户同时只能有一个进行中的计时
+                status="IN_PROGRESS" if i == 1 else "PAUSED",
+                current_pomodoro_start=now - timedelta(minutes=10) if i else None,
+                is_break=i == 2,
+                current_break_start=now - timedelta(minutes=2) if i == 2 else None,
+            )
+            stopwatch = StopwatchActivity.objects.create(
+                title="正计时",
+                user=self.user,
+                task=task,
+                start_time=now - timedelta(hours=1) if i else None,
+                end_time=now if i == 2 else None,
+            )
+            Reminder.objects.create(title="提醒", user=self.user, task=task, remind_at=now)
+            Reminder.objects.create(
+                title="活动提醒",
+                user=self.user,
+                reminder_type="ACTIVITY",
+                activity=stopwatch if i else pomodoro,
+                remind_at=now,
+            )
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def assert_same_output(self, url, model, serializer_class):
+        response = self.client.get(url, {"paginate": "false"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [row["id"] for row in response.data]
+        instances = sorted(model.objects.filter(id__in=ids), key=lambda obj: ids.index(obj.id))
+        expected = serializer_class(
+            instances, many=True, context={"request": response.wsgi_request}
+        ).data
+        # 剩余/已用时间按各自的当前时间计算，比较时忽略
+        for rows in (response.data, expected):
+            for row in rows:
+                for key in ("remaining_time", "elapsed_time"):
+                    if row.get(key) is not None:
+                        row[key] = "..."
+                if row.get("timer_state"):
+                    row["timer_state"] = dict(row["timer_state"], remaining="...", elapsed="...")
+        self.assertEqual(self.render(response.data), self.render(expected))
+
+    def test_task_list(self):
+        self.assert_same_output("/api/tasks/", Task, TaskSerializer)
+
+    def test_activity_lists(self):
+        self.assert_same_output(
+            "/api/pomodoro-activities/", PomodoroActivity, PomodoroActivitySerializer
+        )
+        self.assert_same_output(
+            "/api/stopwatch-activities/", StopwatchActivity, StopwatchActivitySerializer
+        )
+
+    def test_reminder_list(self):
+        self.assert_same_output("/api/reminders/", Reminder, ReminderSerializer)
+
+    def test_reminder_activity_fields(self):
+        """测试按活动类型输出合并前的 pomodoro_activity/stopwatch_activity"""
+        response = self.client.get("/api/reminders/", {"paginate": "false"})
+        fields = {
+            (row["pomodoro_activity"], row["stopwatch_activity"])
+            for row in response.data
+            if row["activity"]
+        }
+        pomodoros = PomodoroActivity.objects.filter(reminders__isnull=False)
+        stopwatches = StopwatchActivity.objects.filter(reminders__isnull=False)
+        expected = {(activity.id, None) for activity in pomodoros}
+        expected |= {(None, activity.id) for activity in stopwatches}
+        self.assertEqual(fields, expected)
+        for row in response.data:
+            if not row["activity"]:
+                self.assertEqual((row["pomodoro_activity"], row["stopwatch_activity"]), (None, None))
+
+        reminder = Reminder.objects.filter(activity__kind="POMODORO").first()
+        response = self.client.get(
+            f"/api/reminders/{reminder.id}/", {"fields": "id,pomodoro_activity,stopwatch_activity"}
+        )
+        self.assertEqual(
+            response.data,
+            {"id": reminder.id, "pomodoro_activity": reminder.activity_id, "stopwatch_activity": None},
+        )
+
+    def test_category_list(self):
+        self.assert_same_output("/api/categories/", TaskCategory, TaskCategorySerializer)
+
+    def test_remaining_time(self):
+        """测试剩余时间按用户的番茄钟设置计算"""
+        response = self.client.get("/api/pomodoro-activities/", {"paginate": "false"})
+        remaining = {
+            row["task"]["title"]: row["remaining_time"] for row in response.data
+        }
+        self.assertIsNone(remaining["任务0"])
+        self.assertAlmostEqual(remaining["任务1"].total_seconds(), 20 * 60, delta=5)
+        self.assertAlmostEqual(remaining["任务2"].total_seconds(), 3 * 60, delta=5)
+
+    def test_activity_list_query_count(self):
+        """测试活动列表的查询数量固定，嵌套的任务和分类不再逐行查询"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/pomodoro-activities/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 两次 ETag 聚合 + 一次活动聚合 + 一次列表 + 一次设置
+        self.assertEqual(len(context.captured_queries), 5)
+
+    def test_paginated_list(self):
+        """测试快速序列化器的行可用于游标分页"""
+        response = self.client.get("/api/tasks/", {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
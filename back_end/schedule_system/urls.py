@@ -27,4 +27,6 @@ urlpatterns = [
     path("api/", include("reminders.urls")),  # 添加提醒模块的路由
     path("api/", include("data_stats.urls")),  # 添加数据统计模块的路由
     path("api/", include("data_backups.urls")),  # 添加数据备份模块的路由
+    path("api/", include("data_sync.urls")),  # 添加增量同步模块的路由
+    path("api/", include("push.urls")),  # 添加实时推送模块的路由
 ]
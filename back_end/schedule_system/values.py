@@ -0,0 +1,171 @@
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .fields import get_requested_shape
+
+# 数据库返回值可以原样输出的字段类型
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    基于 values() 行的只读序列化器，输出与 serializer_class 完全相同的结构
+
+    字段按 serializer_class 的可读字段预编译为 (输出键, 取值函数) 列表：
+    普通字段直接取列值，日期等字段复用 DRF 字段的 to_representation，
+    SerializerMethodField 由子类的 get_<字段名>(row, prefix) 实现，
+    所需的列取自 serializer_class 的 field_columns；嵌套的序列化器在 nested 中声明对应的 ValuesSerializer。
+    ?fields=/?expand= 裁剪后的字段各自编译一次并缓存，查询只取输出需要的列。
+    省去了模型实例化和逐字段的反射开销，适合列表接口。
+    """
+
+    serializer_class = None
+    nested = {}
+
+    # 每个类按请求的 (fields, expand) 缓存编译结果，超过上限时整体清空
+    max_compiled = 64
+    _compiled = None
+
+    def __init__(self, context=None, compiled=None):
+        self.context = context or {}
+        self.columns, self.getters = compiled or self.compile(self.context)
+        self._children = {}
+        # 与 DRF 的 DateTimeField 一致，按当前时区输出；每次请求只解析一次
+        self.timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    @classmethod
+    def compile(cls, context=None):
+        cache = cls.__dict__.get("_compiled")
+        if cache is None:
+            cache = cls._compiled = {}
+        key = get_requested_shape(context)
+        if key not in cache:
+            if len(cache) >= cls.max_compiled:
+                cache.clear()
+            cache[key] = cls.compile_serializer(cls.serializer_class(context=context))
+        return cache[key]
+
+    @classmethod
+    def compile_serializer(cls, serializer):
+        field_columns = getattr(serializer, "field_columns", {})
+        columns = []
+        getters = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in cls.nested and isinstance(field, serializers.BaseSerializer):
+                nested = cls.nested[name]
+                nested_compiled = nested.compile_serializer(field)
+                columns += [f"{field.source}__{column}" for column in nested_compiled[0]]
+                getters.append(
+                    (name, cls._nested_getter(field.source, nested, nested_compiled))
+                )
+            elif isinstance(field, serializers.SerializerMethodField):
+                columns += field_columns.get(name, ())
+                getters.append((name, getattr(cls, f"get_{name}")))
+            elif cls._is_iso_datetime(field):
+                columns.append(field.source)
+                getters.append((name, cls._datetime_getter(field.source)))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                columns.append(field.source)
+                getters.append((name, cls._column_getter(field.source)))
+            else:
+                columns.append(field.source)
+                getters.append(
+                    (name, cls._column_getter(field.source, field.to_representation))
+                )
+
+        return list(dict.fromkeys(columns)), getters
+
+    @staticmethod
+    def _is_iso_datetime(field):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        return (
+            isinstance(field, serializers.DateTimeField)
+            and output_format is not None
+            and output_format.lower() == ISO_8601
+            and settings.USE_TZ
+        )
+
+    @staticmethod
+    def _datetime_getter(column):
+        # DateTimeField.to_representation 的内联版本，省去每个值的时区查找
+        def get(self, row, prefix):
+            value = row[prefix + column]
+            if not value:
+                return None
+            return self.format_datetime(value)
+
+        return get
+
+    def format_datetime(self, value):
+        value = value.astimezone(self.timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    @staticmethod
+    def _column_getter(column, convert=None):
+        def get(self, row, prefix):
+            value = row[prefix + column]
+            if convert is None or value is None:
+                return value
+            return convert(value)
+
+        return get
+
+    @staticmethod
+    def _nested_getter(source, nested_class, nested_compiled):
+        def get(self, row, prefix):
+            nested_prefix = f"{prefix}{source}__"
+            if row[nested_prefix + "id"] is None:
+                return None
+            if source not in self._children:
+                self._children[source] = nested_class(self.context, nested_compiled)
+            return self._children[source].to_representation(row, nested_prefix)
+
+        return get
+
+    def get_columns(self):
+        return self.columns
+
+    def prepare(self, queryset, extra_columns=()):
+        return queryset.values(*dict.fromkeys([*self.columns, *extra_columns]))
+
+    def to_representation(self, row, prefix=""):
+        return {name: get(self, row, prefix) for name, get in self.getters}
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class ValuesListMixin:
+    """列表接口改用 values_serializer_class 输出，其余接口仍使用 serializer_class"""
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.values_serializer_class(context=self.get_serializer_context())
+        # 只输出部分字段时，分页游标所需的排序列仍要查询
+        ordering = getattr(self, "keyset_ordering", getattr(self.paginator, "ordering", ()))
+        queryset = serializer.prepare(
+            self.filter_queryset(self.get_queryset()),
+            [field.lstrip("-") for field in ordering or ()],
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        # 配置了清扫间隔时在进程内定时标记逾期任务，否则由管理命令定时执行
+        interval = getattr(settings, "TASK_OVERDUE_SWEEP_INTERVAL", None)
+        if interval:
+            from .sweeper import start_overdue_sweeper
+
+            start_overdue_sweeper(interval)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "按活动记录分批重建任务的专注统计字段"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="每批处理的任务数量"
+        )
+        parser.add_argument("--user-id", type=int, help="只重建指定用户的任务")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Task.objects.order_by("id")
+        if options["user_id"]:
+            queryset = queryset.filter(user_id=options["user_id"])
+
+        # 按主键分段遍历，避免大偏移量扫描和一次性加载全部任务
+        last_id = 0
+        total = 0
+        while True:
+            task_ids = list(
+                queryset.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size]
+            )
+            if not task_ids:
+                break
+            with transaction.atomic():
+                total += Task.objects.filter(id__in=task_ids).rebuild_focus_totals()
+            last_id = task_ids[-1]
+            self.stdout.write(f"已重建 {total} 个任务（最大ID {last_id}）")
+
+        self.stdout.write(self.style.SUCCESS(f"专注统计重建完成，共 {total} 个任务"))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from tasks.sweeper import sweep_overdue_tasks
+
+
+class Command(BaseCommand):
+    help = "把已过截止时间的未开始/进行中任务标记为逾期"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="每个 UPDATE 处理的任务数量"
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="循环执行的间隔秒数，不指定时只执行一次（适合由 cron 调度）",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = sweep_overdue_tasks(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"已将 {count} 个任务标记为逾期"))
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
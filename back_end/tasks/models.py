@@ -1,13 +1,140 @@
 from django.db import models
+from django.db.models import F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from django.apps import apps
 from users.models import User
-from app_settings.models import TaskCategory
+from app_settings.cache import get_timer_settings
+from app_settings.models import AppSettings, TaskCategory
 from activities.models import PomodoroActivity, StopwatchActivity
 
 
+def advance_last_focused(task, focused_at):
+    """focused_at（{任务ID: 专注结束时间}）中该任务的时间较新时更新最近专注时间，返回是否更新"""
+    at = (focused_at or {}).get(task.pk)
+    if at and (task.last_focused_at is None or at > task.last_focused_at):
+        task.last_focused_at = at
+        return True
+    return False
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_focus_totals(self):
+        """
+        用子查询一次性标注每个任务累计完成的番茄钟数、已完成正计时的总时长
+        以及最近一次专注时间，供重建专注统计字段使用
+        """
+        pomodoros = PomodoroActivity.objects.filter(
+            task=OuterRef("pk"), pomodoro_count__gt=0
+        ).order_by().values("task")
+        stopwatches = StopwatchActivity.objects.filter(
+            task=OuterRef("pk"), status="COMPLETED"
+        ).order_by().values("task")
+        return self.annotate(
+            completed_pomodoros=Coalesce(
+                Subquery(pomodoros.annotate(total=Sum("pomodoro_count")).values("total")),
+                0,
+            ),
+            stopwatch_total=Subquery(
+                stopwatches.annotate(total=Sum("duration")).values("total"),
+                output_field=models.DurationField(),
+            ),
+            last_pomodoro_at=Subquery(
+                pomodoros.annotate(last=Max("updated_at")).values("last")
+            ),
+            last_stopwatch_at=Subquery(
+                stopwatches.annotate(last=Max("end_time")).values("last")
+            ),
+        )
+
+    def add_focus(self, pomodoros=0, pomodoro_seconds=0, stopwatch_seconds=0, focused_at=None):
+        """
+        原子地累加专注统计字段（F 表达式，不会因并发丢失更新）
+        """
+        updates = {
+            "pomodoro_count": F("pomodoro_count") + pomodoros,
+            "stopwatch_seconds": F("stopwatch_seconds") + stopwatch_seconds,
+            "focused_seconds": F("focused_seconds") + pomodoro_seconds + stopwatch_seconds,
+            "updated_at": timezone.now(),
+        }
+        if focused_at:
+            updates["last_focused_at"] = focused_at
+        return self.update(**updates)
+
+    def sync_stopwatch_totals(self, focused_at=None):
+        """
+        按正计时活动记录重新计算正计时时长，番茄钟部分保持不变。
+        用于删除、批量修改正计时活动之后；focused_at 见 advance_last_focused()
+        """
+        now = timezone.now()
+        changed = []
+        for task in self.select_for_update().with_focus_totals():
+            stopwatch_seconds = int(task.stopwatch_total.total_seconds()) if task.stopwatch_total else 0
+            focused = advance_last_focused(task, focused_at)
+            if stopwatch_seconds == task.stopwatch_seconds and not focused:
+                continue
+            task.focused_seconds += stopwatch_seconds - task.stopwatch_seconds
+            task.stopwatch_seconds = stopwatch_seconds
+            task.updated_at = now  # 让增量同步感知到专注时长的变化
+            changed.append(task)
+        Task.objects.bulk_update(
+            changed, ["stopwatch_seconds", "focused_seconds", "last_focused_at", "updated_at"]
+        )
+        return len(changed)
+
+    def sync_pomodoro_totals(self, focused_at=None):
+        """
+        按番茄钟活动记录重新计算完成的番茄钟数，专注时长按增减的个数和用户当前的
+        番茄钟时长调整，正计时部分保持不变。用于删除、批量修改番茄钟活动之后；
+        focused_at 见 advance_last_focused()
+        """
+        now = timezone.now()
+        changed = []
+        for task in self.select_for_update().with_focus_totals():
+            delta = task.completed_pomodoros - task.pomodoro_count
+            focused = advance_last_focused(task, focused_at)
+            if not delta and not focused:
+                continue
+            pomodoro_seconds = get_timer_settings(task.user_id).pomodoro_duration * 60
+            task.pomodoro_count = task.completed_pomodoros
+            # 历史番茄钟按当时的设置累计，设置变化后差值可能偏大，专注时长不低于正计时部分
+            task.focused_seconds = max(
+                task.focused_seconds + delta * pomodoro_seconds, task.stopwatch_seconds
+            )
+            task.updated_at = now
+            changed.append(task)
+        Task.objects.bulk_update(
+            changed, ["pomodoro_count", "focused_seconds", "last_focused_at", "updated_at"]
+        )
+        return len(changed)
+
+    def rebuild_focus_totals(self):
+        """
+        按活动记录完整重建专注统计字段。历史番茄钟时长无从得知，
+        统一按用户当前的番茄钟时长设置计算
+        """
+        now = timezone.now()
+        tasks = list(self.with_focus_totals())
+        durations = dict(
+            AppSettings.objects.filter(
+                user_id__in={task.user_id for task in tasks}
+            ).values_list("user_id", "pomodoro_duration")
+        )
+        default_duration = AppSettings._meta.get_field("pomodoro_duration").default
+        for task in tasks:
+            pomodoro_duration = durations.get(task.user_id, default_duration)
+            stopwatch_seconds = int(task.stopwatch_total.total_seconds()) if task.stopwatch_total else 0
+            task.pomodoro_count = task.completed_pomodoros
+            task.stopwatch_seconds = stopwatch_seconds
+            task.focused_seconds = task.completed_pomodoros * pomodoro_duration * 60 + stopwatch_seconds
+            focus_times = [t for t in (task.last_pomodoro_at, task.last_stopwatch_at) if t]
+            task.last_focused_at = max(focus_times) if focus_times else None
+            task.updated_at = now
+        Task.objects.bulk_update(tasks, [*Task.FOCUS_FIELDS, "updated_at"])
+        return len(tasks)
+
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ("URGENT_IMPORTANT", "紧急重要"),
@@ -60,49 +187,87 @@ class Task(models.Model):
         validators=[MinValueValidator(0)],
         verbose_name="进度",
     )
+    # 专注统计（由活动状态变化维护，避免每次展示都汇总活动表）
+    pomodoro_count = models.IntegerField(
+        default=0, validators=[MinValueValidator(0)], verbose_name="已完成番茄钟数"
+    )
+    stopwatch_seconds = models.IntegerField(
+        default=0, validators=[MinValueValidator(0)], verbose_name="正计时总时长（秒）"
+    )
+    focused_seconds = models.IntegerField(
+        default=0, validators=[MinValueValidator(0)], verbose_name="专注总时长（秒）"
+    )
+    last_focused_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="最近专注时间"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
 
+    FOCUS_FIELDS = (
+        "pomodoro_count",
+        "stopwatch_seconds",
+        "focused_seconds",
+        "last_focused_at",
+    )
+
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         verbose_name = "任务"
         verbose_name_plural = "任务"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "id"]),  # 列表游标分页
+            models.Index(fields=["user", "updated_at"]),  # 增量同步
+            # 列表按状态、优先级、分类筛选后仍按创建时间倒序分页
+            models.Index(fields=["user", "status", "-created_at", "id"]),
+            models.Index(fields=["user", "priority", "-created_at", "id"]),
+            models.Index(fields=["user", "category", "-created_at", "id"]),
+            # 逾期统计：状态 + 截止时间范围
+            models.Index(fields=["user", "status", "due_date"]),
+            # 逾期清扫：按状态定位新到期的任务和水位之后被修改过的任务
+            models.Index(fields=["status", "due_date"]),
+            models.Index(fields=["status", "updated_at"]),
+            # “今日任务”和每日统计按用户本地日期换算出的 UTC 范围查截止时间（创建时间用上面的索引）
+            models.Index(fields=["user", "due_date"]),
+        ]
 
     def __str__(self):
         return self.title
 
 
-    def clean(self):
-        # 只在创建新任务时验证截止时间
-        if not self.pk and self.due_date < timezone.now():
+    def clean(self, allow_past_due_date=False):
+        # 只在创建新任务时验证截止时间，导入历史任务时允许过去的时间
+        if not allow_past_due_date and not self.pk and self.due_date < timezone.now():
             raise ValidationError("截止时间不能早于当前时间")
 
     def save(self, *args, **kwargs):
         self.clean()
+        # 专注统计字段只通过 add_focus() 等原子更新维护，普通保存不覆盖
+        if not self._state.adding and "update_fields" not in kwargs:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.FOCUS_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     @property
     def focused_duration(self):
         """获取任务的实际专注时长（分钟）"""
-        PomodoroActivity = apps.get_model('activities', 'PomodoroActivity')
-        StopwatchActivity = apps.get_model('activities', 'StopwatchActivity')
-        
-        pomodoro_activities = PomodoroActivity.objects.filter(
-            task=self, status="COMPLETED"
-        )
-        stopwatch_activities = StopwatchActivity.objects.filter(
-            task=self, status="COMPLETED"
-        )
-        
-        total_minutes = 0
-        
-        # 计算番茄钟时长
-        for activity in pomodoro_activities:
-            total_minutes += activity.pomodoro_count * 25  # 每个番茄钟25分钟
-            
-        # 计算正计时时长
-        for activity in stopwatch_activities:
-            if activity.duration:
-                total_minutes += activity.duration.total_seconds() / 60
-                
-        return round(total_minutes)
+        return round(self.focused_seconds / 60)
+
+
+class SweepWatermark(models.Model):
+    """后台清扫任务的水位，记录上次处理到的时间点，下次只处理之后的窗口"""
+
+    name = models.CharField(max_length=50, unique=True, verbose_name="清扫任务名称")
+    watermark = models.DateTimeField(verbose_name="水位时间")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        verbose_name = "清扫水位"
+        verbose_name_plural = "清扫水位"
+
+    def __str__(self):
+        return f"{self.name}: {self.watermark}"
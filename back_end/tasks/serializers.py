@@ -1,12 +1,16 @@
+from datetime import timedelta
 from rest_framework import serializers
 from .models import Task
-from app_settings.serializers import TaskCategorySerializer
+from app_settings.serializers import TaskCategorySerializer, TaskCategoryValuesSerializer
 from django.db import models
+from schedule_system.bulk import BulkUpdateSerializerMixin
+from schedule_system.fields import DynamicFieldsMixin
+from schedule_system.values import ValuesSerializer
 
 # from activities.serializers import ActivitySerializer
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(DynamicFieldsMixin, BulkUpdateSerializerMixin, serializers.ModelSerializer):
     # activities = ActivitySerializer(many=True, read_only=True)
     category = TaskCategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
@@ -34,6 +38,12 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    expandable_fields = ("category",)
+    field_columns = {
+        "estimated_duration_display": ("estimated_duration",),
+        "focused_duration": ("focused_seconds",),
+    }
+
     def get_estimated_duration_display(self, obj):
         if obj.estimated_duration:
             # 将秒数转换为分钟数，并四舍五入
@@ -43,10 +53,27 @@ class TaskSerializer(serializers.ModelSerializer):
     def get_focused_duration(self, obj):
         return obj.focused_duration
 
+    def apply_validated_data(self, instance, validated_data):
+        # 预计时长以分钟提交，转换为 timedelta
+        if "estimated_duration" in validated_data:
+            validated_data = dict(validated_data)
+            validated_data["estimated_duration"] = timedelta(
+                minutes=validated_data["estimated_duration"]
+            )
+        return super().apply_validated_data(instance, validated_data)
+
+    def validate_category_id(self, value):
+        # 批量导入时由视图预先一次性查出当前用户的分类ID
+        owned_category_ids = self.context.get("owned_category_ids")
+        if value is not None and owned_category_ids is not None:
+            if value not in owned_category_ids:
+                raise serializers.ValidationError("分类不存在或不属于当前用户")
+        return value
+
     def validate_due_date(self, value):
         from django.utils import timezone
-        # 如果是更新操作，不验证时间
-        if self.instance:
+        # 如果是更新操作或导入历史任务，不验证时间
+        if self.instance or self.context.get("allow_past_due_date"):
             return value
             
         # 确保比较时使用相同的时区
@@ -102,3 +129,19 @@ class TaskSerializer(serializers.ModelSerializer):
         instance.save()
         print(f"更新后的预计时长: {instance.estimated_duration}")
         return instance
+
+
+class TaskValuesSerializer(ValuesSerializer):
+    """任务列表的快速序列化器，输出与 TaskSerializer 相同"""
+
+    serializer_class = TaskSerializer
+    nested = {"category": TaskCategoryValuesSerializer}
+
+    def get_estimated_duration_display(self, row, prefix):
+        estimated_duration = row[prefix + "estimated_duration"]
+        if estimated_duration:
+            return round(estimated_duration.total_seconds() / 60)
+        return 0
+
+    def get_focused_duration(self, row, prefix):
+        return round(row[prefix + "focused_seconds"] / 60)
@@ -0,0 +1,75 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from data_stats.rollup import mark_dirty
+from schedule_system.periodic import start_periodic
+from .models import SweepWatermark, Task
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_WATERMARK = "task_overdue"
+# 会被标记为逾期的状态
+OVERDUE_SOURCE_STATUSES = ("PENDING", "IN_PROGRESS")
+
+
+def _mark_overdue_in_chunks(queryset, now, batch_size):
+    """
+    分块把查询范围内的任务标记为逾期。
+    已更新的行不再满足状态条件，所以每次都从头取下一块即可
+    """
+    total = 0
+    while True:
+        rows = list(queryset.order_by().values_list("id", "user_id", "due_date")[:batch_size])
+        if not rows:
+            return total
+        with transaction.atomic():
+            # 再次带上状态和截止时间条件，跳过期间已被用户修改的任务
+            total += Task.objects.filter(
+                id__in=[task_id for task_id, _, _ in rows],
+                status__in=OVERDUE_SOURCE_STATUSES,
+                due_date__lte=now,
+            ).update(status="OVERDUE", updated_at=now)
+            # 批量更新不发信号，显式登记截止当天的统计待重算；
+            # 逾期按截止时间点判断，与时区无关，截止日期由汇总时按用户时区换算
+            mark_dirty((user_id, due) for _, user_id, due in rows)
+
+
+def sweep_overdue_tasks(now=None, batch_size=1000):
+    """
+    把已过截止时间的未开始/进行中任务标记为逾期，返回更新的任务数。
+
+    只处理上次水位之后的窗口：截止时间落在 (水位, now] 的任务，
+    以及水位之后被修改过且截止时间早于水位的任务（如截止时间被改到过去）。
+    首次运行没有水位时处理全部积压任务。
+    """
+    now = now or timezone.now()
+    state = SweepWatermark.objects.filter(name=OVERDUE_WATERMARK).first()
+    active = Task.objects.filter(status__in=OVERDUE_SOURCE_STATUSES)
+
+    if state is None:
+        windows = [active.filter(due_date__lte=now)]
+    else:
+        windows = [
+            active.filter(due_date__gt=state.watermark, due_date__lte=now),
+            active.filter(updated_at__gt=state.watermark, due_date__lte=state.watermark),
+        ]
+
+    total = sum(_mark_overdue_in_chunks(window, now, batch_size) for window in windows)
+    SweepWatermark.objects.update_or_create(
+        name=OVERDUE_WATERMARK, defaults={"watermark": now}
+    )
+    return total
+
+
+def _sweep_and_log(batch_size):
+    count = sweep_overdue_tasks(batch_size=batch_size)
+    if count:
+        logger.info("已将 %s 个任务标记为逾期", count)
+
+
+def start_overdue_sweeper(interval, batch_size=1000):
+    """启动进程内的逾期清扫线程（每个进程只启动一次）"""
+    return start_periodic(
+        "overdue-sweeper", interval, lambda: _sweep_and_log(batch_size)
+    )
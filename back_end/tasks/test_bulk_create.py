@@ -0,0 +1,154 @@
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from app_settings.models import TaskCategory
+from schedule_system import bulk
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskBulkCreateTests(APITestCase):
+    url = "/api/tasks/bulk_create/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="otheruser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = TaskCategory.objects.create(name="学习", user=self.user)
+        self.other_category = TaskCategory.objects.create(name="学习", user=self.other_user)
+        self.due_date = (timezone.now() + timedelta(days=1)).isoformat()
+
+    def make_row(self, i, **overrides):
+        row = {
+            "title": f"导入任务{i}",
+            "due_date": self.due_date,
+            "estimated_duration": 30,
+            "category_id": self.category.id,
+        }
+        row.update(overrides)
+        return row
+
+    def test_json_array(self):
+        """测试以JSON数组导入，错误行不影响其他行"""
+        rows = [self.make_row(i) for i in range(1200)]
+        rows[3] = self.make_row(3, priority="不存在的优先级")
+        rows[700] = self.make_row(700, category_id=self.other_category.id)
+        rows[1100] = "不是对象"
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1197)
+        self.assertEqual(response.data["failed"], 3)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [3, 700, 1100])
+        self.assertIn("category_id", response.data["errors"][1]["errors"])
+        # 分类只查询一次，插入按块批量执行
+        sqls = [query["sql"] for query in context.captured_queries]
+        self.assertEqual(len([sql for sql in sqls if sql.startswith("SELECT")]), 1)
+        self.assertLess(len([sql for sql in sqls if sql.startswith("INSERT")]), 30)
+
+        task = Task.objects.get(title="导入任务0")
+        self.assertEqual(task.user, self.user)
+        self.assertEqual(task.category, self.category)
+        self.assertEqual(task.estimated_duration, timedelta(minutes=30))
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 1197)
+
+    def test_ndjson(self):
+        """测试以NDJSON导入，无法解析的行单独报错"""
+        lines = [json.dumps(self.make_row(i)) for i in range(5)]
+        lines.insert(2, "{不是JSON")
+        response = self.client.post(
+            self.url, "\n".join(lines) + "\n", content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 5)
+        self.assertEqual(response.data["errors"], [{"row": 2, "errors": "JSON格式错误"}])
+
+    def test_all_rows_invalid(self):
+        """测试所有行都无效时返回400"""
+        response = self.client.post(
+            self.url, [self.make_row(0, priority="不存在的优先级")], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_past_due_date_imported(self):
+        """测试导入历史任务时截止时间可以是过去的时间，单条创建仍然拒绝"""
+        past = (timezone.now() - timedelta(days=30)).isoformat()
+        response = self.client.post(
+            self.url, [self.make_row(0, due_date=past), self.make_row(1)], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertTrue(Task.objects.filter(title="导入任务0", due_date__lt=timezone.now()).exists())
+
+        response = self.client.post("/api/tasks/", self.make_row(2, due_date=past), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_json(self):
+        """测试请求体不是JSON数组"""
+        response = self.client.post(self.url, {"title": "任务"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stream_split_across_reads(self):
+        """测试元素被读取边界截断时仍能正确解析"""
+        original = bulk.STREAM_READ_SIZE
+        bulk.STREAM_READ_SIZE = 7
+        try:
+            rows = [self.make_row(i, title=f"任务{i}" * 3) for i in range(20)]
+            response = self.client.post(self.url, rows, format="json")
+        finally:
+            bulk.STREAM_READ_SIZE = original
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 20)
+
+    def test_malformed_element_after_first_chunk(self):
+        """测试第一块写入之后出现格式错误的元素：跳过该元素，返回已导入条数和出错行"""
+        rows = [json.dumps(self.make_row(i)) for i in range(605)]
+        rows.insert(600, "{bad json}")
+        response = self.client.post(
+            self.url, "[" + ",".join(rows) + "]", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 605)
+        self.assertEqual(response.data["errors"], [{"row": 600, "errors": "JSON格式错误"}])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 605)
+
+    def test_truncated_body_after_first_chunk(self):
+        """测试请求体在中途截断：已写入的块保留，返回导入条数和截断的位置"""
+        rows = ",".join(json.dumps(self.make_row(i)) for i in range(600))
+        response = self.client.post(
+            self.url, "[" + rows + ',{"title": "截', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 600)
+        self.assertEqual(response.data["errors"], [{"row": 600, "errors": "JSON数组不完整"}])
+
+    def test_malformed_element_does_not_read_to_end(self):
+        """测试跳过格式错误的元素时不把其后的请求体全部读入内存"""
+        tail = ",".join(json.dumps(self.make_row(i)) for i in range(50))
+        stream = io.BytesIO(('[{bad, "x": "]"}, ' + tail + "]").encode())
+        original = bulk.STREAM_READ_SIZE
+        bulk.STREAM_READ_SIZE = 16
+        try:
+            items = bulk.iter_json_array(stream)
+            self.assertIsInstance(next(items), ValueError)
+            self.assertLess(stream.tell(), 64)
+            self.assertEqual(next(items)["title"], "导入任务0")
+            self.assertEqual(len(list(items)), 49)
+        finally:
+            bulk.STREAM_READ_SIZE = original
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from app_settings.models import TaskCategory
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskBulkUpdateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="otheruser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_tasks(self, count, user=None):
+        return Task.objects.bulk_create(
+            Task(
+                title=f"任务{i}",
+                user=user or self.user,
+                due_date=timezone.now() + timedelta(days=1),
+            )
+            for i in range(count)
+        )
+
+    def bulk_update(self, task_updates):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                "/api/tasks/bulk_update/", {"task_updates": task_updates}, format="json"
+            )
+        return len(context.captured_queries), response
+
+    def test_query_count_is_constant(self):
+        """测试批量更新的查询数量不随条数增长"""
+        small = self.create_tasks(2)
+        small_count, response = self.bulk_update(
+            [{"id": task.id, "status": "IN_PROGRESS"} for task in small]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        large = self.create_tasks(200)
+        large_count, response = self.bulk_update(
+            [{"id": task.id, "status": "IN_PROGRESS"} for task in large]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 200)
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(
+            Task.objects.filter(user=self.user, status="IN_PROGRESS").count(), 202
+        )
+
+    def test_results_per_id(self):
+        """测试按 id 返回每条的处理结果"""
+        task, = self.create_tasks(1)
+        other_task, = self.create_tasks(1, user=self.other_user)
+        _, response = self.bulk_update([
+            {"id": task.id, "title": "新标题", "estimated_duration": 45},
+            {"id": other_task.id, "title": "越权修改"},
+            {"title": "缺少ID"},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[str(task.id)], {"status": "updated"})
+        self.assertEqual(results[str(other_task.id)], {"status": "not_found"})
+        self.assertEqual(results["#2"]["status"], "invalid")
+
+        task.refresh_from_db()
+        other_task.refresh_from_db()
+        self.assertEqual(task.title, "新标题")
+        self.assertEqual(task.estimated_duration, timedelta(minutes=45))
+        self.assertEqual(other_task.title, "任务0")
+
+    def test_invalid_rows_are_skipped(self):
+        """测试校验失败的行不会写入，其余行正常更新"""
+        first, second = self.create_tasks(2)
+        _, response = self.bulk_update([
+            {"id": first.id, "priority": "不存在的优先级"},
+            {"id": second.id, "priority": "URGENT_IMPORTANT"},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][str(first.id)]["status"], "invalid")
+        self.assertIn("priority", response.data["results"][str(first.id)]["errors"])
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertNotEqual(first.priority, "不存在的优先级")
+        self.assertEqual(second.priority, "URGENT_IMPORTANT")
+
+    def test_all_invalid_returns_400(self):
+        """测试没有任何一行更新成功时返回400"""
+        task, = self.create_tasks(1, user=self.other_user)
+        _, response = self.bulk_update([{"id": task.id, "title": "越权修改"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_category_must_belong_to_user(self):
+        """测试只能改为当前用户的分类，他人的或不存在的分类按行拒绝"""
+        first, second, third = self.create_tasks(3)
+        category = TaskCategory.objects.create(name="学习", user=self.user)
+        other_category = TaskCategory.objects.create(name="学习", user=self.other_user)
+        _, response = self.bulk_update([
+            {"id": first.id, "category_id": category.id},
+            {"id": second.id, "category_id": other_category.id},
+            {"id": third.id, "category_id": other_category.id + 1000},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[str(first.id)], {"status": "updated"})
+        for task in (second, third):
+            self.assertEqual(results[str(task.id)]["status"], "invalid")
+            self.assertIn("category_id", results[str(task.id)]["errors"])
+            task.refresh_from_db()
+            self.assertIsNone(task.category_id)
+        first.refresh_from_db()
+        self.assertEqual(first.category, category)
@@ -0,0 +1,125 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity, StopwatchActivity
+from app_settings.models import AppSettings
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskFocusTotalsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.settings = AppSettings.objects.create(user=self.user, pomodoro_duration=30)
+        self.task = Task.objects.create(
+            title="测试任务",
+            user=self.user,
+            due_date=timezone.now() + timezone.timedelta(days=1),
+        )
+
+    def create_stopwatch(self, minutes):
+        activity = StopwatchActivity.objects.create(
+            title="正计时", user=self.user, task=self.task, status="PENDING"
+        )
+        activity.start_stopwatch()
+        activity.start_time = timezone.now() - timezone.timedelta(minutes=minutes)
+        activity.save()
+        activity.stop_stopwatch()
+        return activity
+
+    def test_complete_pomodoro_uses_settings_duration(self):
+        """测试完成番茄钟时按用户设置累计专注时长"""
+        activity = PomodoroActivity.objects.create(
+            title="番茄钟", user=self.user, task=self.task
+        )
+        activity.start_pomodoro()
+        activity.complete_pomodoro()
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.pomodoro_count, 1)
+        self.assertEqual(self.task.focused_seconds, 30 * 60)
+        self.assertEqual(self.task.focused_duration, 30)
+        self.assertIsNotNone(self.task.last_focused_at)
+
+    def test_stop_stopwatch_adds_seconds(self):
+        """测试停止正计时累计正计时时长"""
+        self.create_stopwatch(20)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 20 * 60)
+        self.assertEqual(self.task.focused_duration, 20)
+
+    def test_task_save_keeps_focus_totals(self):
+        """测试普通保存不会覆盖并发累计的专注统计"""
+        stale_task = Task.objects.get(id=self.task.id)
+        self.create_stopwatch(10)
+
+        stale_task.title = "新标题"
+        stale_task.save()
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "新标题")
+        self.assertEqual(self.task.stopwatch_seconds, 10 * 60)
+
+    def test_delete_stopwatch_syncs_totals(self):
+        """测试删除正计时活动后同步任务统计"""
+        first = self.create_stopwatch(10)
+        self.create_stopwatch(15)
+
+        response = self.client.delete(f"/api/stopwatch-activities/{first.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 15 * 60)
+
+        response = self.client.post(
+            "/api/stopwatch-activities/bulk_delete/",
+            {"activity_ids": list(StopwatchActivity.objects.values_list("id", flat=True))},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 0)
+        self.assertEqual(self.task.focused_seconds, 0)
+
+    def test_bulk_update_stopwatch_syncs_totals(self):
+        """测试批量修改正计时活动后同步任务统计"""
+        activity = self.create_stopwatch(10)
+
+        response = self.client.post(
+            "/api/stopwatch-activities/bulk_update/",
+            {"activity_updates": [{"id": activity.id, "duration": "00:40:00"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stopwatch_seconds, 40 * 60)
+
+    def test_rebuild_command(self):
+        """测试重建命令按活动记录计算专注统计"""
+        PomodoroActivity.objects.create(
+            title="番茄钟", user=self.user, task=self.task, pomodoro_count=2, status="COMPLETED"
+        )
+        StopwatchActivity.objects.create(
+            title="正计时",
+            user=self.user,
+            task=self.task,
+            status="COMPLETED",
+            end_time=timezone.now(),
+            duration=timezone.timedelta(minutes=5),
+        )
+
+        call_command("rebuild_focus_totals", batch_size=1, stdout=StringIO())
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.pomodoro_count, 2)
+        self.assertEqual(self.task.stopwatch_seconds, 5 * 60)
+        self.assertEqual(self.task.focused_seconds, 2 * 30 * 60 + 5 * 60)
+        self.assertIsNotNone(self.task.last_focused_at)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from .models import SweepWatermark, Task
+from .sweeper import OVERDUE_WATERMARK, sweep_overdue_tasks
+
+User = get_user_model()
+
+
+class OverdueSweeperTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.now = timezone.now()
+
+    def create_task(self, title, due_in, task_status="PENDING"):
+        # bulk_create 绕过 clean() 中的截止时间校验，便于构造已到期的任务
+        task, = Task.objects.bulk_create([
+            Task(
+                title=title,
+                user=self.user,
+                status=task_status,
+                due_date=self.now + due_in,
+            )
+        ])
+        return task
+
+    def assert_status(self, task, expected):
+        task.refresh_from_db()
+        self.assertEqual(task.status, expected)
+
+    def test_marks_expired_tasks(self):
+        """测试只有已到期的未开始/进行中任务被标记为逾期"""
+        pending = self.create_task("未开始", timedelta(hours=-1))
+        in_progress = self.create_task("进行中", timedelta(days=-3), "IN_PROGRESS")
+        completed = self.create_task("已完成", timedelta(hours=-1), "COMPLETED")
+        future = self.create_task("未到期", timedelta(hours=1))
+
+        count = sweep_overdue_tasks(now=self.now, batch_size=1)
+
+        self.assertEqual(count, 2)
+        self.assert_status(pending, "OVERDUE")
+        self.assert_status(in_progress, "OVERDUE")
+        self.assert_status(completed, "COMPLETED")
+        self.assert_status(future, "PENDING")
+        self.assertEqual(
+            SweepWatermark.objects.get(name=OVERDUE_WATERMARK).watermark, self.now
+        )
+
+    def test_only_new_window_after_watermark(self):
+        """测试有水位后只处理新到期的窗口"""
+        sweep_overdue_tasks(now=self.now)
+        soon = self.create_task("稍后到期", timedelta(minutes=30))
+        later = self.create_task("更晚到期", timedelta(hours=2))
+        # 水位之前到期但从未修改过的任务不会被重新扫描
+        stale = self.create_task("旧任务", timedelta(hours=-1))
+        Task.objects.filter(id=stale.id).update(updated_at=self.now - timedelta(days=1))
+
+        count = sweep_overdue_tasks(now=self.now + timedelta(hours=1))
+
+        self.assertEqual(count, 1)
+        self.assert_status(soon, "OVERDUE")
+        self.assert_status(later, "PENDING")
+        self.assert_status(stale, "PENDING")
+
+    def test_edited_into_past_after_watermark(self):
+        """测试水位之后截止时间被改到过去的任务也会被标记"""
+        task = self.create_task("任务", timedelta(days=1))
+        sweep_overdue_tasks(now=self.now)
+
+        task.due_date = self.now - timedelta(days=1)
+        task.save()
+
+        count = sweep_overdue_tasks(now=timezone.now())
+        self.assertEqual(count, 1)
+        self.assert_status(task, "OVERDUE")
+
+    def test_management_command(self):
+        """测试管理命令"""
+        task = self.create_task("任务", timedelta(hours=-1))
+        out = StringIO()
+        call_command("sweep_overdue_tasks", stdout=out)
+        self.assertIn("1", out.getvalue())
+        self.assert_status(task, "OVERDUE")
+
+    def test_stats_count_overdue_status(self):
+        """测试统计摘要直接按逾期状态计数"""
+        self.create_task("任务1", timedelta(hours=-1))
+        self.create_task("任务2", timedelta(hours=1))
+        sweep_overdue_tasks()
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get("/api/task-stats/summary/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["overdue_tasks"], 1)
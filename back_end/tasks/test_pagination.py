@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for i in range(7):
+            Task.objects.create(
+                title=f"任务{i}",
+                user=self.user,
+                status="COMPLETED" if i % 2 else "PENDING",
+                due_date=timezone.now() + timezone.timedelta(days=1),
+            )
+        # 让部分任务的创建时间相同，验证按 id 打破并列
+        same_time = timezone.now()
+        Task.objects.filter(title__in=["任务2", "任务3", "任务4"]).update(created_at=same_time)
+
+    def collect_pages(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_pages_cover_all_rows_in_order(self):
+        """测试游标翻页完整且按 (-created_at, id) 排序"""
+        ids, pages = self.collect_pages("/api/tasks/?page_size=3")
+
+        expected = list(
+            Task.objects.filter(user=self.user)
+            .order_by("-created_at", "id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_pagination_keeps_filters(self):
+        """测试游标翻页保留查询参数筛选"""
+        ids, _ = self.collect_pages("/api/tasks/?page_size=1&status=COMPLETED")
+        self.assertEqual(
+            sorted(ids),
+            sorted(Task.objects.filter(status="COMPLETED").values_list("id", flat=True)),
+        )
+
+    def test_opt_out_returns_plain_list(self):
+        """测试 paginate=false 返回完整列表"""
+        response = self.client.get("/api/tasks/?paginate=false")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_invalid_cursor(self):
+        """测试无效游标"""
+        response = self.client.get("/api/tasks/?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
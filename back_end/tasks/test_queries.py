@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from activities.models import PomodoroActivity, StopwatchActivity
+from app_settings.models import TaskCategory
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskListQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = TaskCategory.objects.create(name="学习", user=self.user)
+
+    def create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f"任务{i}",
+                user=self.user,
+                category=self.category,
+                due_date=timezone.now() + timezone.timedelta(days=1),
+            )
+            PomodoroActivity.objects.create(
+                title="番茄钟",
+                user=self.user,
+                task=task,
+                status="COMPLETED",
+                pomodoro_count=2,
+            )
+            StopwatchActivity.objects.create(
+                title="正计时",
+                user=self.user,
+                task=task,
+                status="COMPLETED",
+                duration=timezone.timedelta(minutes=30),
+            )
+        Task.objects.filter(user=self.user).rebuild_focus_totals()
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_is_constant(self):
+        """测试任务列表的查询数量不随任务数增长"""
+        self.create_tasks(2)
+        small_count, _ = self.count_list_queries()
+
+        self.create_tasks(20)
+        large_count, response = self.count_list_queries()
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(response.data["results"]), 22)
+
+    def test_list_focused_duration_matches_property(self):
+        """测试列表中的专注时长与任务记录一致"""
+        self.create_tasks(3)
+        _, response = self.count_list_queries()
+
+        for item in response.data["results"]:
+            task = Task.objects.get(id=item["id"])
+            self.assertEqual(item["focused_duration"], task.focused_duration)
+            self.assertEqual(item["focused_duration"], 80)  # 2个番茄钟(50分钟) + 30分钟正计时
+
+    def test_retrieve_focused_duration(self):
+        """测试任务详情的专注时长"""
+        self.create_tasks(1)
+        task = Task.objects.get()
+        response = self.client.get(f"/api/tasks/{task.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["focused_duration"], 80)
@@ -6,18 +6,37 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from django.utils import timezone
 from django.db import transaction
+from app_settings.models import TaskCategory
+from data_stats.rollup import mark_tasks_dirty
+from data_sync.tombstones import batch_tombstones
+from schedule_system.bulk import BulkCreateMixin, BulkUpdateMixin, iter_request_rows
+from schedule_system.conditional import ConditionalRequestMixin
+from schedule_system.fields import SparseFieldsMixin
+from schedule_system.values import ValuesListMixin
 from .models import Task
-from .serializers import TaskSerializer
+from .serializers import TaskSerializer, TaskValuesSerializer
 
 # Create your views here.
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    SparseFieldsMixin,
+    BulkCreateMixin,
+    BulkUpdateMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = TaskSerializer
+    values_serializer_class = TaskValuesSerializer
     permission_classes = [IsAuthenticated]
+    etag_related_models = (TaskCategory,)  # 列表中嵌套展示分类
+    etag_related_paths = ("category",)
 
     def get_queryset(self):
-        queryset = Task.objects.filter(user=self.request.user)
+        queryset = Task.objects.filter(user=self.request.user).select_related(
+            "category"
+        )
 
         # 按分类筛选
         category = self.request.query_params.get("category", None)
@@ -60,19 +79,56 @@ class TaskViewSet(viewsets.ModelViewSet):
         })
         return Response(serializer.data)
 
+    def perform_destroy(self, instance):
+        # 级联删除的活动和提醒的删除记录合并为一条批量插入
+        with transaction.atomic(), batch_tombstones():
+            instance.delete()
+
     @action(detail=False, methods=["post"])
     def bulk_delete(self, request):
         task_ids = request.data.get("task_ids", [])
-        Task.objects.filter(id__in=task_ids, user=request.user).delete()
+        # 任务及级联删除的活动、提醒的删除记录合并为一条批量插入
+        with transaction.atomic(), batch_tombstones():
+            Task.objects.filter(id__in=task_ids, user=request.user).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["post"])
+    def bulk_create(self, request):
+        """
+        批量导入任务，请求体为 JSON 数组或 NDJSON（application/x-ndjson）。
+        以流的方式分块校验和写入，返回导入条数和出错行的行号及错误信息。
+        导入的可能是已有的历史任务，截止时间允许是过去的时间
+        """
+        owned_category_ids = set(
+            TaskCategory.objects.filter(user=request.user).values_list("id", flat=True)
+        )
+        created, errors = self.perform_bulk_create(
+            iter_request_rows(request),
+            context={"owned_category_ids": owned_category_ids, "allow_past_due_date": True},
+        )
+        return self.bulk_create_response(created, errors)
+
+    def clean_bulk_instance(self, instance):
+        instance.clean(allow_past_due_date=True)
+
+    def bulk_created(self, instances):
+        mark_tasks_dirty(instances)
+
     @action(detail=False, methods=["post"])
     def bulk_update(self, request):
         task_updates = request.data.get("task_updates", [])
-        for update in task_updates:
-            task_id = update.pop("id")
-            Task.objects.filter(id=task_id, user=request.user).update(**update)
-        return Response(status=status.HTTP_200_OK)
+        # 与批量导入一样一次查出当前用户的分类ID，逐行校验归属（不存在的分类同样拒绝）
+        owned_category_ids = set(
+            TaskCategory.objects.filter(user=request.user).values_list("id", flat=True)
+        )
+        # 目标任务的加载和写回在同一个事务内
+        with transaction.atomic():
+            updated, results = self.perform_bulk_update(
+                task_updates, context={"owned_category_ids": owned_category_ids}
+            )
+        # bulk_update 不发信号，登记新旧截止日期的统计待重算
+        mark_tasks_dirty(updated)
+        return self.bulk_update_response(updated, results)
 
     @action(detail=True, methods=["post"])
     def complete(self, request, pk=None):
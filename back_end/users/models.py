@@ -91,6 +91,11 @@ class User(AbstractBaseUser):
         default=Role.USER,  # 默认角色为普通用户
     )  # 用户角色字段
 
+    time_zone = models.CharField(
+        max_length=64,
+        default="UTC",
+    )  # 用户所在时区(IANA名称，如Asia/Shanghai)，统计按该时区的本地日期划分
+
     created_at = models.DateTimeField(auto_now_add=True)  # 用户创建时间，自动设置
     updated_at = models.DateTimeField(auto_now=True)  # 用户最后更新时间，自动设置
 
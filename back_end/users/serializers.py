@@ -1,5 +1,7 @@
 # users/serializers.py
 from rest_framework import serializers
+from app_settings.cache import ensure_app_settings
+from schedule_system.days import is_valid_zone
 from .models import User
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
@@ -36,6 +38,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             email=validated_data["email"],
             password=validated_data["password"],
         )
+        ensure_app_settings(user)
         return user
 
 
@@ -85,12 +88,14 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         fields = [
             "username",
             "email",
+            "time_zone",
             "created_at",
             "last_login"
         ]  # 可以扩展更多字段
         extra_kwargs = {
             "username": {"required": False},
             "email": {"required": False},
+            "time_zone": {"required": False},
             "created_at": {"read_only": True},
             "last_login": {"read_only": True}
         }
@@ -100,6 +105,11 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("邮箱不能为空")
         return value
 
+    def validate_time_zone(self, value):
+        if not is_valid_zone(value):
+            raise serializers.ValidationError("无效的时区名称")
+        return value
+
 
 # 用户密码修改序列化器
 class ChangePasswordSerializer(serializers.Serializer):
@@ -1,10 +1,10 @@
-import api from './config'
+import api, { FULL_LIST } from './config'
 import type { Activity } from '@/types'
 
 export const activityApi = {
     // 获取活动列表
     getActivities: () => {
-        return api.get<Activity[]>('/activities/')
+        return api.get<Activity[]>('/activities/', { params: FULL_LIST })
     },
 
     // 获取单个活动
@@ -45,5 +45,50 @@ export const activityApi = {
     // 停止正计时
     stopStopwatch: (id: number) => {
         return api.post<Activity>(`/activities/${id}/stop_stopwatch/`)
+    },
+
+    // 按创建时间倒序的番茄钟和正计时时间线（分页），翻页时传入上一页返回的 next
+    getTimeline: (next?: string, kind?: 'pomodoro' | 'stopwatch') => {
+        return api.get<{ next: string | null; results: TimelineActivity[] }>(
+            next ?? '/activities/timeline/',
+            { params: next ? undefined : { kind } }
+        )
+    }
+}
+
+export type TimelineActivity = Activity & { kind: 'POMODORO' | 'STOPWATCH' }
+ 
+export interface ActiveTimerResponse {
+    kind: 'POMODORO' | 'STOPWATCH' | null
+    activity: Activity | null
+}
+
+// 离线期间在本地排队的计时操作，key 为客户端生成的幂等键（如 UUID）
+export interface TimerEvent {
+    key: string
+    kind: 'pomodoro' | 'stopwatch'
+    activity_id: number
+    action: 'start' | 'break' | 'long_break' | 'complete' | 'stop'
+    at: string
+}
+
+export interface TimerEventResult {
+    status: 'applied' | 'conflict' | 'invalid' | 'not_found'
+    replayed?: boolean
+    errors?: unknown
+}
+
+export const timerApi = {
+    // 获取当前正在进行的计时（番茄钟或正计时），没有时均为 null
+    getActive: () => {
+        return api.get<ActiveTimerResponse>('/timers/active/')
+    },
+
+    // 重连后一次提交离线期间的计时操作，重试整批是安全的
+    replayEvents: (events: TimerEvent[]) => {
+        return api.post<{ applied: number; results: Record<string, TimerEventResult> }>(
+            '/activities/events/',
+            { events }
+        )
     }
-} 
\ No newline at end of file
+}
@@ -8,6 +8,9 @@ const api = axios.create({
     }
 })
 
+// 列表接口默认游标分页，按完整列表使用的调用须逐个传入此参数
+export const FULL_LIST = { paginate: 'false' }
+
 // 请求拦截器
 api.interceptors.request.use(
     config => {
@@ -0,0 +1,20 @@
+import api from './config'
+
+export type PushEventType = 'timer' | 'task.updated' | 'task.deleted' | 'reminder.due' | 'reset'
+
+// 订阅当前用户的推送事件。EventSource 断线后自动重连并携带 Last-Event-ID，
+// 收到 reset 时说明有事件无法补发，应重新拉取数据
+export const subscribeEvents = (
+    handler: (type: PushEventType, data: Record<string, unknown>) => void
+) => {
+    const token = localStorage.getItem('token') ?? ''
+    const url = `${api.defaults.baseURL}/events/stream/?token=${encodeURIComponent(token)}`
+    const source = new EventSource(url)
+    const types: PushEventType[] = ['timer', 'task.updated', 'task.deleted', 'reminder.due', 'reset']
+    for (const type of types) {
+        source.addEventListener(type, event => {
+            handler(type, JSON.parse((event as MessageEvent).data))
+        })
+    }
+    return () => source.close()
+}
@@ -1,10 +1,10 @@
-import api from './config'
+import api, { FULL_LIST } from './config'
 import type { Reminder } from '@/types'
 
 export const reminderApi = {
     // 获取提醒列表
     getReminders: () => {
-        return api.get<Reminder[]>('/reminders/')
+        return api.get<Reminder[]>('/reminders/', { params: FULL_LIST })
     },
 
     // 获取单个提醒
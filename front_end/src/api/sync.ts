@@ -0,0 +1,23 @@
+import api from './config'
+
+export type SyncModel =
+    | 'tasks'
+    | 'pomodoro_activities'
+    | 'stopwatch_activities'
+    | 'reminders'
+    | 'task_categories'
+
+export interface SyncResponse {
+    token: string
+    // 为 true 时 changes 为全量数据，应替换本地全部数据
+    reset: boolean
+    changes: Record<SyncModel, Record<string, unknown>[]>
+    deleted: Record<SyncModel, number[]>
+}
+
+export const syncApi = {
+    // 增量同步：传入上次返回的令牌，只获取之后变化和删除的数据
+    sync: (since?: string) => {
+        return api.get<SyncResponse>('/sync/', { params: since ? { since } : {} })
+    }
+}
@@ -1,10 +1,10 @@
-import api from './config'
+import api, { FULL_LIST } from './config'
 import type { Task } from '@/types'
 
 export const taskApi = {
     // 获取任务列表
     getTasks: () => {
-        return api.get<Task[]>('/tasks/')
+        return api.get<Task[]>('/tasks/', { params: FULL_LIST })
     },
 
     // 获取单个任务
@@ -35,6 +35,16 @@ export interface Activity {
     updated_at: string
     remaining_time?: number
     elapsed_time?: number
+    timer_state?: TimerState
+}
+
+// 服务端按存储的时间戳计算的计时状态，remaining/elapsed 单位为秒
+export interface TimerState {
+    phase: 'IDLE' | 'POMODORO' | 'SHORT_BREAK' | 'LONG_BREAK' | 'RUNNING' | 'STOPPED'
+    phase_start: string | null
+    remaining: number | null
+    elapsed: number | null
+    next_long_break: number | null
 }
 
 export interface Reminder {